@@ -1,109 +1,121 @@
 import sys
 import os
+import atexit
 sys.path.insert(0, os.path.join(os.path.dirname(__file__), "src"))
 
-from flask import Flask, request, jsonify
-from src.account import Account, AccountsRegistry
+import time
+from flask import Flask, Response, request, jsonify, stream_with_context
+import handlers
+from account import AccountsRegistry
+from snapshot import Snapshotter, restore
+from sharding import ShardedRegistry
+from bulk_import import iter_json_array, iter_ndjson
+from smtp.queue import MailQueue
+from metrics import Metrics
+from profiling import ProfilingMiddleware, SamplingProfiler
 app = Flask(__name__)
-registry = AccountsRegistry()
-
-
-def account_to_dict(acc: Account):
-    return {
-        "name": acc.first_name,
-        "surname": acc.last_name,
-        "pesel": acc.pesel,
-        "balance": acc.balance,
-    }
+shards = int(os.getenv("BANK_APP_SHARDS", 1))
+if shards > 1:
+    if os.getenv("BANK_APP_JOURNAL") or os.getenv("BANK_APP_SNAPSHOT"):
+        raise RuntimeError("BANK_APP_JOURNAL and BANK_APP_SNAPSHOT are not supported with BANK_APP_SHARDS > 1")
+    registry = ShardedRegistry(shards)
+else:
+    registry = AccountsRegistry()
+    restore(registry, os.getenv("BANK_APP_SNAPSHOT"), os.getenv("BANK_APP_JOURNAL"),
+            fsync=os.getenv("BANK_APP_JOURNAL_FSYNC", "group"))
+    if os.getenv("BANK_APP_SNAPSHOT"):
+        Snapshotter(registry, os.environ["BANK_APP_SNAPSHOT"],
+                    interval=float(os.getenv("BANK_APP_SNAPSHOT_INTERVAL", 300))).start()
+mail_queue = MailQueue(
+    workers=int(os.getenv("BANK_APP_MAIL_WORKERS", 2)),
+    capacity=int(os.getenv("BANK_APP_MAIL_QUEUE_SIZE", 1000)),
+    max_attempts=int(os.getenv("BANK_APP_MAIL_ATTEMPTS", 3)),
+)
+metrics = Metrics()
+if os.getenv("BANK_APP_PROFILE"):
+    profiler = SamplingProfiler(interval=float(os.getenv("BANK_APP_PROFILE_INTERVAL", 0.005)))
+    app.wsgi_app = ProfilingMiddleware(app.wsgi_app, profiler, rate=float(os.getenv("BANK_APP_PROFILE_RATE", 0)))
+    atexit.register(profiler.dump, os.environ["BANK_APP_PROFILE"])
+
+
+def reply(result):
+    body, status = result
+    if isinstance(body, handlers.Stream):
+        return Response(stream_with_context(body.chunks), status, mimetype=body.content_type)
+    if body is None:
+        return "", status
+    return jsonify(body), status
+
+
+@app.before_request
+def start_timer():
+    request.environ["bank_app.request_start"] = time.perf_counter()
+
+
+@app.after_request
+def record_request(response):
+    # Streamed responses are timed up to their headers. The request proxy
+    # is resolved once; each proxy access costs about a microsecond.
+    req = request._get_current_object()
+    rule = req.url_rule
+    metrics.observe(rule.rule if rule is not None else "unmatched", req.method, response.status_code,
+                    time.perf_counter() - req.environ["bank_app.request_start"])
+    return response
+
+
+@app.route("/metrics", methods=["GET"])
+def get_metrics():
+    return Response(metrics.render(registry), 200, mimetype="text/plain; version=0.0.4")
 
 
 @app.route("/api/accounts", methods=["POST"])
 def create_account():
-    data = request.get_json(silent=True)
-    if not isinstance(data, dict):
-        return jsonify({"error": "Invalid JSON"}), 400
+    return reply(handlers.create_account(registry, request.get_json(silent=True)))
 
-    if not all(k in data for k in ("name", "surname", "pesel")):
-        return jsonify({"error": "Missing fields"}), 400
 
-    acc = Account(data["name"], data["surname"], data["pesel"])
-    try:
-        registry.add_account(acc)
-    except ValueError:
-        return jsonify({"error": "Pesel already exists"}), 409
-
-    return "", 201
+@app.route("/api/accounts/bulk", methods=["POST"])
+def create_accounts_bulk():
+    if request.mimetype == "application/x-ndjson":
+        rows = iter_ndjson(request.stream)
+    else:
+        rows = iter_json_array(request.stream)
+    return reply(handlers.import_stream(registry, rows))
 
 
 @app.route("/api/accounts", methods=["GET"])
 def get_all_accounts():
-    return jsonify([account_to_dict(a) for a in registry.get_all_accounts()]), 200
+    return reply(handlers.list_accounts(registry, request.args))
 
 
 @app.route("/api/accounts/<pesel>", methods=["GET", "PATCH", "DELETE"])
 def account_detail(pesel):
     if request.method == "GET":
-        acc = registry.find_by_pesel(pesel)
-        if acc is None:
-            return jsonify({"error": "Not found"}), 404
-        return jsonify(account_to_dict(acc)), 200
-
+        return reply(handlers.get_account(registry, pesel))
     if request.method == "PATCH":
-        acc = registry.find_by_pesel(pesel)
-        if acc is None:
-            return jsonify({"error": "Not found"}), 404
-
-        data = request.get_json(silent=True)
-        if data is None or not isinstance(data, dict):
-            return jsonify({"error": "Invalid JSON"}), 400
-
-        if "name" in data:
-            acc.first_name = data["name"]
-        if "surname" in data:
-            acc.last_name = data["surname"]
-
-        return "", 200
-
-    # DELETE
-    acc = registry.find_by_pesel(pesel)
-    if acc is None:
-        return jsonify({"error": "Not found"}), 404
-    registry.delete_by_pesel(pesel)
-    return "", 200
+        return reply(handlers.update_account(registry, pesel, request.get_json(silent=True)))
+    return reply(handlers.delete_account(registry, pesel))
 
 
 @app.route("/api/accounts/count", methods=["GET"])
 def get_count():
-    return jsonify({"count": registry.count_accounts()}), 200
+    return reply(handlers.count_accounts(registry))
 
 
 @app.route("/api/accounts/<pesel>/transfer", methods=["POST"])
 def transfer(pesel):
-    acc = registry.find_by_pesel(pesel)
-    if acc is None:
-        return jsonify({"error": "Not found"}), 404
-
-    data = request.get_json(silent=True)
-    if not isinstance(data, dict):
-        return jsonify({"error": "Invalid JSON"}), 400
-
-    if "amount" not in data or "type" not in data:
-        return jsonify({"error": "Missing fields"}), 400
-
-    amount = data["amount"]
-    t = data["type"]
-
-    if t not in ("incoming", "outgoing", "express"):
-        return jsonify({"error": "Unknown transfer type"}), 400
-
-    try:
-        if t == "incoming":
-            acc.deposit(amount)
-        elif t == "outgoing":
-            acc.withdraw(amount)
-        elif t == "express":
-            acc.express_transfer(amount)
-    except ValueError as e:
-        return jsonify({"error": str(e)}), 422
-
-    return jsonify({"message": "Zlecenie przyjęto do realizacji"}), 200
\ No newline at end of file
+    return reply(handlers.transfer(registry, pesel, request.get_json(silent=True)))
+
+
+@app.route("/api/accounts/<pesel>/history/email", methods=["POST"])
+def email_history(pesel):
+    return reply(handlers.email_history(registry, mail_queue, pesel, request.get_json(silent=True)))
+
+
+@app.route("/api/mail/<message_id>", methods=["GET"])
+def mail_status(message_id):
+    return reply(handlers.mail_status(mail_queue, message_id))
+
+
+@app.route("/api/transfers/batch", methods=["POST"])
+def transfer_batch():
+    return reply(handlers.transfer_batch(registry, request.get_json(silent=True)))
@@ -0,0 +1,235 @@
+"""ASGI serving mode for the accounts API, e.g. ``uvicorn asgi:app``.
+
+Same routes as the Flask app in api.py, sharing its registry, mail queue
+and the request handling in handlers.py; this module only parses requests
+and sends responses. Handlers run on the event loop unless they can wait
+on I/O (shard pipes, the journal fsync of a write) or walk many accounts
+(bulk import, batches, listings), which run in worker threads.
+"""
+import asyncio
+import json
+import re
+import time
+from urllib.parse import parse_qs
+
+import api
+import handlers
+from bulk_import import iter_json_array, iter_ndjson
+from sharding import ShardedRegistry
+
+STREAM_QUEUE_SIZE = 16
+
+ROUTES = []
+
+
+def route(pattern, *methods):
+    # Metrics label routes like Flask rules, e.g. /api/accounts/<pesel>.
+    rule = re.sub(r"\(\?P<(\w+)>[^)]*\)", r"<\1>", pattern)
+
+    def register(handler):
+        ROUTES.append((re.compile(f"^{pattern}$"), methods, handler, rule))
+        return handler
+    return register
+
+
+class Request:
+    def __init__(self, scope, receive):
+        self.scope = scope
+        self.receive = receive
+        self.method = scope["method"]
+        self.rule = "unmatched"
+        self.args = {k: v[0] for k, v in parse_qs(scope["query_string"].decode()).items()}
+        self.headers = {k.decode().lower(): v.decode() for k, v in scope["headers"]}
+        self.mimetype = self.headers.get("content-type", "").split(";")[0].strip()
+
+    async def body(self):
+        chunks = []
+        while True:
+            message = await self.receive()
+            chunks.append(message.get("body", b""))
+            if not message.get("more_body"):
+                return b"".join(chunks)
+
+    async def json(self):
+        """Parsed JSON body, or None like Flask's get_json(silent=True)."""
+        if self.mimetype != "application/json" and not self.mimetype.endswith("+json"):
+            return None
+        try:
+            return json.loads(await self.body())
+        except ValueError:
+            return None
+
+
+class BodyStream:
+    """Blocking file-like view of the request body for code running in a
+    worker thread; each read() pulls the next chunk from the event loop."""
+
+    def __init__(self, receive, loop):
+        self.receive = receive
+        self.loop = loop
+        self.buffer = b""
+        self.done = False
+
+    def read(self, size=-1):
+        while not self.done and (size < 0 or len(self.buffer) < size):
+            message = asyncio.run_coroutine_threadsafe(self.receive(), self.loop).result()
+            self.buffer += message.get("body", b"")
+            self.done = not message.get("more_body")
+        if size < 0:
+            size = len(self.buffer)
+        data, self.buffer = self.buffer[:size], self.buffer[size:]
+        return data
+
+
+class Response:
+    def __init__(self, body=None, status=200, content_type="application/json"):
+        self.status = status
+        self.content_type = content_type
+        self.body = body
+
+    def encode(self):
+        return b"" if self.body is None else json.dumps(self.body).encode()
+
+    async def send(self, send):
+        payload = self.encode()
+        headers = [(b"content-length", str(len(payload)).encode())]
+        if self.body is not None:
+            headers.append((b"content-type", self.content_type.encode()))
+        await send({"type": "http.response.start", "status": self.status, "headers": headers})
+        await send({"type": "http.response.body", "body": payload})
+
+
+class TextResponse(Response):
+    def encode(self):
+        return self.body.encode()
+
+
+class StreamingResponse(Response):
+    """Streams text chunks produced by a blocking iterator in a worker thread."""
+
+    def __init__(self, chunks, content_type, status=200):
+        super().__init__(None, status, content_type)
+        self.chunks = chunks
+
+    async def send(self, send):
+        loop = asyncio.get_running_loop()
+        chunks = asyncio.Queue(STREAM_QUEUE_SIZE)
+
+        def produce():
+            try:
+                for chunk in self.chunks:
+                    asyncio.run_coroutine_threadsafe(chunks.put(chunk), loop).result()
+            finally:
+                asyncio.run_coroutine_threadsafe(chunks.put(None), loop).result()
+
+        producer = asyncio.create_task(asyncio.to_thread(produce))
+        await send({"type": "http.response.start", "status": self.status,
+                    "headers": [(b"content-type", self.content_type.encode())]})
+        while (chunk := await chunks.get()) is not None:
+            await send({"type": "http.response.body", "body": chunk.encode(), "more_body": True})
+        await send({"type": "http.response.body", "body": b""})
+        await producer
+
+
+def error(message, status):
+    return Response({"error": message}, status)
+
+
+def respond(result):
+    body, status = result
+    if isinstance(body, handlers.Stream):
+        return StreamingResponse(body.chunks, body.content_type, status)
+    return Response(body, status)
+
+
+async def call(handler, *args, writes=False, walks=False):
+    """Runs a handler from handlers.py on the current registry, in a worker
+    thread when it can block: on shard pipes, on the journal fsync of a
+    write, or walking many accounts."""
+    registry = api.registry
+    if walks or isinstance(registry, ShardedRegistry) or \
+            (writes and getattr(registry, "journal", None) is not None):
+        return respond(await asyncio.to_thread(handler, registry, *args))
+    return respond(handler(registry, *args))
+
+
+@route("/metrics", "GET")
+async def metrics(request):
+    text = await asyncio.to_thread(api.metrics.render, api.registry)
+    return TextResponse(text, 200, "text/plain; version=0.0.4")
+
+
+@route("/api/accounts", "POST", "GET")
+async def accounts(request):
+    if request.method == "GET":
+        return await call(handlers.list_accounts, request.args, walks=True)
+    return await call(handlers.create_account, await request.json(), writes=True)
+
+
+@route("/api/accounts/bulk", "POST")
+async def accounts_bulk(request):
+    stream = BodyStream(request.receive, asyncio.get_running_loop())
+    rows = iter_ndjson(stream) if request.mimetype == "application/x-ndjson" else iter_json_array(stream)
+    # Rows are imported as the response is streamed, already in a worker thread.
+    return respond(handlers.import_stream(api.registry, rows))
+
+
+@route("/api/accounts/count", "GET")
+async def count(request):
+    return await call(handlers.count_accounts)
+
+
+@route("/api/accounts/(?P<pesel>[^/]+)", "GET", "PATCH", "DELETE")
+async def account_detail(request, pesel):
+    if request.method == "GET":
+        return await call(handlers.get_account, pesel)
+    if request.method == "PATCH":
+        return await call(handlers.update_account, pesel, await request.json(), writes=True)
+    return await call(handlers.delete_account, pesel, writes=True)
+
+
+@route("/api/accounts/(?P<pesel>[^/]+)/transfer", "POST")
+async def transfer(request, pesel):
+    return await call(handlers.transfer, pesel, await request.json(), writes=True)
+
+
+@route("/api/accounts/(?P<pesel>[^/]+)/history/email", "POST")
+async def email_history(request, pesel):
+    return await call(handlers.email_history, api.mail_queue, pesel, await request.json())
+
+
+@route("/api/mail/(?P<message_id>[^/]+)", "GET")
+async def mail_status(request, message_id):
+    return respond(handlers.mail_status(api.mail_queue, message_id))
+
+
+@route("/api/transfers/batch", "POST")
+async def transfer_batch(request):
+    return await call(handlers.transfer_batch, await request.json(), writes=True, walks=True)
+
+
+async def dispatch(request):
+    path = request.scope["path"]
+    allowed = False
+    for pattern, methods, handler, rule in ROUTES:
+        match = pattern.match(path)
+        if match is None:
+            continue
+        if request.method in methods:
+            request.rule = rule
+            return await handler(request, **match.groupdict())
+        allowed = True
+    return error("Method not allowed", 405) if allowed else error("Not found", 404)
+
+
+async def app(scope, receive, send):
+    if scope["type"] == "lifespan":
+        while (await receive())["type"] != "lifespan.shutdown":
+            await send({"type": "lifespan.startup.complete"})
+        await send({"type": "lifespan.shutdown.complete"})
+        return
+    start = time.perf_counter()
+    request = Request(scope, receive)
+    response = await dispatch(request)
+    api.metrics.observe(request.rule, request.method, response.status, time.perf_counter() - start)
+    await response.send(send)
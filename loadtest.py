@@ -0,0 +1,311 @@
+"""Load generator for the accounts API.
+
+Starts the app locally (Flask or ASGI), seeds accounts, then runs
+concurrent keep-alive virtual users through a weighted mix of
+create/get/transfer/delete requests. After a warm-up period, latencies
+are recorded in HDR-style histograms and reported as percentiles.
+Reports can be saved as a baseline and later runs compared against it:
+
+    python loadtest.py --profile mixed --users 50 --duration 10 --save-baseline baseline.json
+    python loadtest.py --profile mixed --users 50 --duration 10 --baseline baseline.json
+"""
+import argparse
+import asyncio
+import contextlib
+import json
+import math
+import os
+import random
+import socket
+import subprocess
+import sys
+import time
+
+ROOT = os.path.dirname(os.path.abspath(__file__))
+
+OPERATIONS = ("create", "get", "transfer", "delete")
+
+PROFILES = {
+    "mixed": {"create": 10, "get": 60, "transfer": 25, "delete": 5},
+    "read_heavy": {"create": 2, "get": 95, "transfer": 2, "delete": 1},
+    "write_heavy": {"create": 25, "get": 10, "transfer": 50, "delete": 15},
+}
+
+PERCENTILES = {"p50": 50, "p95": 95, "p99": 99, "p999": 99.9}
+
+SERVERS = {
+    "flask": lambda port: [sys.executable, "-c", f"import api; api.app.run(port={port}, threaded=True)"],
+    "asgi": lambda port: [sys.executable, "-m", "uvicorn", "asgi:app", "--port", str(port),
+                          "--log-level", "warning", "--no-access-log"],
+}
+
+
+class Histogram:
+    """Latency histogram in microseconds with HDR-style log-linear buckets.
+
+    Values keep ``significant_digits`` decimal digits of precision across
+    the whole range, so tail percentiles stay accurate without storing
+    every sample.
+    """
+
+    def __init__(self, significant_digits=3):
+        self.sub_bucket_bits = math.ceil(math.log2(2 * 10 ** significant_digits))
+        self.counts = {}
+        self.total = 0
+        self.max = 0
+
+    def _index(self, value):
+        bucket = max(0, value.bit_length() - self.sub_bucket_bits)
+        return bucket, value >> bucket
+
+    def record(self, seconds):
+        value = max(0, round(seconds * 1_000_000))
+        key = self._index(value)
+        self.counts[key] = self.counts.get(key, 0) + 1
+        self.total += 1
+        self.max = max(self.max, value)
+
+    def merge(self, other):
+        for key, n in other.counts.items():
+            self.counts[key] = self.counts.get(key, 0) + n
+        self.total += other.total
+        self.max = max(self.max, other.max)
+
+    def percentile(self, p):
+        """Latency in seconds below which p percent of the samples fall."""
+        if not self.total:
+            return 0.0
+        rank = max(1, math.ceil(round(p * self.total / 100, 9)))
+        seen = 0
+        for bucket, sub in sorted(self.counts):
+            seen += self.counts[bucket, sub]
+            if seen >= rank:
+                highest = ((sub + 1) << bucket) - 1
+                return min(highest, self.max) / 1_000_000
+        return self.max / 1_000_000
+
+    def summary(self):
+        summary = {"count": self.total}
+        for name, p in PERCENTILES.items():
+            summary[name] = round(self.percentile(p) * 1000, 3)
+        return summary
+
+
+class Client:
+    """Minimal keep-alive HTTP/1.1 client for one virtual user."""
+
+    def __init__(self, port, host="127.0.0.1"):
+        self.host = host
+        self.port = port
+        self.reader = self.writer = None
+
+    async def request(self, method, path, body=None):
+        """Returns the response status and body, or (None, None) if the
+        connection failed; the next request reconnects."""
+        payload = b"" if body is None else json.dumps(body).encode()
+        head = (f"{method} {path} HTTP/1.1\r\nHost: {self.host}\r\nContent-Type: application/json\r\n"
+                f"Content-Length: {len(payload)}\r\n\r\n").encode()
+        try:
+            if self.writer is None:
+                self.reader, self.writer = await asyncio.open_connection(self.host, self.port)
+            self.writer.write(head + payload)
+            status_line = await self.reader.readline()
+            headers = {}
+            while (line := await self.reader.readline()) not in (b"\r\n", b""):
+                name, _, value = line.decode().partition(":")
+                headers[name.strip().lower()] = value.strip()
+            data = await self.reader.readexactly(int(headers.get("content-length", 0)))
+            if headers.get("connection", "").lower() == "close":
+                self.close()
+            return int(status_line.split()[1]), data
+        except (OSError, IndexError, ValueError, asyncio.IncompleteReadError):
+            self.close()
+            return None, None
+
+    def close(self):
+        if self.writer is not None:
+            self.writer.close()
+        self.reader = self.writer = None
+
+
+@contextlib.contextmanager
+def local_app(server="flask", port=None, env=None):
+    """Runs the app in a subprocess and yields its port once it accepts connections."""
+    if port is None:
+        with socket.socket() as s:
+            s.bind(("127.0.0.1", 0))
+            port = s.getsockname()[1]
+    process = subprocess.Popen(SERVERS[server](port), cwd=ROOT, env={**os.environ, **(env or {})},
+                               stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL)
+    try:
+        deadline = time.time() + 15
+        while True:
+            try:
+                socket.create_connection(("127.0.0.1", port), timeout=0.2).close()
+                break
+            except OSError:
+                if time.time() > deadline or process.poll() is not None:
+                    raise RuntimeError(f"{server} app did not start on port {port}")
+                time.sleep(0.1)
+        yield port
+    finally:
+        process.terminate()
+        process.wait()
+
+
+def seed_pesel(i):
+    return f"6{i:010d}"
+
+
+class VirtualUser:
+    """Issues requests picked by profile weight. Reads and transfers go to
+    seeded accounts; each user deletes only accounts it created itself, so
+    users never race each other for the same delete."""
+
+    def __init__(self, port, user, profile, seeded, rng):
+        self.client = Client(port)
+        self.user = user
+        self.seeded = seeded
+        self.rng = rng
+        self.operations, self.weights = zip(*PROFILES[profile].items())
+        self.created = []
+        self.counter = 0
+
+    def next_request(self):
+        operation = self.rng.choices(self.operations, self.weights)[0]
+        if operation == "delete" and not self.created:
+            operation = "create"
+        if operation == "create":
+            self.counter += 1
+            pesel = f"7{self.user:05d}{self.counter:05d}"
+            self.created.append(pesel)
+            return operation, "POST", "/api/accounts", {"name": "Load", "surname": "Test", "pesel": pesel}
+        if operation == "delete":
+            pesel = self.created.pop(self.rng.randrange(len(self.created)))
+            return operation, "DELETE", f"/api/accounts/{pesel}", None
+        pesel = seed_pesel(self.rng.randrange(self.seeded))
+        if operation == "get":
+            return operation, "GET", f"/api/accounts/{pesel}", None
+        return operation, "POST", f"/api/accounts/{pesel}/transfer", {"amount": 1, "type": "incoming"}
+
+    async def run(self, until, report=None):
+        while time.perf_counter() < until:
+            operation, method, path, body = self.next_request()
+            start = time.perf_counter()
+            status, _ = await self.client.request(method, path, body)
+            elapsed = time.perf_counter() - start
+            if report is not None:
+                report.add(operation, status, elapsed)
+
+
+class Report:
+    def __init__(self, profile, users):
+        self.profile = profile
+        self.users = users
+        self.histograms = {op: Histogram() for op in OPERATIONS}
+        self.errors = dict.fromkeys(OPERATIONS, 0)
+        self.duration = 0.0
+
+    def add(self, operation, status, elapsed):
+        if status is not None and status < 300:
+            self.histograms[operation].record(elapsed)
+        else:
+            self.errors[operation] += 1
+
+    def to_dict(self):
+        total = Histogram()
+        for histogram in self.histograms.values():
+            total.merge(histogram)
+        return {
+            "profile": self.profile,
+            "users": self.users,
+            "duration": round(self.duration, 3),
+            "throughput": round(total.total / self.duration, 1) if self.duration else 0.0,
+            "errors": sum(self.errors.values()),
+            "latency_ms": total.summary(),
+            "operations": {op: {**h.summary(), "errors": self.errors[op]}
+                           for op, h in self.histograms.items() if h.total or self.errors[op]},
+        }
+
+
+async def seed(port, accounts):
+    client = Client(port)
+    for i in range(accounts):
+        await client.request("POST", "/api/accounts", {"name": "Load", "surname": "Seed", "pesel": seed_pesel(i)})
+    client.close()
+
+
+async def run_load(port, profile="mixed", users=10, duration=5.0, warmup=1.0, accounts=100, seed_value=0):
+    """Seeds accounts, warms up, then measures the profile for duration seconds."""
+    await seed(port, accounts)
+    rng = random.Random(seed_value)
+    vus = [VirtualUser(port, u, profile, accounts, random.Random(rng.random())) for u in range(users)]
+    report = Report(profile, users)
+
+    await asyncio.gather(*(vu.run(time.perf_counter() + warmup) for vu in vus))
+    start = time.perf_counter()
+    await asyncio.gather(*(vu.run(start + duration, report) for vu in vus))
+    report.duration = time.perf_counter() - start
+
+    for vu in vus:
+        vu.client.close()
+    return report.to_dict()
+
+
+def compare(result, baseline, tolerance=0.25, min_delta_ms=1.0):
+    """Lists regressions of result against baseline: throughput lower, or
+    any latency percentile higher, by more than ``tolerance`` (a fraction).
+    Latency changes under ``min_delta_ms`` are ignored as noise."""
+    regressions = []
+    if result["throughput"] < baseline["throughput"] * (1 - tolerance):
+        regressions.append(f"throughput {result['throughput']} req/s < baseline {baseline['throughput']} req/s")
+    if result["errors"] > baseline["errors"]:
+        regressions.append(f"errors {result['errors']} > baseline {baseline['errors']}")
+    for name in PERCENTILES:
+        now, before = result["latency_ms"][name], baseline["latency_ms"][name]
+        if now > before * (1 + tolerance) and now - before >= min_delta_ms:
+            regressions.append(f"{name} {now} ms > baseline {before} ms")
+    return regressions
+
+
+def format_report(result):
+    lines = [f"{result['profile']}: {result['users']} users, {result['throughput']} req/s, "
+             f"{result['errors']} errors"]
+    rows = [("all", result["latency_ms"])] + list(result["operations"].items())
+    lines.append(f"{'':10}{'count':>8}" + "".join(f"{name:>10}" for name in PERCENTILES))
+    for name, summary in rows:
+        lines.append(f"{name:10}{summary['count']:>8}" + "".join(f"{summary[p]:>10.3f}" for p in PERCENTILES))
+    return "\n".join(lines)
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--server", choices=SERVERS, default="flask")
+    parser.add_argument("--profile", choices=PROFILES, default="mixed")
+    parser.add_argument("--users", type=int, default=10)
+    parser.add_argument("--duration", type=float, default=5.0)
+    parser.add_argument("--warmup", type=float, default=1.0)
+    parser.add_argument("--accounts", type=int, default=100)
+    parser.add_argument("--baseline", help="compare against this baseline report")
+    parser.add_argument("--save-baseline", help="write the report to this file")
+    parser.add_argument("--tolerance", type=float, default=0.25)
+    args = parser.parse_args(argv)
+
+    with local_app(args.server) as port:
+        result = asyncio.run(run_load(port, args.profile, args.users, args.duration, args.warmup, args.accounts))
+    print(format_report(result))
+
+    if args.save_baseline:
+        with open(args.save_baseline, "w") as f:
+            json.dump(result, f, indent=2)
+    if args.baseline:
+        with open(args.baseline) as f:
+            regressions = compare(result, json.load(f), args.tolerance)
+        for regression in regressions:
+            print("REGRESSION:", regression)
+        return 1 if regressions else 0
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
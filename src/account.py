@@ -1,13 +1,33 @@
+import os
+import threading
 from datetime import datetime
 from smtp.smtp import SMTPClient
+from locks import StripedLock
+from metrics import LengthHistogram
+from history import History
+from money import to_grosze, to_zloty
+from pesel import PESEL_LENGTH, age_eligible, is_valid_pesel
+from statements import render_history
+from transfers import apply_batch, apply_transfer
+
+PROMO_BONUS = 50
+
 
 class Account:
+    __slots__ = ("first_name", "last_name", "_history", "pesel", "balance_grosze")
+
+    EXPRESS_FEE = to_grosze(1)
+
+    # Full PESEL validation (digits, birth date, checksum) instead of the
+    # length check alone.
+    STRICT_PESEL = os.getenv("BANK_APP_STRICT_PESEL") == "1"
+
     def __init__(self, first_name, last_name, pesel, promo_code = None):
         self.first_name = first_name
         self.last_name = last_name
         self.history = []
 
-        if len(pesel) == 11:
+        if self._pesel_validation(pesel):
             self.pesel = pesel
         else:
             self.pesel = "Invalid"
@@ -15,13 +35,49 @@ class Account:
         self.balance = 0
 
         if self._promo_code_validation(promo_code) and self._age_validation():
-            self.balance += 50
+            self.balance += PROMO_BONUS
+
+    @classmethod
+    def from_state(cls, first_name, last_name, pesel, balance, history=()):
+        """Rebuilds a stored account without re-running the opening checks."""
+        account = cls.__new__(cls)
+        account.first_name = first_name
+        account.last_name = last_name
+        account.pesel = pesel
+        account.balance = balance
+        account.history = history
+        return account
+
+    @property
+    def balance(self):
+        return to_zloty(self.balance_grosze)
+
+    @balance.setter
+    def balance(self, amount):
+        self.balance_grosze = to_grosze(amount)
+
+    @property
+    def history(self):
+        return self._history
+
+    @history.setter
+    def history(self, amounts):
+        history = History(amounts)
+        previous = getattr(self, "_history", None)
+        if previous is not None:
+            history.track_length(previous.track_length(None))
+        self._history = history
 
     def __eq__(self, other):
         if not isinstance(other, Account):
             return False
         return self.pesel == other.pesel
 
+    def _pesel_validation(self, pesel):
+        if self.STRICT_PESEL:
+            return is_valid_pesel(pesel)
+        return len(pesel) == PESEL_LENGTH
+
     def _promo_code_validation(self, promo_code):
         if promo_code is None:
             return False
@@ -29,56 +85,40 @@ class Account:
             return promo_code.startswith("PROM_")
 
     def _age_validation(self):
-        if self.pesel == "Invalid":
-            return False
-
-        year = int(self.pesel[0:2])
-        month = int(self.pesel[2:4])
-
-        if 1 <= month <= 12:
-            year += 1900
-        elif 21 <= month <= 32:
-            year += 2000
-        elif 41 <= month <= 52:
-            year += 2100
-        elif 61 <= month <= 72:
-            year += 2200
-        elif 81 <= month <= 92:
-            year += 1800
-        else:
-            return False
-
-        current_year = 2026
-        return 1950 <= year <= current_year
+        return age_eligible(self.pesel)
 
     def deposit(self, amount):
-        self.balance += amount
-        self.history.append(amount)
+        grosze = to_grosze(amount)
+        self.balance_grosze += grosze
+        self.history.append_grosze(grosze)
 
     def withdraw(self, amount):
-        if amount > self.balance:
+        grosze = to_grosze(amount)
+        if grosze > self.balance_grosze:
             raise ValueError("Za mało środków")
-        self.balance -= amount
-        self.history.append(-amount)
+        self.balance_grosze -= grosze
+        self.history.append_grosze(-grosze)
 
     def express_transfer(self, amount):
-        if amount > self.balance:
+        grosze = to_grosze(amount)
+        if grosze > self.balance_grosze:
             raise ValueError("Brak środkow")
-        self.balance -= (amount + 1)
-        self.history.append(-amount)
-        self.history.append(-1)
+        self.balance_grosze -= (grosze + self.EXPRESS_FEE)
+        self.history.append_grosze(-grosze)
+        self.history.append_grosze(-self.EXPRESS_FEE)
 
     def submit_for_loan(self, amount):
+        grosze = to_grosze(amount)
         if self.loan_condition1(amount) or self.loan_condition2(amount):
-            self.balance += amount
-            self.history.append(amount)
+            self.balance_grosze += grosze
+            self.history.append_grosze(grosze)
             return True
         else:
             return False
 
     def loan_condition1(self, amount):
         if len(self.history) >= 5:
-            return sum(self.history[-5:]) >= amount
+            return self.history.recent_sum_grosze() >= to_grosze(amount)
         else:
             return False
 
@@ -87,40 +127,198 @@ class Account:
             return False
         return self.history[-1] > 0 and self.history[-2] > 0 and self.history[-3] > 0
 
-    def send_history_via_email(self, email_address: str) -> bool:
+    def _history_email(self, last=None):
         subject = f"Account Transfer History {datetime.now().strftime('%Y-%m-%d')}"
-        text = f"Personal account history: {self.history}"
+        text = f"Personal account history: {render_history(self.history, last)}"
+        return subject, text
+
+    def send_history_via_email(self, email_address: str, last=None) -> bool:
+        subject, text = self._history_email(last)
         try:
             return SMTPClient.send(subject, text, email_address)
         except Exception:
             return False
 
+    def queue_history_email(self, email_address: str, mail_queue, last=None) -> str:
+        """Hands the history email to a MailQueue; returns the message id."""
+        subject, text = self._history_email(last)
+        return mail_queue.enqueue(subject, text, email_address)
+
 
 class AccountsRegistry:
-    def __init__(self):
-        self.accounts = []
+    def __init__(self, journal=None):
+        self.accounts = {}
+        self.journal = journal
+        self._write_lock = threading.Lock()
+        self._account_locks = StripedLock()
+        # Insertion order for cursor paging. Deleted entries become None and
+        # keep their position (so they still work as a cursor) until compaction.
+        self._order = []
+        self._positions = {}
+        self._deleted = 0
+        self._history_lengths = LengthHistogram()
+
+    def _insert(self, account):
+        self.accounts[account.pesel] = account
+        account.history.track_length(self._history_lengths.stripe(account.pesel))
+        self._positions[account.pesel] = len(self._order)
+        self._order.append(account.pesel)
+
+    def _compact(self):
+        self._order = [pesel for pesel in self._order if pesel is not None]
+        self._positions = {pesel: i for i, pesel in enumerate(self._order)}
+        self._deleted = 0
 
     def add_account(self, account):
-        if self.find_by_pesel(account.pesel) is not None:
-            raise ValueError("Pesel already exists")
-        self.accounts.append(account)
+        with self._write_lock:
+            if account.pesel in self.accounts:
+                raise ValueError("Pesel already exists")
+            self._record_create(account)
+            self._insert(account)
+
+    def add_accounts(self, accounts):
+        added = []
+        with self._write_lock:
+            for account in accounts:
+                if account.pesel in self.accounts:
+                    added.append(False)
+                else:
+                    self._record_create(account)
+                    self._insert(account)
+                    added.append(True)
+        return added
+
+    def _record_create(self, account):
+        if self.journal is not None:
+            self.record("create", account.pesel, first_name=account.first_name, last_name=account.last_name,
+                        balance=account.balance, history=account.history.tolist())
+
+    def record(self, op, pesel, **fields):
+        """Appends a change to the journal, if any.
+
+        Call while holding the lock that guards the change, so entries for
+        one account are logged in the order they were applied. Creations are
+        logged before the account becomes visible and deletions after it is
+        gone, which keeps per-account snapshot LSNs consistent.
+        """
+        if self.journal is not None:
+            self.journal.append({"op": op, "pesel": pesel, **fields})
+
+    def commit(self):
+        """Waits until every change recorded so far is durable."""
+        if self.journal is not None:
+            self.journal.sync()
+
+    def replay(self, entries, since=0, versions=None):
+        """Rebuilds state from journal entries without logging them again.
+
+        After a snapshot restore, pass its start LSN as ``since`` and its
+        per-account LSNs as ``versions``: entries the snapshot already
+        reflects are skipped.
+        """
+        versions = versions or {}
+        for entry in entries:
+            op, pesel, lsn = entry["op"], entry["pesel"], entry["lsn"]
+            if op not in ("create", "update", "transfer", "delete"):
+                raise ValueError(f"Unknown journal entry: {op}")
+            if lsn <= since or versions.get(pesel, 0) >= lsn:
+                continue
+            if op == "create":
+                self._insert(Account.from_state(entry["first_name"], entry["last_name"], pesel,
+                                                entry["balance"], entry["history"]))
+                continue
+            account = self.accounts.get(pesel)
+            if account is None:
+                # Deleted while a snapshot was being written, before it got to this account.
+                continue
+            if op == "update":
+                account.first_name = entry.get("first_name", account.first_name)
+                account.last_name = entry.get("last_name", account.last_name)
+            elif op == "transfer":
+                apply_transfer(account, entry["type"], entry["amount"])
+            else:
+                self._remove(pesel)
 
     def find_by_pesel(self, pesel):
-        for account in self.accounts:
-            if account.pesel == pesel:
-                return account
-        return None
+        return self.accounts.get(pesel)
+
+    def _remove(self, pesel):
+        self.accounts.pop(pesel).history.track_length(None)
+        self._order[self._positions[pesel]] = None
+        self._deleted += 1
+        if self._deleted > 1000 and self._deleted * 2 > len(self._order):
+            self._compact()
 
     def delete_by_pesel(self, pesel):
-        account = self.find_by_pesel(pesel)
-        if account is None:
-            return False
+        # The account stripe first, so an update or transfer that already
+        # found the account finishes (and is journaled) before it is gone.
+        with self.account_lock(pesel), self._write_lock:
+            if pesel not in self.accounts:
+                return False
+            self._remove(pesel)
+            self.record("delete", pesel)
+            return True
 
-        self.accounts = [acc for acc in self.accounts if acc.pesel != pesel]
+    def clear(self):
+        with self._write_lock:
+            self.accounts.clear()
+            self._order = []
+            self._positions = {}
+            self._deleted = 0
+            self._history_lengths = LengthHistogram()
+
+    def update_account(self, pesel, **changes):
+        """Sets the given attributes (first_name, last_name); False if not found."""
+        with self.account_lock(pesel):
+            account = self.accounts.get(pesel)
+            if account is None:
+                return False
+            for field, value in changes.items():
+                setattr(account, field, value)
+            if changes:
+                self.record("update", pesel, **changes)
+        return True
+
+    def transfer(self, pesel, transfer_type, amount):
+        """Applies one transfer; False if not found, ValueError if it is refused."""
+        with self.account_lock(pesel):
+            account = self.accounts.get(pesel)
+            if account is None:
+                return False
+            apply_transfer(account, transfer_type, amount)
+            self.record("transfer", pesel, type=transfer_type, amount=amount)
         return True
 
+    def apply_batch(self, items, atomic=False):
+        return apply_batch(self, items, atomic)
+
+    def account_lock(self, pesel):
+        return self._account_locks.for_key(pesel)
+
+    def lock_accounts(self, pesels):
+        return self._account_locks.hold_many(pesels)
+
     def get_all_accounts(self):
-        return self.accounts
+        return list(self.accounts.values())
+
+    def iter_accounts(self, after=None):
+        """Yields accounts in insertion order, starting after the given PESEL.
+
+        Raises KeyError for a cursor PESEL the registry has never seen.
+        """
+        with self._write_lock:
+            order = self._order
+            start = 0 if after is None else self._positions[after] + 1
+        for i in range(start, len(order)):
+            pesel = order[i]
+            if pesel is not None:
+                account = self.accounts.get(pesel)
+                if account is not None:
+                    yield account
 
     def count_accounts(self):
         return len(self.accounts)
+
+    def history_lengths(self):
+        """(bucket counts, sum) of history lengths, see metrics.LengthHistogram."""
+        return self._history_lengths.snapshot()
@@ -1,13 +1,45 @@
 import os
+import time
 import requests
 from datetime import datetime
 from smtp.smtp import SMTPClient
+from history import History
+from money import to_grosze, to_zloty
+from statements import render_history
+from mf.cache import NipValidationCache
+from mf.session import make_session
+from mf.batch import validate_concurrently
+from mf.breaker import CircuitBreaker
 
 
 
 class BuisnessAccount: # pragma: no cover
+    __slots__ = ("company_name", "balance_grosze", "_history", "nip")
     MF_API_URL = os.getenv('BANK_APP_MF_URL', 'https://wl-test.mf.gov.pl')
-    def __init__(self, company_name, nip):
+    ZUS_PAYMENT = -1775
+    TRANSACTION_TAGS = {ZUS_PAYMENT: "zus"}
+    EXPRESS_FEE = to_grosze(5)
+    nip_cache = NipValidationCache(
+        ttl=float(os.getenv('BANK_APP_MF_CACHE_TTL', '3600')),
+        negative_ttl=float(os.getenv('BANK_APP_MF_CACHE_NEGATIVE_TTL', '300')),
+        maxsize=int(os.getenv('BANK_APP_MF_CACHE_SIZE', '10000')),
+        path=os.getenv('BANK_APP_MF_CACHE_FILE'),
+    )
+    # Transient errors are retried by _query_mf, not the session, so each
+    # attempt is checked against the deadline and seen by the breaker.
+    session = make_session(pool_size=int(os.getenv('BANK_APP_MF_POOL_SIZE', '10')), retries=0)
+    MF_RETRIES = int(os.getenv('BANK_APP_MF_RETRIES', '2'))
+    MF_BACKOFF = float(os.getenv('BANK_APP_MF_BACKOFF', '0.1'))
+    MF_TRANSIENT_STATUSES = (502, 503, 504)
+    # Rate limiting says nothing about the NIP but much about MF's health.
+    MF_THROTTLED_STATUS = 429
+    MF_CONCURRENCY = int(os.getenv('BANK_APP_MF_CONCURRENCY', '10'))
+    MF_TIMEOUT = float(os.getenv('BANK_APP_MF_TIMEOUT', '5'))
+    mf_breaker = CircuitBreaker(
+        failure_threshold=int(os.getenv('BANK_APP_MF_BREAKER_THRESHOLD', '5')),
+        reset_timeout=float(os.getenv('BANK_APP_MF_BREAKER_RESET', '30')),
+    )
+    def __init__(self, company_name, nip, mf_result=None, deadline=None):
         self.company_name = company_name
         self.balance = 0
         self.history = []
@@ -17,21 +49,88 @@ class BuisnessAccount: # pragma: no cover
             return
         self.nip = nip
 
-        if not self._nip_validation():
+        if mf_result is None:
+            mf_result = self._nip_validation() if deadline is None else self._check_nip(nip, deadline)
+        if not mf_result:
             raise ValueError("Company not registered!!")
 
+    @property
+    def balance(self):
+        return to_zloty(self.balance_grosze)
+
+    @balance.setter
+    def balance(self, amount):
+        self.balance_grosze = to_grosze(amount)
+
+    @property
+    def history(self):
+        return self._history
+
+    @history.setter
+    def history(self, amounts):
+        self._history = History(amounts, tags=self.TRANSACTION_TAGS)
+
     def calculate_tax(self):
         return 0.19
 
     def _validate_nip_in_mf(self, nip: str) -> bool:
+        return self._query_mf(nip) is True
+
+    @classmethod
+    def _query_mf(cls, nip: str, deadline=None):
+        """Returns True/False for a definite MF answer, None when MF could not answer.
+
+        Only a 200 (with or without a subject) or a 404 is an answer; any
+        other status gives None, so it is never cached as a rejection.
+
+        Connection errors and 502/503/504 answers are retried up to
+        MF_RETRIES times with exponential backoff. deadline is a
+        time.monotonic() instant: each attempt's timeout is cut to the time
+        left, and no attempt or backoff starts that would end past it.
+        """
+        for attempt in range(cls.MF_RETRIES + 1):
+            if attempt:
+                delay = cls.MF_BACKOFF * 2 ** (attempt - 1)
+                if deadline is not None and time.monotonic() + delay >= deadline:
+                    return None
+                time.sleep(delay)
+            timeout = cls.MF_TIMEOUT
+            if deadline is not None:
+                timeout = min(timeout, deadline - time.monotonic())
+                if timeout <= 0:
+                    return None
+            if not cls.mf_breaker.allow():
+                return None
+
+            start = time.monotonic()
+            try:
+                response = cls.session.get(
+                    f"{cls.MF_API_URL}/api/search/nip/{nip}?date=2026-02-01",
+                    timeout=timeout
+                )
+            except requests.ConnectionError:
+                cls.mf_breaker.record_failure(time.monotonic() - start)
+                continue
+            except Exception:
+                cls.mf_breaker.record_failure(time.monotonic() - start)
+                return None
+
+            if response.status_code >= 500 or response.status_code == cls.MF_THROTTLED_STATUS:
+                cls.mf_breaker.record_failure(time.monotonic() - start)
+                if response.status_code in cls.MF_TRANSIENT_STATUSES:
+                    continue
+                return None
+            cls.mf_breaker.record_success(time.monotonic() - start)
+            return cls._parse_mf_response(response)
+        return None
+
+    @staticmethod
+    def _parse_mf_response(response):
         try:
-            response = requests.get(
-                f"{self.MF_API_URL}/api/search/nip/{nip}?date=2026-02-01",
-                timeout=5
-            )
-
-            if response.status_code != 200:
+            if response.status_code == 404:
                 return False
+            if response.status_code != 200:
+                return None
 
             data = response.json()
             result = data.get("result")
@@ -42,43 +141,81 @@ class BuisnessAccount: # pragma: no cover
             return result["subject"].get("statusVat") == "Czynny"
 
         except Exception:
-            return False
+            return None
+
+    @classmethod
+    def mf_stats(cls) -> dict:
+        return {"breaker": cls.mf_breaker.stats(), "cache": cls.nip_cache.stats()}
 
     def deposit(self, amount):
-        self.balance += amount
-        self.history.append(amount)
+        grosze = to_grosze(amount)
+        self.balance_grosze += grosze
+        self.history.append_grosze(grosze)
 
     def withdraw(self, amount):
-        if amount > self.balance:
+        grosze = to_grosze(amount)
+        if grosze > self.balance_grosze:
             raise ValueError("Za mało środków")
-        self.balance -= amount
-        self.history.append(-amount)
+        self.balance_grosze -= grosze
+        self.history.append_grosze(-grosze)
 
     def express_transfer(self, amount):
-        if amount > self.balance:
+        grosze = to_grosze(amount)
+        if grosze > self.balance_grosze:
             raise ValueError("Brak środków")
-        self.balance -= (amount + 5)
-        self.history.append(-amount)
-        self.history.append(-5)
+        self.balance_grosze -= (grosze + self.EXPRESS_FEE)
+        self.history.append_grosze(-grosze)
+        self.history.append_grosze(-self.EXPRESS_FEE)
 
     def take_loan(self, amount):
-        has_enough_balance = self.balance >= 2 * amount
-        has_zus_transfer = -1775 in self.history
+        grosze = to_grosze(amount)
+        has_enough_balance = self.balance_grosze >= 2 * grosze
+        has_zus_transfer = self.history.tag_count("zus") > 0
 
         if has_enough_balance and has_zus_transfer:
-            self.balance += amount
-            self.history.append(amount)
+            self.balance_grosze += grosze
+            self.history.append_grosze(grosze)
             return True
         else:
             return False
 
     def _nip_validation(self) -> bool:
-        return self._validate_nip_in_mf(self.nip)
+        return self._check_nip(self.nip)
+
+    @classmethod
+    def _check_nip(cls, nip: str, deadline=None) -> bool:
+        valid = cls.nip_cache.get(nip)
+        if valid is None:
+            valid = cls._query_mf(nip, deadline)
+            if valid is None:
+                return False
+            cls.nip_cache.put(nip, valid)
+        return valid
+
+    @classmethod
+    def validate_nips(cls, nips, max_workers=None, deadline=None) -> dict:
+        """Checks many NIPs against MF concurrently, each distinct NIP once.
+
+        Pass result[nip] as mf_result to the constructor to skip the lookup.
+        """
+        def check(nip):
+            return len(nip) == 10 and cls._check_nip(nip, deadline)
 
-    def send_history_via_email(self, email_address: str) -> bool:
+        return validate_concurrently(nips, check, max_workers or cls.MF_CONCURRENCY)
+
+    def _history_email(self, last=None):
         subject = f"Account Transfer History {datetime.now().strftime('%Y-%m-%d')}"
-        text = f"Company account history: {self.history}"
+        text = f"Company account history: {render_history(self.history, last)}"
+        return subject, text
+
+    def send_history_via_email(self, email_address: str, last=None) -> bool:
+        subject, text = self._history_email(last)
         try:
             return SMTPClient.send(subject, text, email_address)
         except Exception:
             return False
+
+    def queue_history_email(self, email_address: str, mail_queue, last=None) -> str:
+        """Hands the history email to a MailQueue; returns the message id."""
+        subject, text = self._history_email(last)
+        return mail_queue.enqueue(subject, text, email_address)
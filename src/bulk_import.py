@@ -0,0 +1,170 @@
+import codecs
+import gc
+import json
+
+from account import PROMO_BONUS, Account
+from pesel import classify_pesels
+
+CHUNK_SIZE = 64 * 1024
+MAX_ROW_BYTES = 1024 * 1024
+BATCH_SIZE = 1000
+
+INVALID_ROW = object()
+
+_decoder = json.JSONDecoder()
+_WHITESPACE = " \t\r\n"
+
+
+def _read_lines(stream, chunk_size):
+    tail = b""
+    while True:
+        chunk = stream.read(chunk_size)
+        if not chunk:
+            break
+        lines = (tail + chunk).split(b"\n")
+        tail = lines.pop()
+        if len(tail) > MAX_ROW_BYTES:
+            raise ValueError("Row too large")
+        yield from lines
+    if tail:
+        yield tail
+
+
+def iter_ndjson(stream, chunk_size=CHUNK_SIZE):
+    for line in _read_lines(stream, chunk_size):
+        line = line.strip()
+        if not line:
+            continue
+        try:
+            yield json.loads(line)
+        except ValueError:
+            yield INVALID_ROW
+
+
+def _read_chunks(stream, chunk_size):
+    decoder = codecs.getincrementaldecoder("utf-8")()
+    while True:
+        chunk = stream.read(chunk_size)
+        if not chunk:
+            return
+        yield decoder.decode(chunk) if isinstance(chunk, bytes) else chunk
+
+
+def iter_json_array(stream, chunk_size=CHUNK_SIZE):
+    """Yields the elements of a top-level JSON array without reading it whole."""
+    chunks = _read_chunks(stream, chunk_size)
+    buf = ""
+    pos = 0
+    state = "start"
+
+    while True:
+        while pos < len(buf) and buf[pos] in _WHITESPACE:
+            pos += 1
+        if pos == len(buf):
+            chunk = next(chunks, None)
+            if chunk is None:
+                raise ValueError("Unexpected end of JSON array")
+            buf, pos = chunk, 0
+            continue
+
+        char = buf[pos]
+        if state == "start":
+            if char != "[":
+                raise ValueError("Expected JSON array")
+            pos += 1
+            state = "first"
+            continue
+        if state != "value" and char == "]":
+            return
+        if state == "next":
+            if char != ",":
+                raise ValueError("Expected ',' or ']'")
+            pos += 1
+            state = "value"
+            continue
+
+        try:
+            value, end = _decoder.raw_decode(buf, pos)
+        except ValueError:
+            end = None
+        if end is None or end == len(buf):
+            # The value may continue in the next chunk.
+            if len(buf) - pos > MAX_ROW_BYTES:
+                raise ValueError("Row too large")
+            chunk = next(chunks, None)
+            if chunk is not None:
+                buf, pos = buf[pos:] + chunk, 0
+                continue
+            if end is None:
+                raise ValueError("Invalid JSON")
+
+        yield value
+        pos = end
+        state = "next"
+
+
+def _row_fields(row):
+    """(name, surname, pesel, promo_code) of a well-typed row, else None."""
+    if not isinstance(row, dict):
+        return None
+    fields = (row.get("name"), row.get("surname"), row.get("pesel"))
+    promo_code = row.get("promo_code")
+    if not all(isinstance(f, str) for f in fields) or not (promo_code is None or isinstance(promo_code, str)):
+        return None
+    return fields + (promo_code,)
+
+
+def validate_row(row):
+    fields = _row_fields(row)
+    if fields is None:
+        return None
+    account = Account(*fields)
+    return None if account.pesel == "Invalid" else account
+
+
+def build_accounts(rows):
+    """Accounts for (name, surname, pesel, promo_code) rows, with the PESEL
+    checks of the whole batch done by classify_pesels. Rows with an
+    invalid PESEL get None."""
+    valid, _, eligible = classify_pesels([pesel for _, _, pesel, _ in rows], strict=Account.STRICT_PESEL)
+    accounts = []
+    # As in snapshot loading: collections triggered while allocating the
+    # batch would only rescan the accounts created so far.
+    gc_was_enabled = gc.isenabled()
+    gc.disable()
+    try:
+        for (name, surname, pesel, promo_code), ok, old_enough in zip(rows, valid, eligible):
+            if not ok:
+                accounts.append(None)
+                continue
+            account = Account.from_state(name, surname, pesel, 0)
+            if old_enough and account._promo_code_validation(promo_code):
+                account.balance = PROMO_BONUS
+            accounts.append(account)
+    finally:
+        if gc_was_enabled:
+            gc.enable()
+    return accounts
+
+
+def import_accounts(registry, rows, batch_size=BATCH_SIZE):
+    """Validates rows and inserts them in batches, yielding one result per row."""
+    batch = []
+
+    def flush():
+        built = iter(build_accounts([fields for _, fields in batch if fields is not None]))
+        accounts = [(index, None if fields is None else next(built)) for index, fields in batch]
+        added = iter(registry.add_accounts([account for _, account in accounts if account is not None]))
+        for index, account in accounts:
+            if account is None:
+                yield {"row": index, "status": "invalid"}
+            else:
+                yield {"row": index, "pesel": account.pesel, "status": "created" if next(added) else "duplicate"}
+        batch.clear()
+
+    for index, row in enumerate(rows):
+        batch.append((index, None if row is INVALID_ROW else _row_fields(row)))
+        if len(batch) >= batch_size:
+            yield from flush()
+
+    yield from flush()
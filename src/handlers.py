@@ -0,0 +1,226 @@
+"""Request handling shared by the Flask (api.py) and ASGI (asgi.py) apps.
+
+Each handler takes the registry and the parsed parts of a request (JSON
+body, path and query parameters) and returns the response body and
+status code. A body of None means an empty response, and a Stream is
+sent chunk by chunk. The apps only parse requests and serialize
+responses, so validation and status mapping live here once.
+"""
+import json
+from itertools import islice
+from typing import Iterator, NamedTuple
+
+from account import Account
+from bulk_import import import_accounts
+from smtp.queue import MailQueueFull
+from transfers import MAX_BATCH_SIZE, TRANSFER_TYPES
+
+DEFAULT_PAGE_SIZE = 100
+MAX_PAGE_SIZE = 1000
+STREAM_CHUNK_SIZE = 1000
+STREAM_FORMATS = {"json": "application/json", "ndjson": "application/x-ndjson"}
+
+
+class Stream(NamedTuple):
+    chunks: Iterator[str]
+    content_type: str
+
+
+def error(message, status):
+    return {"error": message}, status
+
+
+def account_to_dict(acc: Account):
+    return {
+        "name": acc.first_name,
+        "surname": acc.last_name,
+        "pesel": acc.pesel,
+        "balance": acc.balance,
+    }
+
+
+def stream_accounts(accounts, fmt):
+    accounts = iter(accounts)
+    if fmt == "json":
+        yield "["
+    first = True
+    while True:
+        chunk = [json.dumps(account_to_dict(a)) for a in islice(accounts, STREAM_CHUNK_SIZE)]
+        if not chunk:
+            break
+        if fmt == "ndjson":
+            yield "\n".join(chunk) + "\n"
+        else:
+            yield ("" if first else ",") + ",".join(chunk)
+        first = False
+    if fmt == "json":
+        yield "]"
+
+
+def create_account(registry, data):
+    if not isinstance(data, dict):
+        return error("Invalid JSON", 400)
+    if not all(k in data for k in ("name", "surname", "pesel")):
+        return error("Missing fields", 400)
+    if not all(isinstance(data[k], str) for k in ("name", "surname", "pesel")):
+        return error("Invalid fields", 400)
+
+    acc = Account(data["name"], data["surname"], data["pesel"])
+    if acc.pesel == "Invalid":
+        return error("Invalid pesel", 400)
+    try:
+        registry.add_account(acc)
+    except ValueError:
+        return error("Pesel already exists", 409)
+
+    registry.commit()
+    return None, 201
+
+
+def import_stream(registry, rows):
+    """Imports rows lazily as the returned stream is sent: one result line
+    per row, then the totals."""
+    def generate():
+        counts = {"created": 0, "duplicate": 0, "invalid": 0}
+        try:
+            for result in import_accounts(registry, rows):
+                counts[result["status"]] += 1
+                yield json.dumps(result) + "\n"
+        except ValueError as e:
+            yield json.dumps({"error": str(e)}) + "\n"
+        registry.commit()
+        yield json.dumps(counts) + "\n"
+
+    return Stream(generate(), "application/x-ndjson"), 200
+
+
+def list_accounts(registry, args):
+    fmt = args.get("stream")
+    if fmt is not None:
+        if fmt not in STREAM_FORMATS:
+            return error("Unknown stream format", 400)
+        return Stream(stream_accounts(registry.iter_accounts(), fmt), STREAM_FORMATS[fmt]), 200
+
+    if "limit" not in args and "after" not in args:
+        return [account_to_dict(a) for a in registry.get_all_accounts()], 200
+
+    try:
+        limit = int(args.get("limit", DEFAULT_PAGE_SIZE))
+    except ValueError:
+        limit = 0
+    if not 1 <= limit <= MAX_PAGE_SIZE:
+        return error("Invalid limit", 400)
+
+    try:
+        page = list(islice(registry.iter_accounts(args.get("after")), limit))
+    except KeyError:
+        return error("Unknown cursor", 400)
+
+    next_cursor = page[-1].pesel if len(page) == limit else None
+    return {"accounts": [account_to_dict(a) for a in page], "next": next_cursor}, 200
+
+
+def count_accounts(registry):
+    return {"count": registry.count_accounts()}, 200
+
+
+def get_account(registry, pesel):
+    acc = registry.find_by_pesel(pesel)
+    if acc is None:
+        return error("Not found", 404)
+    return account_to_dict(acc), 200
+
+
+def update_account(registry, pesel, data):
+    if registry.find_by_pesel(pesel) is None:
+        return error("Not found", 404)
+    if not isinstance(data, dict):
+        return error("Invalid JSON", 400)
+
+    changes = {}
+    if "name" in data:
+        changes["first_name"] = data["name"]
+    if "surname" in data:
+        changes["last_name"] = data["surname"]
+    if not all(isinstance(value, str) for value in changes.values()):
+        return error("Invalid fields", 400)
+    if not registry.update_account(pesel, **changes):
+        return error("Not found", 404)
+
+    registry.commit()
+    return None, 200
+
+
+def delete_account(registry, pesel):
+    if not registry.delete_by_pesel(pesel):
+        return error("Not found", 404)
+    registry.commit()
+    return None, 200
+
+
+def transfer(registry, pesel, data):
+    if registry.find_by_pesel(pesel) is None:
+        return error("Not found", 404)
+    if not isinstance(data, dict):
+        return error("Invalid JSON", 400)
+    if "amount" not in data or "type" not in data:
+        return error("Missing fields", 400)
+    if data["type"] not in TRANSFER_TYPES:
+        return error("Unknown transfer type", 400)
+
+    try:
+        if not registry.transfer(pesel, data["type"], data["amount"]):
+            return error("Not found", 404)
+    except ValueError as e:
+        return error(str(e), 422)
+    except TypeError:
+        return error("Invalid amount", 400)
+
+    registry.commit()
+    return {"message": "Zlecenie przyjęto do realizacji"}, 200
+
+
+def email_history(registry, mail_queue, pesel, data):
+    if registry.find_by_pesel(pesel) is None:
+        return error("Not found", 404)
+    if not isinstance(data, dict) or not isinstance(data.get("email"), str):
+        return error("Invalid JSON", 400)
+    last = data.get("last")
+    if last is not None and (type(last) is not int or last < 1):
+        return error("Invalid last", 400)
+
+    try:
+        with registry.account_lock(pesel):
+            acc = registry.find_by_pesel(pesel)
+            if acc is None:
+                return error("Not found", 404)
+            message_id = acc.queue_history_email(data["email"], mail_queue, last)
+    except MailQueueFull:
+        return error("Mail queue is full", 503)
+    return {"id": message_id}, 202
+
+
+def mail_status(mail_queue, message_id):
+    status = mail_queue.status(message_id)
+    if status is None:
+        return error("Not found", 404)
+    return status, 200
+
+
+def transfer_batch(registry, data):
+    atomic = False
+    if isinstance(data, dict):
+        atomic = data.get("atomic", False)
+        if not isinstance(atomic, bool):
+            return error("Invalid atomic", 400)
+        data = data.get("transfers")
+    if not isinstance(data, list):
+        return error("Invalid JSON", 400)
+    if len(data) > MAX_BATCH_SIZE:
+        return error("Batch too large", 413)
+
+    results = registry.apply_batch(data, atomic)
+    registry.commit()
+    if atomic and any(r["status"] != 200 for r in results):
+        return {"results": results}, 422
+    return {"results": results}, 200
@@ -0,0 +1,187 @@
+from array import array
+
+from money import to_grosze, to_zloty
+
+# Shared read-only store for histories that have no entries yet; it is
+# replaced by a private array on the first write.
+_EMPTY = array("q")
+_NO_TAGS = {}
+# Tag maps converted to grosze, shared by every history with the same tags.
+_GROSZE_TAGS = {}
+
+
+def _grosze_tags(tags):
+    key = tuple(tags.items())
+    converted = _GROSZE_TAGS.get(key)
+    if converted is None:
+        converted = _GROSZE_TAGS[key] = {to_grosze(amount): tag for amount, tag in tags.items()}
+    return converted
+
+
+class History:
+    """Transaction amounts as 64-bit integer grosze with O(1) loan-rule aggregates.
+
+    Amounts go in and come out in złoty (see money.py), but are stored
+    and summed as exact grosze, so aggregates never drift. The total, the
+    sum of the last WINDOW amounts and the number of occurrences of each
+    tagged amount are kept up to date on append, so neither total() nor
+    the loan checks scan or slice the history. The ``*_grosze`` methods skip the conversion.
+
+    ``tags`` maps notable amounts to a category name, e.g. {-1775: "zus"};
+    several amounts may share one category.
+    """
+
+    __slots__ = ("_amounts", "_total", "_window_sum", "_tags", "_counts", "_lengths")
+
+    WINDOW = 5
+
+    def __init__(self, amounts=(), tags=None):
+        self._amounts = _EMPTY
+        self._total = 0
+        self._window_sum = 0
+        self._tags = _NO_TAGS if tags is None else _grosze_tags(tags)
+        self._counts = None
+        self._lengths = None
+        if amounts:
+            self.extend(amounts)
+
+    def __getstate__(self):
+        # Copies (and accounts sent between processes) are not tracked.
+        return self._amounts, self._total, self._window_sum, self._tags, self._counts
+
+    def __setstate__(self, state):
+        self._amounts, self._total, self._window_sum, self._tags, self._counts = state
+        self._lengths = None
+
+    def track_length(self, histogram):
+        """Reports this history's length to histogram (a LengthHistogram
+        stripe) from now on (None stops); returns the one it reported to
+        before."""
+        previous = self._lengths
+        if previous is not None:
+            previous.remove(len(self._amounts))
+        self._lengths = histogram
+        if histogram is not None:
+            histogram.add(len(self._amounts))
+        return previous
+
+    def _count(self, grosze, n):
+        if self._counts is None:
+            self._counts = dict.fromkeys(self._tags, 0)
+        self._counts[grosze] += n
+
+    def append(self, amount):
+        self.append_grosze(to_grosze(amount))
+
+    def append_grosze(self, grosze):
+        amounts = self._amounts
+        if amounts is _EMPTY:
+            self._amounts = amounts = array("q")
+        amounts.append(grosze)
+
+        n = len(amounts)
+        self._total += grosze
+        self._window_sum += grosze
+        if n > self.WINDOW:
+            self._window_sum -= amounts[n - self.WINDOW - 1]
+
+        if grosze in self._tags:
+            self._count(grosze, 1)
+        if self._lengths is not None:
+            self._lengths.resize(n - 1, n)
+
+    def extend(self, amounts):
+        self.extend_grosze(array("q", map(to_grosze, amounts)))
+
+    def extend_grosze(self, grosze):
+        added = array("q", grosze)
+        length = len(self._amounts)
+        if self._amounts is _EMPTY:
+            self._amounts = added
+        else:
+            self._amounts.extend(added)
+        self._total += sum(added)
+        self._window_sum = sum(self._amounts[-self.WINDOW:])
+        for amount in self._tags:
+            n = added.count(amount)
+            if n:
+                self._count(amount, n)
+        if self._lengths is not None:
+            self._lengths.resize(length, length + len(added))
+
+    def tag_count(self, tag):
+        """Number of entries whose amount is tagged with the given category."""
+        if self._counts is None:
+            return 0
+        return sum(n for amount, n in self._counts.items() if self._tags[amount] == tag)
+
+    def tag_counts(self):
+        counts = dict.fromkeys(self._tags.values(), 0)
+        for amount, n in (self._counts or {}).items():
+            counts[self._tags[amount]] += n
+        return counts
+
+    def recent_sum(self):
+        """Sum of the last WINDOW amounts (fewer if the history is shorter)."""
+        return to_zloty(self._window_sum)
+
+    def recent_sum_grosze(self):
+        return self._window_sum
+
+    def total(self):
+        return to_zloty(self.total_grosze())
+
+    def total_grosze(self):
+        """Exact sum of all amounts (a Python int, so it never overflows)."""
+        return self._total
+
+    def tolist(self):
+        return list(map(to_zloty, self._amounts))
+
+    def tobytes(self):
+        """The amounts as native 64-bit grosze."""
+        return self._amounts.tobytes()
+
+    def __len__(self):
+        return len(self._amounts)
+
+    def __iter__(self):
+        return map(to_zloty, self._amounts)
+
+    def __getitem__(self, index):
+        if isinstance(index, slice):
+            return list(map(to_zloty, self._amounts[index]))
+        return to_zloty(self._amounts[index])
+
+    def __delitem__(self, index):
+        removed = self._amounts[index]
+        length = len(self._amounts)
+        if self._amounts is not _EMPTY:
+            del self._amounts[index]
+        removed = removed if isinstance(index, slice) else [removed]
+        self._total -= sum(removed)
+        for amount in removed:
+            if amount in self._tags:
+                self._count(amount, -1)
+        self._window_sum = sum(self._amounts[-self.WINDOW:])
+        if self._lengths is not None:
+            self._lengths.resize(length, len(self._amounts))
+
+    def __contains__(self, amount):
+        try:
+            grosze = to_grosze(amount)
+        except (TypeError, ValueError):
+            return False
+        if grosze in self._tags:
+            return self._counts is not None and self._counts[grosze] > 0
+        return grosze in self._amounts
+
+    def __eq__(self, other):
+        if isinstance(other, History):
+            return self._amounts == other._amounts
+        if isinstance(other, list):
+            return self.tolist() == other
+        return NotImplemented
+
+    def __repr__(self):
+        return repr(self.tolist())
@@ -0,0 +1,134 @@
+import json
+import os
+import shutil
+import threading
+
+FSYNC_MODES = ("always", "group", "never")
+
+
+class Journal:
+    """Append-only JSON-lines log of registry changes.
+
+    Every entry carries a log sequence number ("lsn") that keeps growing
+    across restarts and truncation. Truncation can empty the file, so
+    pass the start LSN of the snapshot it was truncated to as
+    ``start_lsn``; numbering then continues after it.
+
+    fsync modes:
+      always - every append is flushed and fsynced before it returns;
+      group  - appends only buffer; sync() fsyncs everything appended so far,
+               so concurrent callers share one fsync (group commit);
+      never  - every append is flushed to the OS, which decides when to write.
+    """
+
+    def __init__(self, path, fsync="group", start_lsn=0):
+        if fsync not in FSYNC_MODES:
+            raise ValueError(f"Unknown fsync mode: {fsync}")
+        self.path = path
+        self.fsync = fsync
+        self._file = open(path, "ab")
+        self._lock = threading.Lock()
+        self._sync_lock = threading.Lock()
+        self._appended = self._synced = max(self._last_logged_lsn(), start_lsn)
+
+    @property
+    def last_lsn(self):
+        return self._appended
+
+    def _last_logged_lsn(self):
+        with open(self.path, "rb") as f:
+            end = f.seek(0, os.SEEK_END)
+            block = 64 * 1024
+            while True:
+                start = max(end - block, 0)
+                f.seek(start)
+                # Drop the torn tail, if any, and a line cut off by the block start.
+                lines = f.read(end - start).split(b"\n")[1 if start else 0:-1]
+                if lines:
+                    return json.loads(lines[-1])["lsn"]
+                if not start:
+                    return 0
+                block *= 4
+
+    def read(self):
+        """Yields logged entries in order.
+
+        A torn last line (crash mid-write) ends the log and is cut off so
+        later appends start on a clean line.
+        """
+        valid = 0
+        with open(self.path, "rb") as f:
+            for line in f:
+                try:
+                    entry = json.loads(line)
+                except ValueError:
+                    break
+                if not line.endswith(b"\n"):
+                    break
+                valid += len(line)
+                yield entry
+        if valid != os.path.getsize(self.path):
+            with self._lock:
+                self._file.flush()
+                self._file.truncate(valid)
+
+    def append(self, entry):
+        with self._lock:
+            self._appended += 1
+            line = json.dumps({"lsn": self._appended, **entry}, separators=(",", ":")).encode() + b"\n"
+            self._file.write(line)
+            if self.fsync == "never":
+                self._file.flush()
+            elif self.fsync == "always":
+                self._file.flush()
+                os.fsync(self._file.fileno())
+                self._synced = self._appended
+
+    def sync(self):
+        """Makes every entry appended before this call durable."""
+        if self.fsync != "group":
+            return
+        with self._lock:
+            target = self._appended
+        with self._sync_lock:
+            if self._synced >= target:
+                return
+            with self._lock:
+                self._file.flush()
+                target = self._appended
+            os.fsync(self._file.fileno())
+            self._synced = target
+
+    def truncate(self, lsn):
+        """Drops entries up to and including lsn, e.g. once a snapshot covers them."""
+        with self._lock:
+            self._file.flush()
+        offset = 0
+        with open(self.path, "rb") as f:
+            for line in f:
+                try:
+                    if json.loads(line)["lsn"] > lsn:
+                        break
+                except ValueError:
+                    break
+                offset += len(line)
+        if not offset:
+            return
+        tmp_path = f"{self.path}.tmp"
+        with self._sync_lock, self._lock:
+            self._file.flush()
+            with open(self.path, "rb") as src, open(tmp_path, "wb") as dst:
+                src.seek(offset)
+                shutil.copyfileobj(src, dst)
+                dst.flush()
+                os.fsync(dst.fileno())
+            self._file.close()
+            os.replace(tmp_path, self.path)
+            self._file = open(self.path, "ab")
+            self._synced = self._appended
+
+    def close(self):
+        with self._lock:
+            self._file.flush()
+            os.fsync(self._file.fileno())
+            self._file.close()
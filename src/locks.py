@@ -0,0 +1,25 @@
+import threading
+from contextlib import contextmanager
+
+
+class StripedLock:
+    """Fixed pool of locks shared by keys hashing to the same stripe."""
+
+    def __init__(self, stripes=64):
+        self._locks = [threading.Lock() for _ in range(stripes)]
+
+    def for_key(self, key):
+        return self._locks[hash(key) % len(self._locks)]
+
+    @contextmanager
+    def hold_many(self, keys):
+        # Stripes are taken in index order so concurrent callers cannot deadlock.
+        indexes = sorted({hash(key) % len(self._locks) for key in keys})
+        locks = [self._locks[i] for i in indexes]
+        for lock in locks:
+            lock.acquire()
+        try:
+            yield
+        finally:
+            for lock in reversed(locks):
+                lock.release()
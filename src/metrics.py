@@ -0,0 +1,168 @@
+import threading
+from bisect import bisect_left
+
+# Upper bounds in seconds, as in the Prometheus client defaults plus
+# sub-millisecond buckets for in-memory routes.
+LATENCY_BUCKETS = (0.0001, 0.00025, 0.0005, 0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10)
+HISTORY_BUCKETS = (0, 1, 5, 10, 25, 50, 100, 250, 500, 1000, 5000, 10000)
+
+
+def _labels(**labels):
+    escaped = (str(v).replace("\\", "\\\\").replace('"', '\\"').replace("\n", "\\n") for v in labels.values())
+    return ",".join(f'{k}="{v}"' for k, v in zip(labels, escaped))
+
+
+def _format(value):
+    return repr(float(value)) if isinstance(value, float) else str(value)
+
+
+def _sample(name, labels, value):
+    return f"{name}{{{labels}}} {_format(value)}" if labels else f"{name} {_format(value)}"
+
+
+def _histogram(name, labels, buckets, counts, total):
+    """Prometheus sample lines of one histogram series from per-bucket counts."""
+    prefix = labels + "," if labels else ""
+    lines = []
+    cumulative = 0
+    for bound, n in zip(buckets, counts):
+        cumulative += n
+        lines.append(_sample(f"{name}_bucket", f'{prefix}le="{_format(float(bound))}"', cumulative))
+    cumulative += counts[-1]
+    lines.append(_sample(f"{name}_bucket", f'{prefix}le="+Inf"', cumulative))
+    lines.append(_sample(f"{name}_sum", labels, total))
+    lines.append(_sample(f"{name}_count", labels, cumulative))
+    return lines
+
+
+class LengthHistogram:
+    """Bucket counts and sum of history lengths, updated as histories grow
+    and shrink (see History.track_length), so scrapes never walk accounts.
+
+    Counts are striped like the registry's account locks: a history reports
+    to stripe(pesel), so appends under different account locks do not
+    contend, and snapshot() adds the stripes up.
+    """
+
+    def __init__(self, buckets=HISTORY_BUCKETS, stripes=64):
+        self.buckets = buckets
+        self._stripes = [_LengthCounts(buckets) for _ in range(stripes)]
+
+    def stripe(self, key):
+        return self._stripes[hash(key) % len(self._stripes)]
+
+    def snapshot(self):
+        """(bucket counts with the +Inf bucket last, sum of lengths)."""
+        counts, total = [0] * (len(self.buckets) + 1), 0
+        for stripe in self._stripes:
+            stripe_counts, stripe_total = stripe.snapshot()
+            counts = [a + b for a, b in zip(counts, stripe_counts)]
+            total += stripe_total
+        return counts, total
+
+
+class _LengthCounts:
+    """One stripe of a LengthHistogram."""
+
+    def __init__(self, buckets):
+        self.buckets = buckets
+        self._counts = [0] * (len(buckets) + 1)
+        self._total = 0
+        self._lock = threading.Lock()
+
+    def add(self, length, n=1):
+        i = bisect_left(self.buckets, length)
+        with self._lock:
+            self._counts[i] += n
+            self._total += length * n
+
+    def remove(self, length):
+        self.add(length, -1)
+
+    def resize(self, old, new):
+        i, j = bisect_left(self.buckets, old), bisect_left(self.buckets, new)
+        with self._lock:
+            self._total += new - old
+            if i != j:
+                self._counts[i] -= 1
+                self._counts[j] += 1
+
+    def snapshot(self):
+        with self._lock:
+            return list(self._counts), self._total
+
+
+class Metrics:
+    """Per-route request latency histograms and counts.
+
+    observe() is on the request path: it does one bisect and a few list
+    updates under a lock. Registry statistics come from the counts the
+    registry keeps (see LengthHistogram) when the metrics are rendered.
+    """
+
+    def __init__(self, buckets=LATENCY_BUCKETS):
+        self.buckets = buckets
+        self._series = {}
+        self._lock = threading.Lock()
+
+    def observe(self, route, method, status, seconds):
+        i = bisect_left(self.buckets, seconds)
+        key = (route, method, status)
+        with self._lock:
+            series = self._series.get(key)
+            if series is None:
+                # Bucket counts, then the +Inf bucket, then the sum.
+                series = self._series[key] = [0] * (len(self.buckets) + 1) + [0.0]
+            series[i] += 1
+            series[-1] += seconds
+
+    def clear(self):
+        with self._lock:
+            self._series.clear()
+
+    def snapshot(self):
+        with self._lock:
+            return {key: list(series) for key, series in self._series.items()}
+
+    def render(self, registry=None):
+        """All metrics in the Prometheus text exposition format."""
+        series = sorted(self.snapshot().items())
+        lines = [
+            "# HELP bank_http_requests_total Requests by route, method and status code.",
+            "# TYPE bank_http_requests_total counter",
+        ]
+        for (route, method, status), values in series:
+            lines.append(_sample("bank_http_requests_total", _labels(route=route, method=method, status=status),
+                                 sum(values[:-1])))
+
+        lines += [
+            "# HELP bank_http_errors_total Requests answered with a 4xx or 5xx status code.",
+            "# TYPE bank_http_errors_total counter",
+        ]
+        for (route, method, status), values in series:
+            if status >= 400:
+                lines.append(_sample("bank_http_errors_total", _labels(route=route, method=method, status=status),
+                                     sum(values[:-1])))
+
+        lines += [
+            "# HELP bank_http_request_duration_seconds Request latency by route, method and status code.",
+            "# TYPE bank_http_request_duration_seconds histogram",
+        ]
+        for (route, method, status), values in series:
+            labels = _labels(route=route, method=method, status=status)
+            lines += _histogram("bank_http_request_duration_seconds", labels, self.buckets, values[:-1], values[-1])
+
+        if registry is not None:
+            lines += self._registry_lines(registry)
+        return "\n".join(lines) + "\n"
+
+    def _registry_lines(self, registry):
+        counts, total = registry.history_lengths()
+        return [
+            "# HELP bank_accounts Accounts in the registry.",
+            "# TYPE bank_accounts gauge",
+            _sample("bank_accounts", "", registry.count_accounts()),
+            "# HELP bank_account_history_length Transactions in each account's history.",
+            "# TYPE bank_account_history_length histogram",
+            *_histogram("bank_account_history_length", "", HISTORY_BUCKETS, counts, total),
+        ]
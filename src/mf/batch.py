@@ -0,0 +1,13 @@
+from concurrent.futures import ThreadPoolExecutor
+
+
+def validate_concurrently(nips, validate, max_workers):
+    """Runs validate once per distinct NIP on at most max_workers threads.
+
+    Returns a {nip: result} mapping in first-seen order.
+    """
+    unique = list(dict.fromkeys(nips))
+    if not unique:
+        return {}
+    with ThreadPoolExecutor(max_workers=min(max_workers, len(unique))) as pool:
+        return dict(zip(unique, pool.map(validate, unique)))
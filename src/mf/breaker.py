@@ -0,0 +1,82 @@
+import threading
+import time
+from collections import deque
+
+
+class CircuitBreaker:
+    """Closed/open/half-open breaker with latency statistics for one upstream.
+
+    After failure_threshold consecutive failures the breaker opens and
+    rejects calls for reset_timeout seconds, then lets a single probe
+    through (half-open). The probe's outcome closes or re-opens it.
+    """
+
+    CLOSED = "closed"
+    OPEN = "open"
+    HALF_OPEN = "half_open"
+
+    def __init__(self, failure_threshold=5, reset_timeout=30, latency_window=1000, clock=time.monotonic):
+        self.failure_threshold = failure_threshold
+        self.reset_timeout = reset_timeout
+        self._clock = clock
+        self._lock = threading.Lock()
+        self._latencies = deque(maxlen=latency_window)
+        self.reset()
+
+    def reset(self):
+        with self._lock:
+            self.state = self.CLOSED
+            self.consecutive_failures = 0
+            self.opened_at = None
+            self.calls = 0
+            self.failures = 0
+            self.rejected = 0
+            self._probe_in_flight = False
+            self._latencies.clear()
+
+    def allow(self):
+        with self._lock:
+            if self.state == self.OPEN and self._clock() - self.opened_at >= self.reset_timeout:
+                self.state = self.HALF_OPEN
+            if self.state == self.CLOSED:
+                return True
+            if self.state == self.HALF_OPEN and not self._probe_in_flight:
+                self._probe_in_flight = True
+                return True
+            self.rejected += 1
+            return False
+
+    def record_success(self, latency):
+        with self._lock:
+            self.calls += 1
+            self._latencies.append(latency)
+            self.consecutive_failures = 0
+            self.state = self.CLOSED
+            self._probe_in_flight = False
+
+    def record_failure(self, latency):
+        with self._lock:
+            self.calls += 1
+            self.failures += 1
+            self._latencies.append(latency)
+            self.consecutive_failures += 1
+            if self.state == self.HALF_OPEN or self.consecutive_failures >= self.failure_threshold:
+                self.state = self.OPEN
+                self.opened_at = self._clock()
+            self._probe_in_flight = False
+
+    def stats(self):
+        with self._lock:
+            latencies = sorted(self._latencies)
+            stats = {
+                "state": self.state,
+                "calls": self.calls,
+                "failures": self.failures,
+                "rejected": self.rejected,
+            }
+        if latencies:
+            stats["latency_avg"] = sum(latencies) / len(latencies)
+            stats["latency_p50"] = latencies[len(latencies) // 2]
+            stats["latency_p99"] = latencies[min(len(latencies) - 1, int(len(latencies) * 0.99))]
+            stats["latency_max"] = latencies[-1]
+        return stats
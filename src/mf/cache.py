@@ -0,0 +1,83 @@
+import atexit
+import json
+import os
+import threading
+import time
+from collections import OrderedDict
+
+
+class NipValidationCache:
+    """LRU cache of MF whitelist answers with separate TTLs for valid and invalid NIPs.
+
+    Entries carry a wall-clock expiry so they can be saved to ``path`` and
+    loaded again after a restart.
+    """
+
+    def __init__(self, ttl=3600, negative_ttl=300, maxsize=10_000, path=None, clock=time.time):
+        self.ttl = ttl
+        self.negative_ttl = negative_ttl
+        self.maxsize = maxsize
+        self.path = path
+        self.hits = 0
+        self.misses = 0
+        self._clock = clock
+        self._entries = OrderedDict()
+        self._lock = threading.Lock()
+        if path:
+            self.load()
+            atexit.register(self.save)
+
+    def get(self, nip):
+        """Returns the cached answer for nip, or None if absent or expired."""
+        with self._lock:
+            entry = self._entries.get(nip)
+            if entry is not None and entry[1] > self._clock():
+                self._entries.move_to_end(nip)
+                self.hits += 1
+                return entry[0]
+            if entry is not None:
+                del self._entries[nip]
+            self.misses += 1
+            return None
+
+    def put(self, nip, valid):
+        ttl = self.ttl if valid else self.negative_ttl
+        if ttl <= 0 or self.maxsize <= 0:
+            return
+        with self._lock:
+            self._entries[nip] = (valid, self._clock() + ttl)
+            self._entries.move_to_end(nip)
+            while len(self._entries) > self.maxsize:
+                self._entries.popitem(last=False)
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+            self.hits = 0
+            self.misses = 0
+
+    def stats(self):
+        return {"hits": self.hits, "misses": self.misses, "size": len(self._entries)}
+
+    def save(self):
+        now = self._clock()
+        with self._lock:
+            data = {nip: list(entry) for nip, entry in self._entries.items() if entry[1] > now}
+        tmp = f"{self.path}.tmp"
+        with open(tmp, "w") as f:
+            json.dump(data, f)
+        os.replace(tmp, self.path)
+
+    def load(self):
+        try:
+            with open(self.path) as f:
+                data = json.load(f)
+        except (OSError, ValueError):
+            return
+        now = self._clock()
+        with self._lock:
+            for nip, (valid, expires_at) in data.items():
+                if expires_at > now:
+                    self._entries[nip] = (valid, expires_at)
+            while len(self._entries) > self.maxsize:
+                self._entries.popitem(last=False)
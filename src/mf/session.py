@@ -0,0 +1,22 @@
+import requests
+from requests.adapters import HTTPAdapter
+from urllib3.util.retry import Retry
+
+
+def make_session(pool_size=10, retries=2, backoff_factor=0.1):
+    """Session with a keep-alive connection pool and retries on transient MF errors."""
+    # Read timeouts are not retried: MF is already slow and a retry would
+    # only add load and overrun the caller's deadline.
+    retry = Retry(
+        total=retries,
+        read=0,
+        backoff_factor=backoff_factor,
+        status_forcelist=(502, 503, 504),
+        allowed_methods=("GET",),
+        raise_on_status=False,
+    )
+    adapter = HTTPAdapter(pool_connections=pool_size, pool_maxsize=pool_size, max_retries=retry)
+    session = requests.Session()
+    session.mount("http://", adapter)
+    session.mount("https://", adapter)
+    return session
@@ -0,0 +1,35 @@
+import math
+
+GROSZE_PER_ZLOTY = 100
+# Amounts and history entries are stored as signed 64-bit grosze.
+MAX_GROSZE = 2 ** 63 - 1
+
+
+def to_grosze(amount):
+    """Exact grosze for an amount in złoty, as parsed from JSON.
+
+    Accepts ints and floats with at most two decimal places; a float is
+    taken as the nearest grosz only if it converts back to the same float,
+    so 0.29 becomes 29 but 0.001 is refused. Raises TypeError for other
+    types and ValueError for fractions of a grosz, NaN, infinities and
+    amounts outside the 64-bit range.
+    """
+    if type(amount) is int:
+        grosze = amount * GROSZE_PER_ZLOTY
+    elif type(amount) is float:
+        if not math.isfinite(amount):
+            raise ValueError("Nieprawidłowa kwota")
+        grosze = round(amount * GROSZE_PER_ZLOTY)
+        if grosze / GROSZE_PER_ZLOTY != amount:
+            raise ValueError("Nieprawidłowa kwota")
+    else:
+        raise TypeError(f"Amount must be a number, not {type(amount).__name__}")
+    if not -MAX_GROSZE <= grosze <= MAX_GROSZE:
+        raise ValueError("Nieprawidłowa kwota")
+    return grosze
+
+
+def to_zloty(grosze):
+    """Amount in złoty: an int when it is whole, else the nearest float."""
+    zloty, rest = divmod(grosze, GROSZE_PER_ZLOTY)
+    return grosze / GROSZE_PER_ZLOTY if rest else zloty
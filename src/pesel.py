@@ -0,0 +1,124 @@
+import calendar
+
+try:
+    import numpy as np
+except ImportError:  # pragma: no cover
+    np = None
+
+PESEL_LENGTH = 11
+MIN_BIRTH_YEAR = 1950
+CURRENT_YEAR = 2026
+
+# The month digits encode the birth century: months 1-12 are the 1900s,
+# +20 the 2000s, +40 the 2100s, +60 the 2200s and +80 the 1800s.
+_CENTURY_STARTS = ((1, 1900), (21, 2000), (41, 2100), (61, 2200), (81, 1800))
+CENTURY_BY_MONTH = tuple(
+    next((century for start, century in _CENTURY_STARTS if start <= month < start + 12), 0)
+    for month in range(100)
+)
+
+# Days in each month keyed by the YYMM prefix, for every month the
+# century encoding allows; other prefixes are not valid dates.
+DAYS_IN_MONTH = {
+    f"{yy:02d}{month:02d}": calendar.monthrange(century + yy, month - start + 1)[1]
+    for start, century in _CENTURY_STARTS
+    for month in range(start, start + 12)
+    for yy in range(100)
+}
+if np is not None:
+    _DAYS_BY_PREFIX = np.zeros(10000, dtype=np.int16)
+    for prefix, days in DAYS_IN_MONTH.items():
+        _DAYS_BY_PREFIX[int(prefix)] = days
+
+# Checksum weights 1-3-7-9 repeated, with weight 1 for the control digit,
+# so a valid PESEL's weighted digit sum is divisible by 10. The sum is
+# assembled from three lookups: the memoized YYMMDD birth date prefix and
+# precomputed tables for digits 7-9 and 10-11.
+WEIGHTS = (1, 3, 7, 9, 1, 3, 7, 9, 1, 3, 1)
+
+
+def _weighted_sums(width, weights):
+    return {f"{n:0{width}d}": sum(int(d) * w for d, w in zip(f"{n:0{width}d}", weights))
+            for n in range(10 ** width)}
+
+
+_SERIAL_SUMS = _weighted_sums(3, WEIGHTS[6:9])
+_CONTROL_SUMS = _weighted_sums(2, WEIGHTS[9:])
+# Valid birth date prefixes seen so far -> weighted sum of their digits.
+# Invalid prefixes are not stored, so the table holds at most one entry
+# per real date.
+_DATE_SUMS = {}
+
+_BLANK = " " * PESEL_LENGTH
+
+
+def birth_year(pesel):
+    """Birth year encoded in a PESEL, or 0 if it cannot be decoded."""
+    if len(pesel) != PESEL_LENGTH or not (pesel.isascii() and pesel.isdigit()):
+        return 0
+    century = CENTURY_BY_MONTH[int(pesel[2:4])]
+    return century + int(pesel[:2]) if century else 0
+
+
+def age_eligible(pesel):
+    return MIN_BIRTH_YEAR <= birth_year(pesel) <= CURRENT_YEAR
+
+
+def _date_sum(prefix):
+    if not (prefix.isascii() and prefix.isdigit()) or not 1 <= int(prefix[4:]) <= DAYS_IN_MONTH.get(prefix[:4], 0):
+        return None
+    total = _DATE_SUMS[prefix] = sum(int(d) * w for d, w in zip(prefix, WEIGHTS))
+    return total
+
+
+def is_valid_pesel(pesel):
+    """Full PESEL check: 11 digits, a real birth date and a matching checksum."""
+    if len(pesel) != PESEL_LENGTH:
+        return False
+    date = _DATE_SUMS.get(pesel[:6])
+    if date is None:
+        date = _date_sum(pesel[:6])
+        if date is None:
+            return False
+    serial = _SERIAL_SUMS.get(pesel[6:9])
+    control = _CONTROL_SUMS.get(pesel[9:])
+    return serial is not None and control is not None and (date + serial + control) % 10 == 0
+
+
+def classify_pesels(pesels, strict=False):
+    """Validity, birth year and age eligibility of many PESELs at once.
+
+    Returns three lists parallel to ``pesels``: whether each is valid
+    (11 characters, or with ``strict`` the full is_valid_pesel check), its
+    birth year (0 if it cannot be decoded) and whether it passes the age
+    check. With NumPy installed the whole batch is decoded from one
+    fixed-width byte buffer.
+    """
+    if np is None:
+        years = [birth_year(p) for p in pesels]
+        check = is_valid_pesel if strict else (lambda p: len(p) == PESEL_LENGTH)
+        return ([check(p) for p in pesels], years,
+                [MIN_BIRTH_YEAR <= year <= CURRENT_YEAR for year in years])
+
+    n = len(pesels)
+    valid = np.fromiter(map(len, pesels), dtype=np.intp, count=n) == PESEL_LENGTH
+    buffer = "".join(pesels)
+    if not valid.all() or not buffer.isascii():
+        # Keep every row at 11 bytes; blanks decode to no birth year.
+        buffer = "".join(p if len(p) == PESEL_LENGTH and p.isascii() else _BLANK for p in pesels)
+
+    raw = np.frombuffer(buffer.encode("ascii"), dtype=np.uint8).reshape(n, PESEL_LENGTH)
+    digits = ((raw >= ord("0")) & (raw <= ord("9"))).all(axis=1)
+    head = raw[:, :4].astype(np.int16) - ord("0")
+    yy = head[:, 0] * 10 + head[:, 1]
+    mm = head[:, 2] * 10 + head[:, 3]
+    century = np.asarray(CENTURY_BY_MONTH, dtype=np.int16)[np.clip(mm, 0, 99)]
+    years = np.where(digits & (century > 0), yy + century, 0)
+    eligible = (years >= MIN_BIRTH_YEAR) & (years <= CURRENT_YEAR)
+    if strict:
+        values = raw.astype(np.int16) - ord("0")
+        day = values[:, 4] * 10 + values[:, 5]
+        days = _DAYS_BY_PREFIX[np.clip(yy, 0, 99) * 100 + np.clip(mm, 0, 99)]
+        checksum = (values @ np.asarray(WEIGHTS, dtype=np.int16)) % 10 == 0
+        valid &= digits & (day >= 1) & (day <= days) & checksum
+    return valid.tolist(), years.tolist(), eligible.tolist()
@@ -0,0 +1,144 @@
+import os
+import random
+import sys
+import threading
+import time
+from collections import Counter
+
+
+class SamplingProfiler:
+    """Statistical profiler for selected threads.
+
+    A background thread wakes every ``interval`` seconds and records the
+    call stack of each thread registered with start(), from the given root
+    frame down. Stacks are aggregated in the collapsed format read by
+    flamegraph.pl and speedscope: ``frame;frame;frame count``.
+    """
+
+    def __init__(self, interval=0.005):
+        self.interval = interval
+        self.counts = Counter()
+        self._roots = {}
+        self._names = {}
+        # Reentrant: a garbage-collector finalizer may run stop() on a
+        # thread that is already inside start() or sample().
+        self._lock = threading.RLock()
+        self._active = threading.Event()
+        self._thread = None
+
+    def start(self, root):
+        """Samples the current thread from the root frame down until
+        stop() is called with the thread ident this returns."""
+        ident = threading.get_ident()
+        with self._lock:
+            self._roots[ident] = root
+            self._active.set()
+            if self._thread is None:
+                self._thread = threading.Thread(target=self._run, name="profiler", daemon=True)
+                self._thread.start()
+        return ident
+
+    def stop(self, ident):
+        with self._lock:
+            self._roots.pop(ident, None)
+            if not self._roots:
+                self._active.clear()
+
+    def _run(self):
+        while self._active.wait():
+            time.sleep(self.interval)
+            self.sample()
+
+    def _name(self, code):
+        name = self._names.get(code)
+        if name is None:
+            name = self._names[code] = f"{os.path.basename(code.co_filename)}:{code.co_name}"
+        return name
+
+    def sample(self):
+        frames = sys._current_frames()
+        with self._lock:
+            roots = list(self._roots.items())
+        for ident, root in roots:
+            stack = []
+            frame = frames.get(ident)
+            while frame is not None and frame is not root:
+                stack.append(self._name(frame.f_code))
+                frame = frame.f_back
+            # A thread that has already left its root frame is between
+            # requests; its stack would be server code.
+            if frame is root and stack:
+                key = ";".join(reversed(stack))
+                with self._lock:
+                    self.counts[key] += 1
+
+    def collapsed(self):
+        with self._lock:
+            return "".join(f"{stack} {n}\n" for stack, n in sorted(self.counts.items()))
+
+    def dump(self, path):
+        with open(path, "w") as f:
+            f.write(self.collapsed())
+
+    def clear(self):
+        with self._lock:
+            self.counts.clear()
+
+
+class ProfilingMiddleware:
+    """WSGI middleware that profiles a fraction of requests.
+
+    A request is profiled when it carries ``X-Profile: 1`` or is picked
+    at random with probability ``rate``. Aggregated collapsed stacks are
+    served at ``path``. Only install it when profiling is wanted; without
+    it requests run through the bare app.
+    """
+
+    def __init__(self, app, profiler, rate=0.0, path="/debug/profile"):
+        self.app = app
+        self.profiler = profiler
+        self.rate = rate
+        self.path = path
+
+    def __call__(self, environ, start_response):
+        if environ.get("PATH_INFO") == self.path:
+            body = self.profiler.collapsed().encode()
+            start_response("200 OK", [("Content-Type", "text/plain"), ("Content-Length", str(len(body)))])
+            return [body]
+        if environ.get("HTTP_X_PROFILE") == "1" or (self.rate and random.random() < self.rate):
+            return ProfiledResponse(self.profiler, self.app, environ, start_response)
+        return self.app(environ, start_response)
+
+
+class ProfiledResponse:
+    """Runs the app and iterates its response with the profiler on, so
+    streamed bodies are profiled as the server iterates them.
+
+    Profiling stops when the body is exhausted or closed. This is a class
+    with close() rather than a generator with a finally block, which the
+    garbage collector could run at any point, on any thread.
+    """
+
+    def __init__(self, profiler, app, environ, start_response):
+        self.profiler = profiler
+        self.ident = profiler.start(sys._getframe())
+        try:
+            self.result = app(environ, start_response)
+        except BaseException:
+            profiler.stop(self.ident)
+            raise
+
+    def __iter__(self):
+        # Re-rooted at this generator's frame, which is on the stack each
+        # time the server asks for the next chunk.
+        self.profiler.stop(self.ident)
+        self.ident = self.profiler.start(sys._getframe())
+        yield from self.result
+        self.profiler.stop(self.ident)
+
+    def close(self):
+        try:
+            if hasattr(self.result, "close"):
+                self.result.close()
+        finally:
+            self.profiler.stop(self.ident)
@@ -0,0 +1,312 @@
+import contextlib
+import heapq
+import multiprocessing
+import threading
+import zlib
+from bisect import bisect_right
+
+from account import AccountsRegistry
+from transfers import validate_item
+
+PAGE_SIZE = 1000
+
+
+def shard_for(pesel, shards):
+    """Owning shard of a PESEL; stable across processes, unlike hash()."""
+    return zlib.crc32(str(pesel).encode()) % shards
+
+
+class Shard:
+    """State owned by one shard process: a plain registry plus the global
+    insertion sequence of its accounts, used to merge listings across shards."""
+
+    def __init__(self):
+        self.registry = AccountsRegistry()
+        self.seqs = {}
+        # Deleted accounts keep their entry (and seq, as a cursor) until
+        # compaction, like AccountsRegistry._order.
+        self.order = []
+        self._deleted = 0
+        self._undo = None
+
+    def add(self, seq, account):
+        self.registry.add_account(account)
+        self._sequenced(seq, account.pesel)
+
+    def add_many(self, sequenced):
+        added = self.registry.add_accounts(account for _, account in sequenced)
+        for (seq, account), ok in zip(sequenced, added):
+            if ok:
+                self._sequenced(seq, account.pesel)
+        return added
+
+    def _sequenced(self, seq, pesel):
+        self.seqs[pesel] = seq
+        self.order.append((seq, pesel))
+
+    def find(self, pesel):
+        return self.registry.find_by_pesel(pesel)
+
+    def update(self, pesel, changes):
+        return self.registry.update_account(pesel, **changes)
+
+    def delete(self, pesel):
+        if not self.registry.delete_by_pesel(pesel):
+            return False
+        self._deleted += 1
+        if self._deleted > 1000 and self._deleted * 2 > len(self.order):
+            self._compact()
+        return True
+
+    def _compact(self):
+        accounts = self.registry.accounts
+        self.order = [(seq, pesel) for seq, pesel in self.order
+                      if pesel in accounts and self.seqs[pesel] == seq]
+        self.seqs = {pesel: seq for seq, pesel in self.order}
+        self._deleted = 0
+
+    def transfer(self, pesel, transfer_type, amount):
+        return self.registry.transfer(pesel, transfer_type, amount)
+
+    def batch(self, items, atomic):
+        return self.registry.apply_batch(items, atomic)
+
+    def prepare(self, items):
+        """First phase of a cross-shard atomic batch: applies the items and
+        keeps what is needed to undo them until finish() is called."""
+        accounts = {item["pesel"]: self.registry.find_by_pesel(item["pesel"]) for item in items}
+        undo = [(a, a.balance_grosze, len(a.history)) for a in accounts.values() if a is not None]
+        results = self.registry.apply_batch(items, atomic=True)
+        if all(r["status"] == 200 for r in results):
+            self._undo = undo
+        return results
+
+    def finish(self, commit):
+        if not commit:
+            for account, balance, history_length in self._undo:
+                account.balance_grosze = balance
+                del account.history[history_length:]
+        self._undo = None
+
+    def count(self):
+        return self.registry.count_accounts()
+
+    def history_lengths(self):
+        return self.registry.history_lengths()
+
+    def seq_of(self, pesel):
+        return self.seqs[pesel]
+
+    def page(self, after_seq, limit):
+        """Up to limit (seq, account) pairs with seq > after_seq, in order."""
+        page = []
+        for k in range(bisect_right(self.order, after_seq, key=lambda entry: entry[0]), len(self.order)):
+            seq, pesel = self.order[k]
+            account = self.registry.find_by_pesel(pesel)
+            if account is not None and self.seqs.get(pesel) == seq:
+                page.append((seq, account))
+                if len(page) == limit:
+                    break
+        return page
+
+    def clear(self):
+        self.registry.clear()
+        self.seqs.clear()
+        self.order.clear()
+        self._deleted = 0
+
+
+def serve(conn):
+    """Shard process main loop: runs (method, args) requests against a Shard."""
+    shard = Shard()
+    while True:
+        try:
+            request = conn.recv()
+        except EOFError:
+            return
+        if request is None:
+            return
+        method, args = request
+        try:
+            conn.send(("ok", getattr(shard, method)(*args)))
+        except Exception as e:
+            conn.send(("error", e))
+
+
+class ShardedRegistry:
+    """AccountsRegistry look-alike that partitions accounts by PESEL hash
+    across shard processes that share nothing.
+
+    Single-account operations go to the owning shard; count and listings
+    fan out and merge. Accounts returned by find_by_pesel and the listings
+    are copies, so changes must go through update_account / transfer.
+    Atomic batches spanning several shards use two-phase commit.
+    """
+
+    def __init__(self, shards=4):
+        self.shards = shards
+        self._conns = []
+        self._locks = [threading.Lock() for _ in range(shards)]
+        self._processes = []
+        self._seq_lock = threading.Lock()
+        self._last_seq = 0
+        for _ in range(shards):
+            parent, child = multiprocessing.Pipe()
+            process = multiprocessing.Process(target=serve, args=(child,), daemon=True)
+            process.start()
+            child.close()
+            self._conns.append(parent)
+            self._processes.append(process)
+
+    def close(self):
+        for conn, lock in zip(self._conns, self._locks):
+            with lock:
+                conn.send(None)
+                conn.close()
+        for process in self._processes:
+            process.join()
+
+    def _call_many(self, calls):
+        """Sends {shard: (method, args)} to all shards at once, then collects
+        the answers, so the shards work in parallel."""
+        shards = sorted(calls)
+        with contextlib.ExitStack() as stack:
+            for i in shards:
+                stack.enter_context(self._locks[i])
+            return self._exchange(shards, calls)
+
+    def _exchange(self, shards, calls):
+        for i in shards:
+            self._conns[i].send(calls[i])
+        answers = {i: self._conns[i].recv() for i in shards}
+        for status, result in answers.values():
+            if status == "error":
+                raise result
+        return {i: result for i, (_, result) in answers.items()}
+
+    def _take_seqs(self, n):
+        with self._seq_lock:
+            first = self._last_seq + 1
+            self._last_seq += n
+        return first
+
+    def _call(self, pesel, method, *args):
+        i = shard_for(pesel, self.shards)
+        return self._call_many({i: (method, (pesel, *args))})[i]
+
+    def add_account(self, account):
+        i = shard_for(account.pesel, self.shards)
+        with self._locks[i]:
+            # Taking the sequence number under the shard lock keeps each
+            # shard's accounts in sequence order.
+            self._exchange([i], {i: ("add", (self._take_seqs(1), account))})
+
+    def add_accounts(self, accounts):
+        groups = {}
+        for index, account in enumerate(accounts):
+            groups.setdefault(shard_for(account.pesel, self.shards), []).append((index, account))
+        added = [False] * sum(len(g) for g in groups.values())
+        shards = sorted(groups)
+        with contextlib.ExitStack() as stack:
+            for i in shards:
+                stack.enter_context(self._locks[i])
+            first = self._take_seqs(len(added))
+            calls = {i: ("add_many", ([(first + index, a) for index, a in groups[i]],)) for i in shards}
+            results = self._exchange(shards, calls)
+        for i in shards:
+            for (index, _), ok in zip(groups[i], results[i]):
+                added[index] = ok
+        return added
+
+    def find_by_pesel(self, pesel):
+        return self._call(pesel, "find")
+
+    def update_account(self, pesel, **changes):
+        return self._call(pesel, "update", changes)
+
+    def delete_by_pesel(self, pesel):
+        return self._call(pesel, "delete")
+
+    def transfer(self, pesel, transfer_type, amount):
+        return self._call(pesel, "transfer", transfer_type, amount)
+
+    def apply_batch(self, items, atomic=False):
+        results = [None] * len(items)
+        groups = {}
+        for index, item in enumerate(items):
+            error = validate_item(item)
+            if error is not None:
+                results[index] = {"status": 400, "error": error}
+            else:
+                groups.setdefault(shard_for(item["pesel"], self.shards), []).append(index)
+
+        if atomic and (any(r is not None for r in results) or len(groups) > 1):
+            return self._apply_atomic(items, groups, results)
+
+        answers = self._call_many({i: ("batch", ([items[k] for k in indexes], atomic))
+                                   for i, indexes in groups.items()})
+        for i, indexes in groups.items():
+            for k, result in zip(indexes, answers[i]):
+                results[k] = result
+        return results
+
+    def _apply_atomic(self, items, groups, results):
+        shards = sorted(groups)
+        with contextlib.ExitStack() as stack:
+            for i in shards:
+                stack.enter_context(self._locks[i])
+            failed = any(r is not None for r in results)
+            prepared = {}
+            if not failed:
+                prepared = self._exchange(shards, {i: ("prepare", ([items[k] for k in groups[i]],))
+                                                   for i in shards})
+                failed = any(r["status"] != 200 for answer in prepared.values() for r in answer)
+                # Shards that failed have already rolled themselves back.
+                committing = [i for i in shards if all(r["status"] == 200 for r in prepared[i])]
+                self._exchange(committing, {i: ("finish", (not failed,)) for i in committing})
+
+        for i in shards:
+            for k, result in zip(groups[i], prepared.get(i, [])):
+                results[k] = result
+        if failed:
+            for k, result in enumerate(results):
+                if result is None or result["status"] == 200:
+                    results[k] = {"status": 424, "error": "Batch rolled back"}
+        return results
+
+    def count_accounts(self):
+        return sum(self._call_many({i: ("count", ()) for i in range(self.shards)}).values())
+
+    def history_lengths(self):
+        answers = self._call_many({i: ("history_lengths", ()) for i in range(self.shards)}).values()
+        counts = [sum(bucket) for bucket in zip(*(counts for counts, _ in answers))]
+        return counts, sum(total for _, total in answers)
+
+    def iter_accounts(self, after=None):
+        """Yields accounts of all shards in global insertion order.
+
+        Raises KeyError for a cursor PESEL the registry has never seen.
+        """
+        after_seq = 0 if after is None else self._call(after, "seq_of")
+        return (account for _, account in heapq.merge(*(self._pages(i, after_seq) for i in range(self.shards))))
+
+    def _pages(self, i, after_seq):
+        while True:
+            page = self._call_many({i: ("page", (after_seq, PAGE_SIZE))})[i]
+            yield from page
+            if len(page) < PAGE_SIZE:
+                return
+            after_seq = page[-1][0]
+
+    def get_all_accounts(self):
+        return list(self.iter_accounts())
+
+    def clear(self):
+        self._call_many({i: ("clear", ()) for i in range(self.shards)})
+
+    def account_lock(self, pesel):
+        # Accounts handed out by a sharded registry are private copies.
+        return contextlib.nullcontext()
+
+    def commit(self):
+        pass
@@ -0,0 +1,133 @@
+import smtplib
+import threading
+import time
+from concurrent.futures import Future
+from email.header import Header
+from email.mime.text import MIMEText
+
+
+class BatchSMTPClient:
+    """Batches outgoing mail and delivers it over persistent SMTP sessions.
+
+    Messages are grouped by recipient domain; a group is flushed once it
+    holds batch_size messages or its oldest message has waited
+    flush_interval seconds. Each domain goes to its relay from ``routes``
+    (default: host/port) and one connection per relay is reused across
+    flushes. Every message gets a Future resolving to True or False.
+    """
+
+    def __init__(self, host="localhost", port=25, sender="bank@localhost", batch_size=100,
+                 flush_interval=1.0, timeout=10, routes=None):
+        self.relay = (host, port)
+        self.routes = routes or {}
+        self.sender = sender
+        self.batch_size = batch_size
+        self.flush_interval = flush_interval
+        self.timeout = timeout
+        self._pending = {}
+        self._queued_at = {}
+        self._connections = {}
+        self._route_locks = {}
+        self._lock = threading.Lock()
+        self._closed = threading.Event()
+        self._flusher = None
+
+    def submit(self, subject, text, email_address):
+        message = self._build_message(subject, text, email_address)
+        future = Future()
+        domain = email_address.rpartition("@")[2].lower()
+        with self._lock:
+            if self._closed.is_set():
+                raise RuntimeError("Client is closed")
+            group = self._pending.setdefault(domain, [])
+            if not group:
+                self._queued_at[domain] = time.monotonic()
+            group.append((message, future))
+            batch = self._take(domain) if len(group) >= self.batch_size else None
+            if self._flusher is None:
+                self._flusher = threading.Thread(target=self._run_flusher, daemon=True)
+                self._flusher.start()
+        if batch:
+            self._deliver(domain, batch)
+        return future
+
+    def send(self, subject, text, email_address) -> bool:
+        """Drop-in for SMTPClient.send; blocks until the message's batch is sent."""
+        return self.submit(subject, text, email_address).result()
+
+    def send_many(self, messages):
+        """Sends (subject, text, email_address) tuples; returns one bool per message."""
+        futures = [self.submit(*message) for message in messages]
+        self.flush()
+        return [future.result() for future in futures]
+
+    def flush(self, older_than=None):
+        now = time.monotonic()
+        with self._lock:
+            domains = [d for d, queued_at in self._queued_at.items()
+                       if older_than is None or now - queued_at >= older_than]
+            batches = [(d, self._take(d)) for d in domains]
+        for domain, batch in batches:
+            self._deliver(domain, batch)
+
+    def close(self):
+        with self._lock:
+            self._closed.set()
+            flusher = self._flusher
+        if flusher is not None:
+            flusher.join()
+        self.flush()
+        for connection in self._connections.values():
+            try:
+                connection.quit()
+            except (smtplib.SMTPException, OSError):
+                pass
+        self._connections.clear()
+
+    def _take(self, domain):
+        del self._queued_at[domain]
+        return self._pending.pop(domain)
+
+    def _build_message(self, subject, text, email_address):
+        # compat32 MIMEText: EmailMessage's header parsing costs more than the SMTP round trips.
+        message = MIMEText(text, "plain", "utf-8")
+        message["From"] = self.sender
+        message["To"] = email_address
+        message["Subject"] = Header(subject, "utf-8")
+        return email_address, message.as_bytes()
+
+    def _run_flusher(self):
+        while not self._closed.wait(self.flush_interval / 2):
+            self.flush(older_than=self.flush_interval)
+
+    def _deliver(self, domain, batch):
+        route = self.routes.get(domain, self.relay)
+        with self._lock:
+            route_lock = self._route_locks.setdefault(route, threading.Lock())
+        with route_lock:
+            for (email_address, message), future in batch:
+                future.set_result(self._send_message(route, email_address, message))
+
+    def _send_message(self, route, email_address, message):
+        for attempt in range(2):
+            try:
+                connection = self._connections.get(route)
+                if connection is None:
+                    connection = smtplib.SMTP(*route, timeout=self.timeout)
+                    self._connections[route] = connection
+                connection.sendmail(self.sender, [email_address], message)
+                return True
+            except smtplib.SMTPServerDisconnected:
+                # A kept-alive session may have been closed by the server; retry once on a fresh one.
+                self._drop(route)
+            except (smtplib.SMTPRecipientsRefused, smtplib.SMTPSenderRefused, smtplib.SMTPDataError):
+                return False
+            except (smtplib.SMTPException, OSError):
+                self._drop(route)
+                return False
+        return False
+
+    def _drop(self, route):
+        connection = self._connections.pop(route, None)
+        if connection is not None:
+            connection.close()
@@ -0,0 +1,106 @@
+import queue
+import threading
+import uuid
+from collections import OrderedDict
+
+from smtp.smtp import SMTPClient
+
+
+class MailQueueFull(Exception):
+    pass
+
+
+class MailQueue:
+    """Bounded outbound mail queue drained by background worker threads.
+
+    enqueue() only stores the message and returns its id; workers call
+    SMTPClient.send and retry failed deliveries with exponential backoff.
+    """
+
+    QUEUED = "queued"
+    SENDING = "sending"
+    SENT = "sent"
+    FAILED = "failed"
+
+    def __init__(self, workers=2, capacity=1000, max_attempts=3, backoff=0.5, status_limit=10_000, send=None):
+        self.max_attempts = max_attempts
+        self.backoff = backoff
+        self.status_limit = status_limit
+        self._send = send
+        self._queue = queue.Queue(maxsize=capacity)
+        self._statuses = OrderedDict()
+        self._lock = threading.Lock()
+        self._stopping = threading.Event()
+        self._workers = [
+            threading.Thread(target=self._work, name=f"mail-worker-{i}", daemon=True)
+            for i in range(workers)
+        ]
+        for worker in self._workers:
+            worker.start()
+
+    def enqueue(self, subject, text, email_address, timeout=0):
+        """Queues a message and returns its id.
+
+        Waits up to timeout seconds for room; raises MailQueueFull if the
+        queue stays full, so callers can shed load instead of piling up.
+        """
+        message_id = uuid.uuid4().hex
+        self._set_status(message_id, self.QUEUED, 0)
+        try:
+            self._queue.put((message_id, subject, text, email_address), block=timeout > 0, timeout=timeout or None)
+        except queue.Full:
+            with self._lock:
+                del self._statuses[message_id]
+            raise MailQueueFull("Mail queue is full")
+        return message_id
+
+    def status(self, message_id):
+        with self._lock:
+            status = self._statuses.get(message_id)
+            return dict(status) if status is not None else None
+
+    def pending(self):
+        return self._queue.qsize()
+
+    def join(self):
+        self._queue.join()
+
+    def stop(self):
+        self._stopping.set()
+        for _ in self._workers:
+            self._queue.put(None)
+        for worker in self._workers:
+            worker.join()
+
+    def _set_status(self, message_id, status, attempts, error=None):
+        with self._lock:
+            self._statuses[message_id] = {"status": status, "attempts": attempts, "error": error}
+            self._statuses.move_to_end(message_id)
+            while len(self._statuses) > self.status_limit:
+                self._statuses.popitem(last=False)
+
+    def _deliver(self, subject, text, email_address):
+        send = self._send or SMTPClient.send
+        try:
+            return bool(send(subject, text, email_address)), None
+        except Exception as e:
+            return False, str(e)
+
+    def _work(self):
+        while True:
+            item = self._queue.get()
+            try:
+                if item is None:
+                    return
+                message_id, subject, text, email_address = item
+                for attempt in range(1, self.max_attempts + 1):
+                    self._set_status(message_id, self.SENDING, attempt)
+                    sent, error = self._deliver(subject, text, email_address)
+                    if sent:
+                        self._set_status(message_id, self.SENT, attempt)
+                        break
+                    if attempt == self.max_attempts or self._stopping.wait(self.backoff * 2 ** (attempt - 1)):
+                        self._set_status(message_id, self.FAILED, attempt, error or "Delivery failed")
+                        break
+            finally:
+                self._queue.task_done()
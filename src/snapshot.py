@@ -0,0 +1,183 @@
+import gc
+import logging
+import mmap
+import os
+import struct
+import threading
+from array import array
+from itertools import accumulate
+
+from account import Account
+from journal import Journal
+
+MAGIC = b"BANKSNP3"
+HEADER = struct.Struct("<8sqqq")  # magic, start lsn, account count, offset of the columns
+SECTION = struct.Struct("<q")  # byte length of the column that follows
+# Names are stored as given; JSON bodies can carry lone surrogates.
+ENCODING, ERRORS = "utf-8", "surrogatepass"
+
+logger = logging.getLogger(__name__)
+
+
+def _write_columns(f, columns):
+    for column in columns:
+        f.write(SECTION.pack(len(column)))
+        f.write(column)
+
+
+def _read_columns(view, offset, n):
+    columns = []
+    for _ in range(n):
+        (size,) = SECTION.unpack_from(view, offset)
+        offset += SECTION.size
+        columns.append(bytes(view[offset:offset + size]))
+        offset += size
+    return columns
+
+
+def _split(column, lengths):
+    text = column.decode(ENCODING, ERRORS)
+    bounds = [0, *accumulate(lengths)]
+    return [text[a:b] for a, b in zip(bounds, bounds[1:])]
+
+
+def write_snapshot(registry, path):
+    """Writes a binary snapshot of every account; returns its start LSN.
+
+    Accounts are copied one at a time under their own lock, so requests
+    keep running. Each account stores the journal LSN it was copied at;
+    replaying the journal after the start LSN with those versions brings
+    the restored registry up to date.
+
+    Layout: header, all history amounts (64-bit grosze) back to back, then
+    one column per field (LSNs, balances in grosze, names, history lengths).
+    """
+    journal = registry.journal
+    start_lsn = journal.last_lsn if journal is not None else 0
+    lsns, balances, history_lengths = array("q"), array("q"), array("q")
+    pesels, first_names, last_names = [], [], []
+    tmp_path = f"{path}.tmp"
+    with open(tmp_path, "wb") as f:
+        f.write(HEADER.pack(MAGIC, start_lsn, 0, 0))
+        for account in registry.iter_accounts():
+            with registry.account_lock(account.pesel):
+                lsns.append(journal.last_lsn if journal is not None else 0)
+                balances.append(account.balance_grosze)
+                pesels.append(account.pesel)
+                first_names.append(account.first_name)
+                last_names.append(account.last_name)
+                history = account.history
+                history_lengths.append(len(history))
+                f.write(history.tobytes())
+
+        columns_offset = f.tell()
+        _write_columns(f, [lsns.tobytes(), balances.tobytes(), history_lengths.tobytes()])
+        for names in (pesels, first_names, last_names):
+            _write_columns(f, ["".join(names).encode(ENCODING, ERRORS), array("q", map(len, names)).tobytes()])
+        f.seek(0)
+        f.write(HEADER.pack(MAGIC, start_lsn, len(lsns), columns_offset))
+        f.flush()
+        os.fsync(f.fileno())
+    os.replace(tmp_path, path)
+    return start_lsn
+
+
+def load_snapshot(registry, path):
+    """Bulk-loads a snapshot into an empty registry.
+
+    Returns (start lsn, {pesel: lsn}) for AccountsRegistry.replay. The file
+    is memory-mapped and every column is decoded in one pass; history
+    arrays are copied straight out of the mapping.
+    """
+    # Creating millions of objects would otherwise trigger repeated full
+    # collections that scan everything loaded so far.
+    gc_was_enabled = gc.isenabled()
+    gc.disable()
+    try:
+        return _load(registry, path)
+    finally:
+        if gc_was_enabled:
+            gc.enable()
+
+
+def _load(registry, path):
+    with open(path, "rb") as f, mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as data:
+        magic, start_lsn, count, columns_offset = HEADER.unpack_from(data)
+        if magic != MAGIC:
+            raise ValueError("Not a registry snapshot")
+        (raw_lsns, raw_balances, raw_history_lengths,
+         pesels, pesel_lengths, first_names, first_lengths, last_names, last_lengths) = \
+            _read_columns(data, columns_offset, 9)
+
+        lsns = array("q", raw_lsns).tolist()
+        balances = array("q", raw_balances).tolist()
+        pesels = _split(pesels, array("q", pesel_lengths))
+        first_names = _split(first_names, array("q", first_lengths))
+        last_names = _split(last_names, array("q", last_lengths))
+
+        accounts = []
+        offset = HEADER.size
+        with memoryview(data) as view:
+            for i, length in enumerate(array("q", raw_history_lengths)):
+                account = Account.from_state(first_names[i], last_names[i], pesels[i], 0)
+                account.balance_grosze = balances[i]
+                if length:
+                    grosze = array("q")
+                    end = offset + length * grosze.itemsize
+                    grosze.frombytes(view[offset:end])
+                    offset = end
+                    account.history.extend_grosze(grosze)
+                accounts.append(account)
+
+    registry.add_accounts(accounts)
+    return start_lsn, dict(zip(pesels, lsns))
+
+
+def restore(registry, snapshot_path=None, journal_path=None, fsync="group"):
+    """Startup recovery: loads the snapshot and replays the journal tail.
+
+    Either path may be empty or name a file that does not exist yet. The
+    journal, if any, is attached to the registry with its LSNs continuing
+    after the snapshot's, so later entries are never mistaken for ones the
+    snapshot already covers.
+    """
+    since, versions = 0, None
+    if snapshot_path and os.path.exists(snapshot_path):
+        since, versions = load_snapshot(registry, snapshot_path)
+    if journal_path:
+        journal = Journal(journal_path, fsync=fsync, start_lsn=since)
+        registry.replay(journal.read(), since, versions)
+        registry.journal = journal
+
+
+class Snapshotter:
+    """Writes a snapshot every ``interval`` seconds on a background thread
+    and drops the journal entries it covers."""
+
+    def __init__(self, registry, path, interval=300):
+        self.registry = registry
+        self.path = path
+        self.interval = interval
+        self._stopping = threading.Event()
+        self._thread = threading.Thread(target=self._run, name="snapshotter", daemon=True)
+
+    def start(self):
+        self._thread.start()
+
+    def stop(self):
+        self._stopping.set()
+        self._thread.join()
+
+    def snapshot(self):
+        start_lsn = write_snapshot(self.registry, self.path)
+        if self.registry.journal is not None:
+            self.registry.journal.truncate(start_lsn)
+        return start_lsn
+
+    def _run(self):
+        while not self._stopping.wait(self.interval):
+            try:
+                self.snapshot()
+            except Exception:
+                # The journal keeps growing until a snapshot succeeds.
+                logger.exception("Snapshot to %s failed, retrying in %s s", self.path, self.interval)
@@ -0,0 +1,36 @@
+CHUNK_SIZE = 10_000
+INLINE_LIMIT = 10_000
+
+
+def iter_history_text(history, last=None, chunk_size=CHUNK_SIZE):
+    """Yields the history rendered as "[a, b, ...]" a chunk of entries at a time.
+
+    ``last`` limits the output to the most recent entries. Only one chunk
+    is materialized at a time, so memory stays bounded by chunk_size.
+    """
+    total = len(history)
+    start = 0 if last is None else max(total - last, 0)
+    yield "["
+    for offset in range(start, total, chunk_size):
+        chunk = repr(history[offset:offset + chunk_size])[1:-1]
+        yield chunk if offset == start else ", " + chunk
+    yield "]"
+
+
+def render_history(history, last=None, limit=INLINE_LIMIT):
+    """History text for an email body, capped at ``limit`` most recent entries.
+
+    Histories within the cap render exactly like the plain list; longer ones
+    are cut to the tail and prefixed with how many entries are shown.
+    """
+    total = len(history)
+    shown = total if last is None else min(last, total)
+    if shown <= limit:
+        return "".join(iter_history_text(history, shown))
+    return f"(last {limit} of {total}) " + "".join(iter_history_text(history, limit))
+
+
+def write_history(history, stream, last=None, chunk_size=CHUNK_SIZE):
+    """Writes the history text to a file-like object, e.g. an attachment spool."""
+    for piece in iter_history_text(history, last, chunk_size):
+        stream.write(piece)
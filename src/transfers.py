@@ -0,0 +1,106 @@
+TRANSFER_TYPES = ("incoming", "outgoing", "express")
+MAX_BATCH_SIZE = 10_000
+
+
+def apply_transfer(account, transfer_type, amount):
+    if transfer_type == "incoming":
+        account.deposit(amount)
+    elif transfer_type == "outgoing":
+        account.withdraw(amount)
+    elif transfer_type == "express":
+        account.express_transfer(amount)
+    else:
+        raise ValueError("Unknown transfer type")
+
+
+def validate_item(item):
+    if not isinstance(item, dict):
+        return "Invalid JSON"
+    if not all(k in item for k in ("pesel", "amount", "type")):
+        return "Missing fields"
+    if item["type"] not in TRANSFER_TYPES:
+        return "Unknown transfer type"
+    return None
+
+
+def _apply_item(account, item):
+    try:
+        apply_transfer(account, item["type"], item["amount"])
+    except ValueError as e:
+        return {"status": 422, "error": str(e)}
+    except TypeError:
+        return {"status": 400, "error": "Invalid amount"}
+    return {"status": 200}
+
+
+def _record(registry, item):
+    registry.record("transfer", item["pesel"], type=item["type"], amount=item["amount"])
+
+
+def _group_by_pesel(items, results):
+    groups = {}
+    for index, item in enumerate(items):
+        error = validate_item(item)
+        if error is not None:
+            results[index] = {"status": 400, "error": error}
+        else:
+            groups.setdefault(item["pesel"], []).append(index)
+    return groups
+
+
+def apply_batch(registry, items, atomic=False):
+    """Applies transfers grouped by account; returns one result per item, in order.
+
+    In atomic mode either every transfer is applied or none is: after the
+    first failure all touched accounts are restored and the remaining items
+    are reported with status 424.
+    """
+    results = [None] * len(items)
+    groups = _group_by_pesel(items, results)
+
+    if not atomic:
+        for pesel, indexes in groups.items():
+            with registry.account_lock(pesel):
+                account = registry.find_by_pesel(pesel)
+                if account is None:
+                    for i in indexes:
+                        results[i] = {"status": 404, "error": "Not found"}
+                    continue
+                for i in indexes:
+                    results[i] = _apply_item(account, items[i])
+                    if results[i]["status"] == 200:
+                        _record(registry, items[i])
+        return results
+
+    failed = any(r is not None for r in results)
+    with registry.lock_accounts(groups):
+        snapshots = []
+        for pesel, indexes in groups.items():
+            if failed:
+                break
+            account = registry.find_by_pesel(pesel)
+            if account is None:
+                results[indexes[0]] = {"status": 404, "error": "Not found"}
+                failed = True
+                break
+            snapshots.append((account, account.balance_grosze, len(account.history)))
+            for i in indexes:
+                results[i] = _apply_item(account, items[i])
+                if results[i]["status"] != 200:
+                    failed = True
+                    break
+
+        if failed:
+            for account, balance, history_length in snapshots:
+                account.balance_grosze = balance
+                del account.history[history_length:]
+        else:
+            for indexes in groups.values():
+                for i in indexes:
+                    _record(registry, items[i])
+
+    if failed:
+        for i, result in enumerate(results):
+            if result is None or result["status"] == 200:
+                results[i] = {"status": 424, "error": "Batch rolled back"}
+    return results
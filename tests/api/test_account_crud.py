@@ -1,4 +1,6 @@
 import pytest
+import api
+from account import Account
 
 @pytest.fixture
 def sample_account():
@@ -24,6 +26,14 @@ def test_create_account_missing_fields(client):
     assert r.status_code == 400
 
 
+@pytest.mark.parametrize("field", ["name", "surname", "pesel"])
+def test_create_account_non_string_field(client, sample_account, field):
+    sample_account[field] = 12345678901
+    r = client.post("/api/accounts", json=sample_account)
+    assert r.status_code == 400
+    assert r.get_json() == {"error": "Invalid fields"}
+
+
 def test_create_account_extra_fields(client, sample_account):
     sample_account["extra"] = "ignored"
     r = client.post("/api/accounts", json=sample_account)
@@ -34,6 +44,34 @@ def test_create_account_extra_fields(client, sample_account):
     assert "extra" not in data
 
 
+def test_create_account_invalid_pesel(client, sample_account):
+    sample_account["pesel"] = "12345"
+    r = client.post("/api/accounts", json=sample_account)
+    assert r.status_code == 400
+    assert r.get_json() == {"error": "Invalid pesel"}
+
+
+def test_create_account_strict_pesel(client, sample_account, monkeypatch):
+    monkeypatch.setattr("account.Account.STRICT_PESEL", True)
+    r = client.post("/api/accounts", json=sample_account)
+    assert r.status_code == 400
+    r = client.post("/api/accounts/bulk", json=[sample_account])
+    assert r.get_data(as_text=True).splitlines()[-1] == '{"created": 0, "duplicate": 0, "invalid": 1}'
+
+    sample_account["pesel"] = "44051401359"
+    r = client.post("/api/accounts", json=sample_account)
+    assert r.status_code == 201
+    sample_account["pesel"] = "02070803628"
+    r = client.post("/api/accounts/bulk", json=[sample_account])
+    assert r.get_data(as_text=True).splitlines()[-1] == '{"created": 1, "duplicate": 0, "invalid": 0}'
+
+
+def test_bulk_and_single_creates_share_account_class(client, sample_account):
+    client.post("/api/accounts", json=sample_account)
+    client.post("/api/accounts/bulk", json=[{**sample_account, "pesel": "44051401359"}])
+    assert {type(a) for a in api.registry.iter_accounts()} == {Account}
+
+
 def test_create_account_duplicate_pesel(client, sample_account):
     r1 = client.post("/api/accounts", json=sample_account)
     assert r1.status_code == 201
@@ -150,6 +188,13 @@ def test_update_empty_json(client, sample_account):
     assert data["surname"] == "Kowalski"
 
 
+def test_update_with_non_string_name(client, sample_account):
+    client.post("/api/accounts", json=sample_account)
+    r = client.patch(f"/api/accounts/{sample_account['pesel']}", json={"name": ["Jan"]})
+    assert r.status_code == 400
+    assert r.get_json() == {"error": "Invalid fields"}
+
+
 def test_update_with_ignored_fields(client, sample_account):
     client.post("/api/accounts", json=sample_account)
 
@@ -257,6 +302,25 @@ def test_transfer_express_success(client, sample_account):
     assert data["balance"] == 49
 
 
+def test_transfer_fractional_amounts_are_exact(client, sample_account):
+    client.post("/api/accounts", json=sample_account)
+    for amount in (0.1, 0.2, 10.05):
+        client.post(f"/api/accounts/{sample_account['pesel']}/transfer", json={"amount": amount, "type": "incoming"})
+    data = client.get(f"/api/accounts/{sample_account['pesel']}").get_json()
+    assert data["balance"] == 10.35
+
+
+@pytest.mark.parametrize("amount, status", [("10", 400), (None, 400), (0.001, 422), (1e30, 422)])
+def test_transfer_invalid_amount(client, sample_account, amount, status):
+    client.post("/api/accounts", json=sample_account)
+    r = client.post(
+        f"/api/accounts/{sample_account['pesel']}/transfer",
+        json={"amount": amount, "type": "incoming"}
+    )
+    assert r.status_code == status
+    assert client.get(f"/api/accounts/{sample_account['pesel']}").get_json()["balance"] == 0
+
+
 def test_transfer_unknown_type(client, sample_account):
     client.post("/api/accounts", json=sample_account)
     r = client.post(
@@ -0,0 +1,63 @@
+import json
+
+
+def parse_ndjson(response):
+    return [json.loads(line) for line in response.get_data(as_text=True).splitlines()]
+
+
+def test_bulk_create_json_array(client):
+    rows = [
+        {"name": "Jan", "surname": "Kowalski", "pesel": "90010112345"},
+        {"name": "Anna", "surname": "Nowak", "pesel": "92020212345"},
+    ]
+    r = client.post("/api/accounts/bulk", json=rows)
+    assert r.status_code == 200
+    assert r.mimetype == "application/x-ndjson"
+
+    lines = parse_ndjson(r)
+    assert [line["status"] for line in lines[:-1]] == ["created", "created"]
+    assert lines[-1] == {"created": 2, "duplicate": 0, "invalid": 0}
+
+    assert client.get("/api/accounts/count").get_json() == {"count": 2}
+    assert client.get("/api/accounts/92020212345").get_json()["name"] == "Anna"
+
+
+def test_bulk_create_ndjson(client):
+    body = "\n".join([
+        '{"name": "Jan", "surname": "Kowalski", "pesel": "90010112345"}',
+        '{"name": "Jan", "surname": "Kowalski", "pesel": "90010112345"}',
+        'not json',
+        '{"name": "Anna", "surname": "Nowak"}',
+    ])
+    r = client.post(
+        "/api/accounts/bulk",
+        data=body,
+        content_type="application/x-ndjson",
+    )
+    assert r.status_code == 200
+
+    lines = parse_ndjson(r)
+    assert [line["status"] for line in lines[:-1]] == [
+        "created", "duplicate", "invalid", "invalid",
+    ]
+    assert lines[-1] == {"created": 1, "duplicate": 1, "invalid": 2}
+
+
+def test_bulk_create_skips_existing_accounts(client):
+    account = {"name": "Jan", "surname": "Kowalski", "pesel": "90010112345"}
+    client.post("/api/accounts", json=account)
+
+    r = client.post("/api/accounts/bulk", json=[account])
+    assert parse_ndjson(r)[0]["status"] == "duplicate"
+
+
+def test_bulk_create_malformed_array(client):
+    r = client.post(
+        "/api/accounts/bulk",
+        data='{"name": "Jan"}',
+        content_type="application/json",
+    )
+    assert r.status_code == 200
+    lines = parse_ndjson(r)
+    assert lines[0] == {"error": "Expected JSON array"}
+    assert lines[-1] == {"created": 0, "duplicate": 0, "invalid": 0}
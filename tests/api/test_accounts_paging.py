@@ -0,0 +1,76 @@
+import json
+import pytest
+
+
+@pytest.fixture
+def pesels(client):
+    pesels = [f"9001011{i:04d}" for i in range(5)]
+    for pesel in pesels:
+        client.post("/api/accounts", json={"name": "Jan", "surname": "Kowalski", "pesel": pesel})
+    return pesels
+
+
+def test_first_page(client, pesels):
+    r = client.get("/api/accounts?limit=2")
+    assert r.status_code == 200
+    data = r.get_json()
+    assert [a["pesel"] for a in data["accounts"]] == pesels[:2]
+    assert data["next"] == pesels[1]
+
+
+def test_walk_all_pages(client, pesels):
+    seen = []
+    cursor = None
+    while True:
+        url = "/api/accounts?limit=2" + (f"&after={cursor}" if cursor else "")
+        data = client.get(url).get_json()
+        seen += [a["pesel"] for a in data["accounts"]]
+        cursor = data["next"]
+        if cursor is None:
+            break
+    assert seen == pesels
+
+
+def test_after_deleted_cursor_still_works(client, pesels):
+    client.delete(f"/api/accounts/{pesels[1]}")
+    data = client.get(f"/api/accounts?after={pesels[1]}").get_json()
+    assert [a["pesel"] for a in data["accounts"]] == pesels[2:]
+    assert data["next"] is None
+
+
+def test_unknown_cursor(client, pesels):
+    r = client.get("/api/accounts?after=99999999999")
+    assert r.status_code == 400
+    assert r.get_json() == {"error": "Unknown cursor"}
+
+
+@pytest.mark.parametrize("limit", ["0", "abc", "1001"])
+def test_invalid_limit(client, limit):
+    r = client.get(f"/api/accounts?limit={limit}")
+    assert r.status_code == 400
+    assert r.get_json() == {"error": "Invalid limit"}
+
+
+def test_stream_json(client, pesels, monkeypatch):
+    monkeypatch.setattr("handlers.STREAM_CHUNK_SIZE", 2)
+    r = client.get("/api/accounts?stream=json")
+    assert r.status_code == 200
+    assert [a["pesel"] for a in json.loads(r.get_data(as_text=True))] == pesels
+
+
+def test_stream_json_empty(client):
+    r = client.get("/api/accounts?stream=json")
+    assert json.loads(r.get_data(as_text=True)) == []
+
+
+def test_stream_ndjson(client, pesels, monkeypatch):
+    monkeypatch.setattr("handlers.STREAM_CHUNK_SIZE", 2)
+    r = client.get("/api/accounts?stream=ndjson")
+    assert r.mimetype == "application/x-ndjson"
+    lines = r.get_data(as_text=True).splitlines()
+    assert [json.loads(line)["pesel"] for line in lines] == pesels
+
+
+def test_stream_unknown_format(client):
+    r = client.get("/api/accounts?stream=xml")
+    assert r.status_code == 400
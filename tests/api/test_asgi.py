@@ -0,0 +1,245 @@
+import asyncio
+import json
+import threading
+import pytest
+import smtp.smtp as smtpmod
+import api
+import asgi
+from account import AccountsRegistry
+from journal import Journal
+from sharding import ShardedRegistry
+from smtp.queue import MailQueueFull
+
+
+class ASGIResponse:
+    def __init__(self, status, headers, body):
+        self.status_code = status
+        self.headers = headers
+        self.data = body
+
+    def get_json(self):
+        return json.loads(self.data) if self.data else None
+
+
+def asgi_request(method, path, json_body=None, data=None, content_type=None):
+    if json_body is not None:
+        data, content_type = json.dumps(json_body).encode(), "application/json"
+    data = data or b""
+    path, _, query = path.partition("?")
+    headers = [(b"content-type", content_type.encode())] if content_type else []
+    scope = {"type": "http", "method": method, "path": path, "query_string": query.encode(), "headers": headers}
+    chunks = [data[:len(data) // 2], data[len(data) // 2:]]
+    sent = []
+
+    async def receive():
+        body = chunks.pop(0)
+        return {"type": "http.request", "body": body, "more_body": bool(chunks)}
+
+    async def send(message):
+        sent.append(message)
+
+    asyncio.run(asgi.app(scope, receive, send))
+    body = b"".join(m.get("body", b"") for m in sent[1:])
+    return ASGIResponse(sent[0]["status"], dict(sent[0]["headers"]), body)
+
+
+class ASGIClient:
+    def get(self, path):
+        return asgi_request("GET", path)
+
+    def delete(self, path):
+        return asgi_request("DELETE", path)
+
+    def post(self, path, json=None, data=None, content_type=None):
+        return asgi_request("POST", path, json, data, content_type)
+
+    def patch(self, path, json=None, data=None, content_type=None):
+        return asgi_request("PATCH", path, json, data, content_type)
+
+
+SCENARIO = [
+    ("post", "/api/accounts", {"name": "Jan", "surname": "Kowalski", "pesel": "90010112345"}),
+    ("post", "/api/accounts", {"name": "Jan", "surname": "Kowalski", "pesel": "90010112345"}),
+    ("post", "/api/accounts", {"name": "Anna"}),
+    ("post", "/api/accounts", ["not", "a", "dict"]),
+    ("post", "/api/accounts", {"name": "Anna", "surname": "Nowak", "pesel": "123"}),
+    ("post", "/api/accounts", {"name": "Anna", "surname": "Nowak", "pesel": "92020212345"}),
+    ("get", "/api/accounts", None),
+    ("get", "/api/accounts?limit=1", None),
+    ("get", "/api/accounts?limit=1&after=90010112345", None),
+    ("get", "/api/accounts?limit=abc", None),
+    ("get", "/api/accounts?after=00000000000", None),
+    ("get", "/api/accounts?stream=xml", None),
+    ("get", "/api/accounts/count", None),
+    ("get", "/api/accounts/90010112345", None),
+    ("get", "/api/accounts/99999999999", None),
+    ("patch", "/api/accounts/90010112345", {"surname": "Nowak", "name": "Janek"}),
+    ("patch", "/api/accounts/90010112345", "nope"),
+    ("patch", "/api/accounts/99999999999", {"name": "X"}),
+    ("post", "/api/accounts/90010112345/transfer", {"amount": 100, "type": "incoming"}),
+    ("post", "/api/accounts/90010112345/transfer", {"amount": 500, "type": "outgoing"}),
+    ("post", "/api/accounts/90010112345/transfer", {"amount": 0.35, "type": "incoming"}),
+    ("post", "/api/accounts/90010112345/transfer", {"amount": "5", "type": "incoming"}),
+    ("post", "/api/accounts/90010112345/transfer", {"amount": 0.001, "type": "incoming"}),
+    ("post", "/api/accounts/90010112345/transfer", {"amount": 5, "type": "weird"}),
+    ("post", "/api/accounts/90010112345/transfer", {"amount": 5}),
+    ("post", "/api/accounts/90010112345/transfer", "nope"),
+    ("post", "/api/accounts/99999999999/transfer", {"amount": 5, "type": "incoming"}),
+    ("post", "/api/transfers/batch", [{"pesel": "92020212345", "amount": 10, "type": "incoming"}]),
+    ("post", "/api/transfers/batch", {"atomic": True, "transfers": [
+        {"pesel": "92020212345", "amount": 10, "type": "incoming"},
+        {"pesel": "90010112345", "amount": 999, "type": "outgoing"}]}),
+    ("post", "/api/transfers/batch", {"transfers": "nope"}),
+    ("post", "/api/transfers/batch", {"atomic": "false", "transfers": []}),
+    ("post", "/api/accounts/90010112345/history/email", {"email": "jan@x.pl", "last": 0}),
+    ("post", "/api/accounts/90010112345/history/email", {"mail": "jan@x.pl"}),
+    ("post", "/api/accounts/99999999999/history/email", {"email": "jan@x.pl"}),
+    ("get", "/api/mail/nope", None),
+    ("get", "/api/accounts", None),
+    ("delete", "/api/accounts/92020212345", None),
+    ("delete", "/api/accounts/92020212345", None),
+    ("get", "/api/accounts/count", None),
+]
+
+
+def run(client, scenario):
+    outcomes = []
+    for method, path, body in scenario:
+        if method in ("get", "delete"):
+            r = getattr(client, method)(path)
+        else:
+            r = getattr(client, method)(path, json=body)
+        outcomes.append((method, path, r.status_code, r.get_json() if r.data else None))
+    return outcomes
+
+
+def test_same_contract_as_flask(client):
+    flask_outcomes = run(client, SCENARIO)
+    api.registry.clear()
+    assert run(ASGIClient(), SCENARIO) == flask_outcomes
+
+
+def test_same_contract_on_sharded_journaled_registries(client, monkeypatch, tmp_path):
+    flask_outcomes = run(client, SCENARIO)
+
+    sharded = ShardedRegistry(shards=2)
+    try:
+        monkeypatch.setattr(api, "registry", sharded)
+        assert run(ASGIClient(), SCENARIO) == flask_outcomes
+    finally:
+        sharded.close()
+
+    local = AccountsRegistry(Journal(tmp_path / "registry.journal"))
+    monkeypatch.setattr(api, "registry", local)
+    assert run(ASGIClient(), SCENARIO) == flask_outcomes
+    local.journal.close()
+
+
+def test_journaled_writes_leave_event_loop(monkeypatch, tmp_path):
+    local = AccountsRegistry(Journal(tmp_path / "registry.journal", fsync="always"))
+    monkeypatch.setattr(api, "registry", local)
+    threads = []
+    append = local.journal.append
+
+    def record(*args):
+        threads.append(threading.current_thread())
+        return append(*args)
+    monkeypatch.setattr(local.journal, "append", record)
+
+    asgi_request("POST", "/api/accounts", {"name": "Jan", "surname": "Kowalski", "pesel": "90010112345"})
+    asgi_request("POST", "/api/accounts/90010112345/transfer", {"amount": 100, "type": "incoming"})
+    asgi_request("PATCH", "/api/accounts/90010112345", {"name": "Janusz"})
+    asgi_request("DELETE", "/api/accounts/90010112345")
+    local.journal.close()
+    assert len(threads) == 4
+    assert threading.main_thread() not in threads
+
+
+def test_stream_listing():
+    asgi_request("POST", "/api/accounts", {"name": "Jan", "surname": "Kowalski", "pesel": "90010112345"})
+    r = asgi_request("GET", "/api/accounts?stream=ndjson")
+    assert r.status_code == 200
+    assert r.headers[b"content-type"] == b"application/x-ndjson"
+    assert [json.loads(line)["pesel"] for line in r.data.decode().splitlines()] == ["90010112345"]
+
+
+@pytest.mark.parametrize("content_type, body", [
+    ("application/x-ndjson", b'{"name":"Jan","surname":"K","pesel":"90010112345"}\n{"name":"Jan"}\n'),
+    ("application/json", b'[{"name":"Jan","surname":"K","pesel":"90010112345"}, {"name":"Jan"}]'),
+])
+def test_bulk_import(content_type, body):
+    r = asgi_request("POST", "/api/accounts/bulk", data=body, content_type=content_type)
+    lines = [json.loads(line) for line in r.data.decode().splitlines()]
+    assert lines[-1] == {"created": 1, "duplicate": 0, "invalid": 1}
+    assert api.registry.count_accounts() == 1
+
+
+def test_bulk_import_malformed():
+    r = asgi_request("POST", "/api/accounts/bulk", data=b"[{", content_type="application/json")
+    assert "error" in json.loads(r.data.decode().splitlines()[0])
+
+
+def test_history_email_and_status(monkeypatch):
+    monkeypatch.setattr(smtpmod.SMTPClient, "send", lambda subject, text, email: True)
+    asgi_request("POST", "/api/accounts", {"name": "Jan", "surname": "Kowalski", "pesel": "90010112345"})
+    r = asgi_request("POST", "/api/accounts/90010112345/history/email", {"email": "jan@x.pl"})
+    assert r.status_code == 202
+    api.mail_queue.join()
+    assert asgi_request("GET", f"/api/mail/{r.get_json()['id']}").get_json()["status"] == "sent"
+
+
+def test_history_email_queue_full(monkeypatch):
+    def full(*args):
+        raise MailQueueFull("Mail queue is full")
+    monkeypatch.setattr("api.mail_queue.enqueue", full)
+    asgi_request("POST", "/api/accounts", {"name": "Jan", "surname": "Kowalski", "pesel": "90010112345"})
+    assert asgi_request("POST", "/api/accounts/90010112345/history/email", {"email": "a@b.pl"}).status_code == 503
+
+
+def test_batch_too_large(monkeypatch):
+    monkeypatch.setattr("handlers.MAX_BATCH_SIZE", 1)
+    item = {"pesel": "90010112345", "amount": 1, "type": "incoming"}
+    assert asgi_request("POST", "/api/transfers/batch", [item, item]).status_code == 413
+
+
+def test_non_json_body_is_rejected():
+    r = asgi_request("POST", "/api/accounts", data=b"{}", content_type="text/plain")
+    assert r.status_code == 400
+    r = asgi_request("POST", "/api/accounts", data=b"{oops", content_type="application/json")
+    assert r.status_code == 400
+
+
+def test_unknown_route_and_method():
+    assert asgi_request("GET", "/nope").status_code == 404
+    assert asgi_request("PUT", "/api/accounts").status_code == 405
+
+
+def test_lifespan():
+    messages = [{"type": "lifespan.startup"}, {"type": "lifespan.shutdown"}]
+    sent = []
+
+    async def receive():
+        return messages.pop(0)
+
+    async def send(message):
+        sent.append(message["type"])
+
+    asyncio.run(asgi.app({"type": "lifespan"}, receive, send))
+    assert sent == ["lifespan.startup.complete", "lifespan.shutdown.complete"]
+
+
+def test_metrics_match_flask(client):
+    api.metrics.clear()
+    run(client, SCENARIO)
+    flask_metrics = client.get("/metrics").data.decode()
+    api.registry.clear()
+    api.metrics.clear()
+    run(ASGIClient(), SCENARIO)
+    r = asgi_request("GET", "/metrics")
+    api.metrics.clear()
+
+    assert r.headers[b"content-type"] == b"text/plain; version=0.0.4"
+
+    def counts(text):
+        return [line for line in text.splitlines() if line.startswith(("bank_http_requests_total", "bank_accounts"))]
+    assert counts(r.data.decode()) == counts(flask_metrics)
@@ -0,0 +1,64 @@
+import pytest
+import smtp.smtp as smtpmod
+from smtp.queue import MailQueueFull
+
+
+@pytest.fixture
+def account(client):
+    client.post("/api/accounts", json={"name": "Jan", "surname": "Kowalski", "pesel": "90010112345"})
+    return "90010112345"
+
+
+def test_email_history_is_queued(client, account, monkeypatch):
+    import api
+    monkeypatch.setattr(smtpmod.SMTPClient, "send", lambda subject, text, email: True)
+    r = client.post(f"/api/accounts/{account}/history/email", json={"email": "jan@x.pl"})
+    assert r.status_code == 202
+    message_id = r.get_json()["id"]
+
+    api.mail_queue.join()
+    r = client.get(f"/api/mail/{message_id}")
+    assert r.status_code == 200
+    assert r.get_json()["status"] == "sent"
+
+
+def test_email_history_unknown_account(client):
+    r = client.post("/api/accounts/99999999999/history/email", json={"email": "jan@x.pl"})
+    assert r.status_code == 404
+
+
+@pytest.mark.parametrize("body", [{"mail": "jan@x.pl"}, {"email": 5}, "jan@x.pl"])
+def test_email_history_invalid_json(client, account, body):
+    r = client.post(f"/api/accounts/{account}/history/email", json=body)
+    assert r.status_code == 400
+
+
+def test_email_history_last_entries(client, account, monkeypatch):
+    import api
+    sent = []
+    monkeypatch.setattr(smtpmod.SMTPClient, "send", lambda subject, text, email: sent.append(text) or True)
+    for amount in (10, 20, 30):
+        client.post(f"/api/accounts/{account}/transfer", json={"amount": amount, "type": "incoming"})
+    r = client.post(f"/api/accounts/{account}/history/email", json={"email": "jan@x.pl", "last": 2})
+    assert r.status_code == 202
+    api.mail_queue.join()
+    assert sent == ["Personal account history: [20, 30]"]
+
+
+@pytest.mark.parametrize("last", [0, -1, "2", 1.5, True])
+def test_email_history_invalid_last(client, account, last):
+    r = client.post(f"/api/accounts/{account}/history/email", json={"email": "jan@x.pl", "last": last})
+    assert r.status_code == 400
+    assert r.get_json() == {"error": "Invalid last"}
+
+
+def test_email_history_queue_full(client, account, monkeypatch):
+    def full(*args):
+        raise MailQueueFull("Mail queue is full")
+    monkeypatch.setattr("api.mail_queue.enqueue", full)
+    r = client.post(f"/api/accounts/{account}/history/email", json={"email": "jan@x.pl"})
+    assert r.status_code == 503
+
+
+def test_mail_status_unknown(client):
+    assert client.get("/api/mail/nope").status_code == 404
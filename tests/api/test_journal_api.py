@@ -0,0 +1,32 @@
+import pytest
+import api
+from account import AccountsRegistry
+from handlers import account_to_dict
+from journal import Journal
+
+
+@pytest.fixture
+def journal_path(tmp_path, monkeypatch):
+    path = tmp_path / "registry.journal"
+    monkeypatch.setattr(api.registry, "journal", Journal(path))
+    yield path
+    api.registry.journal.close()
+
+
+def test_api_changes_survive_restart(client, journal_path):
+    client.post("/api/accounts", json={"name": "Jan", "surname": "Kowalski", "pesel": "90010112345"})
+    client.post("/api/accounts", json={"name": "Anna", "surname": "Nowak", "pesel": "92020212345"})
+    client.post("/api/accounts/bulk", data=b'{"name":"Ewa","surname":"Lis","pesel":"93030312345"}\n',
+                content_type="application/x-ndjson")
+    client.patch("/api/accounts/90010112345", json={"surname": "Nowak"})
+    client.patch("/api/accounts/90010112345", json={})
+    client.post("/api/accounts/90010112345/transfer", json={"amount": 100, "type": "incoming"})
+    client.post("/api/accounts/90010112345/transfer", json={"amount": 500, "type": "outgoing"})
+    client.post("/api/transfers/batch", json=[{"pesel": "93030312345", "amount": 5, "type": "incoming"}])
+    client.delete("/api/accounts/92020212345")
+
+    restored = AccountsRegistry()
+    restored.replay(Journal(journal_path).read())
+    assert [account_to_dict(a) for a in restored.iter_accounts()] == \
+        client.get("/api/accounts").get_json()
+    assert restored.find_by_pesel("90010112345").last_name == "Nowak"
@@ -0,0 +1,29 @@
+import pytest
+import api
+
+
+@pytest.fixture(autouse=True)
+def clear_metrics():
+    api.metrics.clear()
+    yield
+    api.metrics.clear()
+
+
+def test_metrics_are_labelled_by_route_rule(client):
+    client.post("/api/accounts", json={"name": "Jan", "surname": "Kowalski", "pesel": "90010112345"})
+    client.post("/api/accounts", json={"name": "Jan", "surname": "Kowalski", "pesel": "90010112345"})
+    client.post("/api/accounts/90010112345/transfer", json={"amount": 100, "type": "incoming"})
+    client.get("/api/accounts/99999999999")
+    client.get("/nope")
+
+    r = client.get("/metrics")
+    assert r.status_code == 200
+    assert r.mimetype == "text/plain"
+    lines = r.data.decode().splitlines()
+    assert 'bank_http_requests_total{route="/api/accounts",method="POST",status="201"} 1' in lines
+    assert 'bank_http_errors_total{route="/api/accounts",method="POST",status="409"} 1' in lines
+    assert 'bank_http_requests_total{route="/api/accounts/<pesel>/transfer",method="POST",status="200"} 1' in lines
+    assert 'bank_http_errors_total{route="/api/accounts/<pesel>",method="GET",status="404"} 1' in lines
+    assert 'bank_http_errors_total{route="unmatched",method="GET",status="404"} 1' in lines
+    assert "bank_accounts 1" in lines
+    assert "bank_account_history_length_sum 1" in lines
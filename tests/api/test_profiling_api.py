@@ -0,0 +1,30 @@
+import time
+import pytest
+import api
+from profiling import ProfilingMiddleware, SamplingProfiler
+
+
+@pytest.fixture
+def profiler(monkeypatch):
+    profiler = SamplingProfiler(interval=0.001)
+    monkeypatch.setattr(api.app, "wsgi_app", ProfilingMiddleware(api.app.wsgi_app, profiler))
+    return profiler
+
+
+def test_profiled_request_stacks(client, profiler, monkeypatch):
+    client.post("/api/accounts", json={"name": "Jan", "surname": "Kowalski", "pesel": "90010112345"})
+    find = api.registry.find_by_pesel
+
+    def slow_find(pesel):
+        time.sleep(0.05)
+        return find(pesel)
+    monkeypatch.setattr(api.registry, "find_by_pesel", slow_find)
+
+    assert client.get("/api/accounts/90010112345").status_code == 200
+    assert profiler.counts == {}
+    assert client.get("/api/accounts/90010112345", headers={"X-Profile": "1"}).status_code == 200
+
+    r = client.get("/debug/profile")
+    assert r.status_code == 200
+    assert any("api.py:account_detail;handlers.py:get_account;test_profiling_api.py:slow_find" in line
+               for line in r.data.decode().splitlines())
@@ -0,0 +1,57 @@
+import os
+import subprocess
+import sys
+import pytest
+import api
+from sharding import ShardedRegistry
+
+
+@pytest.fixture(scope="module")
+def sharded():
+    registry = ShardedRegistry(shards=2)
+    yield registry
+    registry.close()
+
+
+@pytest.fixture
+def sharded_client(client, sharded, monkeypatch):
+    sharded.clear()
+    monkeypatch.setattr(api, "registry", sharded)
+    return client
+
+
+def test_routes_work_on_sharded_registry(sharded_client):
+    client = sharded_client
+    pesels = [f"9001011{i:04d}" for i in range(6)]
+    for pesel in pesels[:3]:
+        assert client.post("/api/accounts", json={"name": "Jan", "surname": "Kowalski", "pesel": pesel}).status_code == 201
+    assert client.post("/api/accounts", json={"name": "Jan", "surname": "Kowalski", "pesel": pesels[0]}).status_code == 409
+    body = "".join(f'{{"name":"Ewa","surname":"Lis","pesel":"{p}"}}\n' for p in pesels[3:]).encode()
+    client.post("/api/accounts/bulk", data=body, content_type="application/x-ndjson")
+
+    assert client.get("/api/accounts/count").get_json() == {"count": 6}
+    assert [a["pesel"] for a in client.get("/api/accounts").get_json()] == pesels
+    page = client.get("/api/accounts?limit=4").get_json()
+    assert client.get(f"/api/accounts?limit=4&after={page['next']}").get_json()["accounts"][0]["pesel"] == pesels[4]
+
+    assert client.patch(f"/api/accounts/{pesels[0]}", json={"name": "Janek"}).status_code == 200
+    assert client.post(f"/api/accounts/{pesels[0]}/transfer", json={"amount": 100, "type": "incoming"}).status_code == 200
+    assert client.post(f"/api/accounts/{pesels[0]}/transfer", json={"amount": 500, "type": "outgoing"}).status_code == 422
+    r = client.post("/api/transfers/batch", json={"atomic": True, "transfers": [
+        {"pesel": p, "amount": 10, "type": "incoming"} for p in pesels]})
+    assert r.status_code == 200
+    assert client.get(f"/api/accounts/{pesels[0]}").get_json() == \
+        {"name": "Janek", "surname": "Kowalski", "pesel": pesels[0], "balance": 110}
+
+    assert client.delete(f"/api/accounts/{pesels[1]}").status_code == 200
+    assert client.delete(f"/api/accounts/{pesels[1]}").status_code == 404
+    assert client.get("/api/accounts/count").get_json() == {"count": 5}
+
+
+@pytest.mark.parametrize("setting", ["BANK_APP_JOURNAL", "BANK_APP_SNAPSHOT"])
+def test_sharding_refuses_durability_settings(tmp_path, setting):
+    env = {**os.environ, "BANK_APP_SHARDS": "2", setting: str(tmp_path / "state")}
+    result = subprocess.run([sys.executable, "-c", "import api"], cwd=os.path.dirname(api.__file__),
+                            env=env, capture_output=True, text=True)
+    assert result.returncode != 0
+    assert "not supported with BANK_APP_SHARDS" in result.stderr
@@ -0,0 +1,77 @@
+import pytest
+
+
+@pytest.fixture
+def accounts(client):
+    for pesel in ("90010112345", "92020212345"):
+        client.post("/api/accounts", json={"name": "Jan", "surname": "Kowalski", "pesel": pesel})
+    return "90010112345", "92020212345"
+
+
+def test_batch_transfer_list(client, accounts):
+    first, second = accounts
+    r = client.post("/api/transfers/batch", json=[
+        {"pesel": first, "amount": 100, "type": "incoming"},
+        {"pesel": second, "amount": 50, "type": "outgoing"},
+        {"pesel": "99999999999", "amount": 10, "type": "incoming"},
+    ])
+    assert r.status_code == 200
+    assert [res["status"] for res in r.get_json()["results"]] == [200, 422, 404]
+    assert client.get(f"/api/accounts/{first}").get_json()["balance"] == 100
+
+
+def test_batch_transfer_atomic_rollback(client, accounts):
+    first, second = accounts
+    r = client.post("/api/transfers/batch", json={
+        "atomic": True,
+        "transfers": [
+            {"pesel": first, "amount": 100, "type": "incoming"},
+            {"pesel": second, "amount": 50, "type": "outgoing"},
+        ],
+    })
+    assert r.status_code == 422
+    assert [res["status"] for res in r.get_json()["results"]] == [424, 422]
+    assert client.get(f"/api/accounts/{first}").get_json()["balance"] == 0
+
+
+def test_batch_transfer_atomic_success(client, accounts):
+    first, second = accounts
+    r = client.post("/api/transfers/batch", json={
+        "atomic": True,
+        "transfers": [
+            {"pesel": first, "amount": 100, "type": "incoming"},
+            {"pesel": second, "amount": 50, "type": "incoming"},
+        ],
+    })
+    assert r.status_code == 200
+    assert client.get(f"/api/accounts/{second}").get_json()["balance"] == 50
+
+
+@pytest.mark.parametrize("body", [
+    {"transfers": "nope"},
+    {"atomic": True},
+    "not a list",
+])
+def test_batch_transfer_invalid_json(client, body):
+    r = client.post("/api/transfers/batch", json=body)
+    assert r.status_code == 400
+    assert r.get_json() == {"error": "Invalid JSON"}
+
+
+@pytest.mark.parametrize("atomic", ["false", 0, 1, None, [True]])
+def test_batch_transfer_atomic_must_be_boolean(client, accounts, atomic):
+    first, _ = accounts
+    r = client.post("/api/transfers/batch", json={
+        "atomic": atomic,
+        "transfers": [{"pesel": first, "amount": 10, "type": "incoming"}],
+    })
+    assert r.status_code == 400
+    assert r.get_json() == {"error": "Invalid atomic"}
+    assert client.get(f"/api/accounts/{first}").get_json()["balance"] == 0
+
+
+def test_batch_transfer_too_large(client, monkeypatch):
+    monkeypatch.setattr("handlers.MAX_BATCH_SIZE", 2)
+    item = {"pesel": "90010112345", "amount": 1, "type": "incoming"}
+    r = client.post("/api/transfers/batch", json=[item] * 3)
+    assert r.status_code == 413
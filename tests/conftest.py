@@ -1,5 +1,12 @@
+import json
+import socketserver
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
 import pytest
 import api
+from buisness_account import BuisnessAccount
 
 @pytest.fixture
 def client():
@@ -9,6 +16,141 @@ def client():
 
 @pytest.fixture(autouse=True)
 def clear_registry():
-    api.registry.accounts.clear()
+    api.registry.clear()
+    yield
+    api.registry.clear()
+
+@pytest.fixture(autouse=True)
+def reset_mf_client():
+    BuisnessAccount.nip_cache.clear()
+    BuisnessAccount.mf_breaker.reset()
     yield
-    api.registry.accounts.clear()
\ No newline at end of file
+    BuisnessAccount.nip_cache.clear()
+    BuisnessAccount.mf_breaker.reset()
+
+
+class MFStub:
+    """Local stand-in for the MF whitelist API that counts requests."""
+
+    def __init__(self):
+        self.active_nips = set()
+        self.hits = 0
+        self.connections = 0
+        self.delay = 0
+        self.status = 200
+        self.lock = threading.Lock()
+
+    def handle(self, path):
+        with self.lock:
+            self.hits += 1
+        if self.delay:
+            time.sleep(self.delay)
+        nip = path.split("/api/search/nip/")[-1].split("?")[0]
+        status_vat = "Czynny" if nip in self.active_nips else "Zwolniony"
+        return self.status, {"result": {"subject": {"statusVat": status_vat}}}
+
+
+@pytest.fixture
+def mf_stub(monkeypatch):
+    stub = MFStub()
+
+    class Handler(BaseHTTPRequestHandler):
+        protocol_version = "HTTP/1.1"
+        disable_nagle_algorithm = True
+
+        def setup(self):
+            super().setup()
+            with stub.lock:
+                stub.connections += 1
+
+        def do_GET(self):
+            status, body = stub.handle(self.path)
+            payload = json.dumps(body).encode()
+            self.send_response(status)
+            self.send_header("Content-Type", "application/json")
+            self.send_header("Content-Length", str(len(payload)))
+            self.end_headers()
+            self.wfile.write(payload)
+
+        def log_message(self, *args):
+            pass
+
+    server = ThreadingHTTPServer(("127.0.0.1", 0), Handler)
+    server.daemon_threads = True
+    server.handle_error = lambda request, client_address: None  # clients hanging up early
+    thread = threading.Thread(target=server.serve_forever, args=(0.05,), daemon=True)
+    thread.start()
+    stub.url = f"http://127.0.0.1:{server.server_port}"
+    monkeypatch.setattr(BuisnessAccount, "MF_API_URL", stub.url)
+    yield stub
+    server.shutdown()
+    server.server_close()
+
+
+class SMTPStub:
+    """Minimal local SMTP server that records accepted messages."""
+
+    def __init__(self):
+        self.messages = []
+        self.connections = 0
+        self.rejected = set()
+        self.max_per_connection = None
+        self.lock = threading.Lock()
+
+
+@pytest.fixture
+def smtp_stub():
+    stub = SMTPStub()
+
+    class Handler(socketserver.StreamRequestHandler):
+        disable_nagle_algorithm = True
+
+        def reply(self, line):
+            self.wfile.write(line.encode() + b"\r\n")
+
+        def handle(self):
+            with stub.lock:
+                stub.connections += 1
+            self.reply("220 stub ESMTP")
+            recipients, accepted = [], 0
+            for line in self.rfile:
+                command = line.decode().strip()
+                verb = command[:4].upper()
+                if verb in ("EHLO", "HELO"):
+                    self.reply("250 stub")
+                elif verb == "MAIL" or verb == "RSET":
+                    recipients = []
+                    self.reply("250 OK")
+                elif verb == "RCPT":
+                    address = command.split(":", 1)[1].strip().strip("<>")
+                    if address in stub.rejected:
+                        self.reply("550 No such user")
+                    else:
+                        recipients.append(address)
+                        self.reply("250 OK")
+                elif verb == "DATA":
+                    self.reply("354 End data with <CR><LF>.<CR><LF>")
+                    data = b"".join(iter(self.rfile.readline, b".\r\n"))
+                    with stub.lock:
+                        stub.messages.append((recipients, data))
+                    self.reply("250 OK")
+                    accepted += 1
+                    if stub.max_per_connection and accepted >= stub.max_per_connection:
+                        return
+                elif verb == "NOOP":
+                    self.reply("250 OK")
+                elif verb == "QUIT":
+                    self.reply("221 Bye")
+                    return
+                else:
+                    self.reply("500 Unknown command")
+
+    server = socketserver.ThreadingTCPServer(("127.0.0.1", 0), Handler)
+    server.daemon_threads = True
+    server.handle_error = lambda request, client_address: None
+    thread = threading.Thread(target=server.serve_forever, args=(0.05,), daemon=True)
+    thread.start()
+    stub.host, stub.port = server.server_address
+    yield stub
+    server.shutdown()
+    server.server_close()
@@ -0,0 +1,13 @@
+from pathlib import Path
+
+import pytest
+
+PERF_DIR = Path(__file__).parent
+
+
+def pytest_collection_modifyitems(items):
+    # Everything here asserts wall-clock timings, which coverage tracing
+    # and noisy CI runners skew; select or skip the lot with -m perf.
+    for item in items:
+        if PERF_DIR in item.path.parents:
+            item.add_marker(pytest.mark.perf)
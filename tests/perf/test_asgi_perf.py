@@ -0,0 +1,66 @@
+import asyncio
+import time
+
+import pytest
+
+from loadtest import Client, local_app, seed, seed_pesel
+
+NUM_ACCOUNTS = 100
+DURATION = 3.0  # seconds of load per concurrency level
+CONCURRENCY_LEVELS = (1, 50, 500)
+
+
+async def virtual_user(port, user, deadline, latencies, errors):
+    client = Client(port)
+    i = user
+    while time.perf_counter() < deadline:
+        pesel = seed_pesel(i % NUM_ACCOUNTS)
+        start = time.perf_counter()
+        if i % 5 == 0:
+            status, _ = await client.request("POST", f"/api/accounts/{pesel}/transfer",
+                                             {"amount": 1, "type": "incoming"})
+        else:
+            status, _ = await client.request("GET", f"/api/accounts/{pesel}")
+        if status == 200:
+            latencies.append(time.perf_counter() - start)
+        else:
+            errors.append(status)
+        i += 1
+    client.close()
+
+
+async def run_load(port, users):
+    latencies, errors = [], []
+    deadline = time.perf_counter() + DURATION
+    await asyncio.gather(*(virtual_user(port, u, deadline, latencies, errors) for u in range(users)))
+    latencies.sort()
+    p99 = latencies[int(len(latencies) * 0.99)] if latencies else float("inf")
+    return len(latencies) / DURATION, p99, len(errors)
+
+
+def measure(server):
+    with local_app(server) as port:
+        asyncio.run(seed(port, NUM_ACCOUNTS))
+        return {users: asyncio.run(run_load(port, users)) for users in CONCURRENCY_LEVELS}
+
+
+# ──────────────────────────────────────────────
+# Flask (threaded dev server) vs ASGI (uvicorn) at 1/50/500 clients
+# ──────────────────────────────────────────────
+def test_asgi_vs_flask_under_concurrency():
+    """
+    Drives both serving modes with keep-alive virtual users doing 80%
+    account reads and 20% transfers for a few seconds per concurrency
+    level, reporting requests/s, p99 latency and failed requests.
+    """
+    pytest.importorskip("uvicorn")
+    results = {"flask": measure("flask"), "asgi": measure("asgi")}
+
+    for name, levels in results.items():
+        print(name + ": " + ", ".join(f"{users} clients {rps:.0f} req/s p99 {p99 * 1000:.1f} ms ({errors} errors)"
+                                      for users, (rps, p99, errors) in levels.items()))
+
+    for users in CONCURRENCY_LEVELS:
+        assert results["asgi"][users][0] > 0
+    assert results["asgi"][500][2] == 0
+    assert results["asgi"][500][1] < results["flask"][500][1]
@@ -0,0 +1,50 @@
+import json
+import time
+
+import api
+
+NUM_ROWS = 100_000
+MIN_SPEEDUP = 5
+
+
+def make_rows(prefix):
+    for i in range(NUM_ROWS):
+        yield {"name": "Bulk", "surname": "Test", "pesel": f"{prefix}{i:08d}"}
+
+
+def ndjson_body(rows):
+    return "".join(json.dumps(row) + "\n" for row in rows).encode()
+
+
+# ──────────────────────────────────────────────
+# 100k single creates vs one bulk NDJSON ingest
+# ──────────────────────────────────────────────
+def test_bulk_ingest_vs_single_creates(client):
+    """
+    Creates 100k accounts with one POST /api/accounts each, then
+    another 100k with a single NDJSON POST /api/accounts/bulk.
+    The bulk ingest must be at least MIN_SPEEDUP times faster.
+    """
+    start = time.perf_counter()
+    for row in make_rows("100"):
+        r = client.post("/api/accounts", json=row)
+        assert r.status_code == 201
+    single = time.perf_counter() - start
+
+    start = time.perf_counter()
+    r = client.post(
+        "/api/accounts/bulk",
+        data=ndjson_body(make_rows("200")),
+        content_type="application/x-ndjson",
+    )
+    summary = json.loads(r.get_data(as_text=True).rsplit("\n", 2)[-2])
+    bulk = time.perf_counter() - start
+
+    print(f"single creates: {NUM_ROWS / single:.0f} rows/s, "
+          f"bulk ingest: {NUM_ROWS / bulk:.0f} rows/s")
+
+    assert summary == {"created": NUM_ROWS, "duplicate": 0, "invalid": 0}
+    assert api.registry.count_accounts() == 2 * NUM_ROWS
+    assert single / bulk > MIN_SPEEDUP, (
+        f"bulk ingest only {single / bulk:.1f}x faster"
+    )
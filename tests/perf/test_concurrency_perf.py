@@ -0,0 +1,99 @@
+import sys
+import threading
+import time
+
+import pytest
+import api
+
+THREAD_COUNTS = [1, 2, 4, 8]
+TRANSFERS_PER_THREAD = 300
+TRANSFER_AMOUNT = 10
+
+
+@pytest.fixture(autouse=True)
+def aggressive_thread_switching():
+    # Switch threads as often as possible so unsynchronised
+    # read-modify-write on balance would actually lose updates.
+    previous = sys.getswitchinterval()
+    sys.setswitchinterval(1e-6)
+    yield
+    sys.setswitchinterval(previous)
+
+
+def create_account(client, pesel):
+    r = client.post(
+        "/api/accounts",
+        json={"name": "Stress", "surname": "Test", "pesel": pesel},
+    )
+    assert r.status_code == 201
+
+
+def run_transfers(pesels):
+    """Runs one thread per PESEL, each posting incoming transfers."""
+    barrier = threading.Barrier(len(pesels))
+    errors = []
+
+    def worker(pesel):
+        with api.app.test_client() as client:
+            barrier.wait()
+            for _ in range(TRANSFERS_PER_THREAD):
+                r = client.post(
+                    f"/api/accounts/{pesel}/transfer",
+                    json={"amount": TRANSFER_AMOUNT, "type": "incoming"},
+                )
+                if r.status_code != 200:
+                    errors.append(r.status_code)
+
+    threads = [threading.Thread(target=worker, args=(p,)) for p in pesels]
+    start = time.perf_counter()
+    for t in threads:
+        t.start()
+    for t in threads:
+        t.join()
+    elapsed = time.perf_counter() - start
+
+    assert errors == []
+    return len(pesels) * TRANSFERS_PER_THREAD / elapsed
+
+
+# ──────────────────────────────────────────────
+# N threads hammering one hot account
+# ──────────────────────────────────────────────
+@pytest.mark.parametrize("num_threads", THREAD_COUNTS)
+def test_hot_account_balance_is_exact(client, num_threads):
+    """
+    All threads transfer into the same account.
+    No update may be lost: the final balance and history length
+    must match the number of transfers exactly.
+    """
+    pesel = "90010199999"
+    create_account(client, pesel)
+
+    throughput = run_transfers([pesel] * num_threads)
+    print(f"hot account, {num_threads} threads: {throughput:.0f} transfers/s")
+
+    acc = api.registry.find_by_pesel(pesel)
+    expected = num_threads * TRANSFERS_PER_THREAD
+    assert acc.balance == expected * TRANSFER_AMOUNT
+    assert len(acc.history) == expected
+
+
+# ──────────────────────────────────────────────
+# N threads, each on its own cold account
+# ──────────────────────────────────────────────
+@pytest.mark.parametrize("num_threads", THREAD_COUNTS)
+def test_cold_accounts_balance_is_exact(client, num_threads):
+    """
+    Every thread transfers into its own account, so threads only
+    contend when their PESELs land on the same lock stripe.
+    """
+    pesels = [f"9001011{i:04d}" for i in range(num_threads)]
+    for pesel in pesels:
+        create_account(client, pesel)
+
+    throughput = run_transfers(pesels)
+    print(f"cold accounts, {num_threads} threads: {throughput:.0f} transfers/s")
+
+    for pesel in pesels:
+        acc = api.registry.find_by_pesel(pesel)
+        assert acc.balance == TRANSFERS_PER_THREAD * TRANSFER_AMOUNT
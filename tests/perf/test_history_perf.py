@@ -0,0 +1,98 @@
+import time
+import tracemalloc
+from unittest.mock import patch
+
+from account import Account
+from buisness_account import BuisnessAccount
+
+HISTORY_SIZES = [10, 1_000_000]
+NUM_CHECKS = 10_000
+MAX_SLOWDOWN = 3
+
+
+def personal_account(size):
+    acc = Account("Jan", "Kowalski", "90010112345")
+    acc.history = range(1, size + 1)
+    return acc
+
+
+def business_account(size):
+    with patch.object(BuisnessAccount, "_nip_validation", lambda self: True):
+        acc = BuisnessAccount("Firma", "1234567891")
+    acc.history = [-1775] + [1] * (size - 1)
+    return acc
+
+
+def time_per_call(fn):
+    start = time.perf_counter()
+    for _ in range(NUM_CHECKS):
+        fn()
+    return (time.perf_counter() - start) / NUM_CHECKS
+
+
+def assert_flat(name, timings):
+    small, large = (timings[size] for size in HISTORY_SIZES)
+    print(f"{name}: {small * 1e9:.0f} ns at {HISTORY_SIZES[0]} entries, "
+          f"{large * 1e9:.0f} ns at {HISTORY_SIZES[-1]} entries")
+    assert large < small * MAX_SLOWDOWN
+
+
+# ──────────────────────────────────────────────
+# Loan rules must not depend on history length
+# ──────────────────────────────────────────────
+def test_loan_conditions_constant_time():
+    """
+    Times loan_condition1/loan_condition2 on a 10-entry and a 1M-entry
+    history. The large history must not be noticeably slower.
+    """
+    accounts = {size: personal_account(size) for size in HISTORY_SIZES}
+    assert_flat("loan_condition1", {
+        size: time_per_call(lambda: acc.loan_condition1(10**12))
+        for size, acc in accounts.items()
+    })
+    assert_flat("loan_condition2", {
+        size: time_per_call(lambda: acc.loan_condition2(10))
+        for size, acc in accounts.items()
+    })
+
+
+def test_take_loan_eligibility_constant_time():
+    """
+    The ZUS payment sits at the very start of a 1M-entry history, the
+    worst case for a linear scan. take_loan must stay flat; the loan is
+    too large to be granted, so the account is not modified.
+    """
+    accounts = {size: business_account(size) for size in HISTORY_SIZES}
+    assert_flat("take_loan", {
+        size: time_per_call(lambda: acc.take_loan(10**12))
+        for size, acc in accounts.items()
+    })
+    for acc in accounts.values():
+        assert acc.history.tag_count("zus") == 1
+
+
+# ──────────────────────────────────────────────
+# Typed array vs list of ints
+# ──────────────────────────────────────────────
+def test_history_memory_per_entry():
+    """
+    Compares traced bytes per history entry for 1M amounts stored in the
+    typed history against a plain list of ints.
+    """
+    size = HISTORY_SIZES[-1]
+    amounts = range(100_000, 100_000 + size)
+
+    tracemalloc.start()
+    as_list = list(amounts)
+    list_bytes = tracemalloc.get_traced_memory()[0]
+    tracemalloc.stop()
+
+    tracemalloc.start()
+    acc = personal_account(0)
+    acc.history = amounts
+    history_bytes = tracemalloc.get_traced_memory()[0]
+    tracemalloc.stop()
+
+    print(f"list: {list_bytes / size:.1f} B/entry, History: {history_bytes / size:.1f} B/entry")
+    assert len(as_list) == len(acc.history)
+    assert history_bytes < list_bytes / 3
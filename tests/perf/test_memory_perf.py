@@ -0,0 +1,68 @@
+import tracemalloc
+
+from account import Account
+from buisness_account import BuisnessAccount
+
+NUM_ACCOUNTS = 1_000_000
+MIN_SAVING = 0.15  # slotted accounts must use at least 15% less memory
+
+
+def with_dict(cls):
+    """Same class without __slots__, i.e. the previous per-instance __dict__ layout."""
+    namespace = {
+        name: value for name, value in vars(cls).items()
+        if name not in cls.__slots__ and name != "__slots__"
+    }
+    return type(cls.__name__, (), namespace)
+
+
+def bytes_per_account(factory):
+    tracemalloc.start()
+    try:
+        accounts = [factory(i) for i in range(NUM_ACCOUNTS)]
+        size = tracemalloc.get_traced_memory()[0]
+    finally:
+        tracemalloc.stop()
+    assert len(accounts) == NUM_ACCOUNTS
+    return size / NUM_ACCOUNTS
+
+
+def compare(name, slotted, unslotted):
+    before = bytes_per_account(unslotted)
+    after = bytes_per_account(slotted)
+    print(f"{name}: {before:.0f} B/account with __dict__, {after:.0f} B/account with __slots__")
+    assert after < before * (1 - MIN_SAVING), (
+        f"{name} only saves {(1 - after / before) * 100:.0f}%"
+    )
+
+
+# ──────────────────────────────────────────────
+# Bytes per Account, 1M instances
+# ──────────────────────────────────────────────
+def test_account_memory_per_instance():
+    """
+    Allocates 1M personal accounts with and without __slots__ and
+    compares the traced bytes per account.
+    """
+    dict_account = with_dict(Account)
+    compare(
+        "Account",
+        lambda i: Account("Jan", "Kowalski", f"{i:011d}"),
+        lambda i: dict_account("Jan", "Kowalski", f"{i:011d}"),
+    )
+
+
+# ──────────────────────────────────────────────
+# Bytes per BuisnessAccount, 1M instances
+# ──────────────────────────────────────────────
+def test_business_account_memory_per_instance():
+    """
+    Same comparison for business accounts. A too-short NIP skips the
+    MF lookup, so no network access happens.
+    """
+    dict_account = with_dict(BuisnessAccount)
+    compare(
+        "BuisnessAccount",
+        lambda i: BuisnessAccount("Firma", "123"),
+        lambda i: dict_account("Firma", "123"),
+    )
@@ -0,0 +1,86 @@
+import time
+
+import api
+from account import Account, AccountsRegistry
+from metrics import Metrics
+
+NUM_CALLS = 200_000
+NUM_REQUESTS = 5_000
+NUM_ACCOUNTS = 100_000
+MAX_OVERHEAD_US = 5  # per request, both hooks together
+MAX_RENDER_S = 0.01
+
+
+def per_call_us(fn, n):
+    start = time.perf_counter()
+    for _ in range(n):
+        fn()
+    return (time.perf_counter() - start) / n * 1_000_000
+
+
+# ──────────────────────────────────────────────
+# Instrumentation cost per request
+# ──────────────────────────────────────────────
+def test_request_hooks_overhead():
+    """
+    Times Metrics.observe on its own and the before/after request hooks
+    together inside a request context, i.e. everything the
+    instrumentation adds to a request. For scale, also times full
+    test-client GETs with and without the hooks installed.
+    """
+    metrics = Metrics()
+    observe_us = per_call_us(lambda: metrics.observe("/api/accounts/<pesel>", "GET", 200, 0.0003), NUM_CALLS)
+
+    response = api.app.response_class("", 200)
+    with api.app.test_request_context("/api/accounts/90010112345", method="GET") as ctx:
+        ctx.request.url_rule = next(api.app.url_map.iter_rules("account_detail"))
+
+        def hooks():
+            api.start_timer()
+            api.record_request(response)
+        hooks_us = per_call_us(hooks, NUM_CALLS)
+
+    client = api.app.test_client()
+    client.post("/api/accounts", json={"name": "Perf", "surname": "Metrics", "pesel": "90010112345"})
+    get = lambda: client.get("/api/accounts/90010112345")
+    with_hooks_us = per_call_us(get, NUM_REQUESTS)
+    before, after = api.app.before_request_funcs[None], api.app.after_request_funcs[None]
+    api.app.before_request_funcs[None], api.app.after_request_funcs[None] = [], []
+    try:
+        without_hooks_us = per_call_us(get, NUM_REQUESTS)
+    finally:
+        api.app.before_request_funcs[None], api.app.after_request_funcs[None] = before, after
+    api.metrics.clear()
+
+    print(f"observe: {observe_us:.2f} us, hooks: {hooks_us:.2f} us per request; "
+          f"test-client GET {with_hooks_us:.0f} us with hooks, {without_hooks_us:.0f} us without")
+
+    assert observe_us < MAX_OVERHEAD_US
+    assert hooks_us < MAX_OVERHEAD_US
+
+
+# ──────────────────────────────────────────────
+# Scrape cost at 100k accounts
+# ──────────────────────────────────────────────
+def test_render_with_large_registry():
+    """
+    Renders /metrics for 100k accounts. The registry keeps its history
+    length distribution up to date on every change, so a scrape reads a
+    few counters instead of walking the accounts.
+    """
+    registry = AccountsRegistry()
+    for i in range(NUM_ACCOUNTS):
+        acc = Account("Perf", "Metrics", f"{i:011d}")
+        acc.history = [1] * (i % 20)
+        registry.add_account(acc)
+    metrics = Metrics()
+    metrics.observe("/api/accounts", "GET", 200, 0.001)
+
+    start = time.perf_counter()
+    text = metrics.render(registry)
+    elapsed = time.perf_counter() - start
+
+    print(f"render with {NUM_ACCOUNTS} accounts: {elapsed * 1000:.0f} ms, {len(text)} bytes")
+    assert f"bank_accounts {NUM_ACCOUNTS}" in text
+    assert f"bank_account_history_length_sum {sum(i % 20 for i in range(NUM_ACCOUNTS))}" in text
+    assert elapsed < MAX_RENDER_S
@@ -0,0 +1,113 @@
+import time
+
+import pytest
+import requests
+
+from buisness_account import BuisnessAccount
+from mf.session import make_session
+
+NUM_VALIDATIONS = 1000
+
+
+def time_validations(monkeypatch, http):
+    monkeypatch.setattr(BuisnessAccount, "session", http)
+    acc = BuisnessAccount("Perf", "123")  # too short: no lookup on construction
+    start = time.perf_counter()
+    for i in range(NUM_VALIDATIONS):
+        assert acc._query_mf(f"{i:010d}") is False
+    return time.perf_counter() - start
+
+
+# ──────────────────────────────────────────────
+# 1k MF lookups: new connection per call vs pool
+# ──────────────────────────────────────────────
+def test_pooled_session_vs_per_call_connections(mf_stub, monkeypatch):
+    """
+    Validates 1k NIPs against the local MF stub, first with module-level
+    requests.get (one TCP connection per call), then with the pooled
+    keep-alive session. The pool must open a single connection and be
+    faster overall.
+    """
+    per_call = time_validations(monkeypatch, requests)
+    per_call_connections = mf_stub.connections
+
+    pooled = time_validations(monkeypatch, make_session())
+    pooled_connections = mf_stub.connections - per_call_connections
+
+    print(f"per-call: {NUM_VALIDATIONS / per_call:.0f} validations/s "
+          f"({per_call_connections} connections), "
+          f"pooled: {NUM_VALIDATIONS / pooled:.0f} validations/s "
+          f"({pooled_connections} connections)")
+
+    assert per_call_connections == NUM_VALIDATIONS
+    assert pooled_connections == 1
+    assert pooled < per_call
+
+
+NUM_COMPANIES = 200
+MF_LATENCY = 0.02  # seconds added by the stub to every lookup
+MIN_BATCH_SPEEDUP = 5
+
+
+# ──────────────────────────────────────────────
+# Onboarding: sequential constructors vs batch
+# ──────────────────────────────────────────────
+def test_batch_validation_vs_sequential(mf_stub):
+    """
+    Onboards 200 companies (each NIP listed twice) against a stub that
+    adds 20 ms per lookup: first one constructor at a time, then with
+    validate_nips followed by constructors that reuse its results.
+    """
+    mf_stub.delay = MF_LATENCY
+    nips = [f"{i:010d}" for i in range(NUM_COMPANIES)]
+    mf_stub.active_nips.update(nips)
+    onboarding = nips + nips
+
+    start = time.perf_counter()
+    for nip in onboarding:
+        BuisnessAccount("Firma", nip)
+    sequential = time.perf_counter() - start
+    sequential_hits = mf_stub.hits
+
+    BuisnessAccount.nip_cache.clear()
+    start = time.perf_counter()
+    result = BuisnessAccount.validate_nips(onboarding)
+    accounts = [BuisnessAccount("Firma", nip, mf_result=result[nip]) for nip in onboarding]
+    batched = time.perf_counter() - start
+
+    print(f"sequential: {sequential:.2f} s, batch: {batched:.2f} s "
+          f"({BuisnessAccount.MF_CONCURRENCY} workers)")
+
+    assert len(accounts) == len(onboarding)
+    assert mf_stub.hits - sequential_hits == NUM_COMPANIES
+    assert sequential / batched > MIN_BATCH_SPEEDUP
+
+
+SLOW_MF_DELAY = 1.0
+NUM_DEGRADED_REQUESTS = 50
+
+
+# ──────────────────────────────────────────────
+# Degraded MF: breaker + deadline fail fast
+# ──────────────────────────────────────────────
+def test_degraded_mf_fails_fast(mf_stub):
+    """
+    MF answers after 1 s. With a 0.2 s deadline per creation the first
+    few requests time out, the breaker opens, and the remaining ones are
+    rejected without touching MF. 50 creations must finish in far less
+    than 50 × the stub delay.
+    """
+    mf_stub.delay = SLOW_MF_DELAY
+
+    start = time.perf_counter()
+    for i in range(NUM_DEGRADED_REQUESTS):
+        with pytest.raises(ValueError):
+            BuisnessAccount("Firma", f"{i:010d}", deadline=time.monotonic() + 0.2)
+    elapsed = time.perf_counter() - start
+
+    stats = BuisnessAccount.mf_stats()["breaker"]
+    print(f"{NUM_DEGRADED_REQUESTS} creations in {elapsed:.2f} s, breaker {stats}")
+
+    assert stats["state"] == "open"
+    assert stats["rejected"] >= NUM_DEGRADED_REQUESTS - BuisnessAccount.mf_breaker.failure_threshold
+    assert elapsed < 2 * BuisnessAccount.mf_breaker.failure_threshold * 0.2 + 1
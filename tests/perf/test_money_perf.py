@@ -0,0 +1,112 @@
+import json
+import random
+import time
+from array import array
+from decimal import Decimal
+
+import pytest
+
+from account import Account
+from history import History
+from money import to_grosze
+
+HISTORY_SIZE = 1_000_000
+ROUNDS = 5
+MAX_VECTOR_INT_SLOWDOWN = 1.5
+MIN_DECIMAL_SPEEDUP = 1.5
+NUM_AMOUNTS = 200_000
+MAX_DEPOSIT_NS = 3000
+
+
+def best_of(fn, rounds=ROUNDS):
+    best = None
+    for _ in range(rounds):
+        start = time.perf_counter()
+        result = fn()
+        elapsed = time.perf_counter() - start
+        best = elapsed if best is None else min(best, elapsed)
+    return result, best
+
+
+def json_amounts(n):
+    """Amounts as a JSON body delivers them: whole złoty as ints, the rest as floats."""
+    rng = random.Random(0)
+    text = json.dumps([rng.randrange(-100_000, 100_000) / 100 if i % 3 else rng.randrange(1, 1000)
+                       for i in range(n)])
+    return json.loads(text)
+
+
+# ──────────────────────────────────────────────
+# Summing a 1M-entry history: int64 grosze vs float64 vs Decimal
+# ──────────────────────────────────────────────
+def test_total_of_large_history():
+    """
+    Sums 1M amounts stored as int64 grosze and as float64 złoty (how
+    fractional histories used to be stored), each engine against itself:
+    NumPy int64 vs NumPy float64, and sum() over array("q") vs sum() over
+    array("d") and over Decimals.
+
+    The claim is exactness at no vectorized cost: the integer sums are
+    exact, NumPy sums int64 about as fast as float64, and Python sums ints
+    well ahead of Decimal (the exact alternative) though behind floats,
+    which skip boxing ints but drift. History itself keeps a running
+    total, so total_grosze() does not sum at all.
+    """
+    np = pytest.importorskip("numpy")
+    amounts = json_amounts(HISTORY_SIZE)
+    history = History(amounts)
+    grosze = array("q", history.tobytes())
+    floats = array("d", amounts)
+    decimals = [Decimal(repr(a)) for a in amounts]
+    exact = sum(decimals)
+
+    int_vector, int_vector_time = best_of(lambda: np.frombuffer(grosze, dtype=np.int64).sum())
+    float_vector, float_vector_time = best_of(lambda: np.frombuffer(floats, dtype=np.float64).sum())
+    int_total, int_time = best_of(lambda: sum(grosze))
+    float_total, float_time = best_of(lambda: sum(floats))
+    _, decimal_time = best_of(lambda: sum(decimals))
+    _, running_time = best_of(history.total_grosze)
+
+    print(f"NumPy: int64 {int_vector_time * 1000:.2f} ms, float64 {float_vector_time * 1000:.2f} ms; "
+          f"sum(): ints {int_time * 1000:.1f} ms, floats {float_time * 1000:.1f} ms, "
+          f"Decimal {decimal_time * 1000:.1f} ms; running total {running_time * 1e6:.2f} us; "
+          f"float error {float(Decimal(float_total) - exact):.2e} (NumPy {float(Decimal(float(float_vector)) - exact):.2e})")
+
+    assert Decimal(int(int_vector)) / 100 == Decimal(int_total) / 100 == exact
+    assert Decimal(history.total_grosze()) / 100 == exact
+    assert int_vector_time < float_vector_time * MAX_VECTOR_INT_SLOWDOWN
+    assert decimal_time > int_time * MIN_DECIMAL_SPEEDUP
+
+
+# ──────────────────────────────────────────────
+# Parsing JSON amounts and applying them
+# ──────────────────────────────────────────────
+def test_parse_and_deposit_json_amounts():
+    """
+    Converts JSON amounts to grosze, compared with Decimal(str(amount)),
+    the usual exact alternative, then deposits them all into one account.
+    Parsing must beat Decimal, each deposit must stay cheap and the final
+    balance must be exact where a float running sum drifts.
+    """
+    amounts = json_amounts(NUM_AMOUNTS)
+
+    grosze, grosze_time = best_of(lambda: [to_grosze(a) for a in amounts])
+    _, decimal_time = best_of(lambda: [Decimal(str(a)) for a in amounts])
+
+    acc = Account("Perf", "Money", "90010112345")
+    start = time.perf_counter()
+    for amount in amounts:
+        acc.deposit(amount)
+    deposit_ns = (time.perf_counter() - start) / NUM_AMOUNTS * 1e9
+
+    float_balance = 0.0
+    for amount in amounts:
+        float_balance += amount
+
+    print(f"parse: {grosze_time / NUM_AMOUNTS * 1e9:.0f} ns grosze, {decimal_time / NUM_AMOUNTS * 1e9:.0f} ns "
+          f"Decimal; deposit: {deposit_ns:.0f} ns; float drift {float_balance - acc.balance:.2e}")
+
+    assert acc.balance_grosze == sum(grosze)
+    assert acc.history.total_grosze() == acc.balance_grosze
+    assert grosze_time < decimal_time
+    assert deposit_ns < MAX_DEPOSIT_NS
@@ -0,0 +1,76 @@
+import time
+import tracemalloc
+
+import api
+from account import Account
+
+REGISTRY_SIZES = [25_000, 100_000]
+PAGE_SIZE = 100
+
+
+def fill_registry(size):
+    api.registry.clear()
+    api.registry.add_accounts(Account("Perf", "Paging", f"{i:011d}") for i in range(size))
+
+
+def peak_memory(fn):
+    tracemalloc.start()
+    try:
+        fn()
+        return tracemalloc.get_traced_memory()[1]
+    finally:
+        tracemalloc.stop()
+
+
+def consume(response):
+    for _ in response.response:
+        pass
+
+
+# ──────────────────────────────────────────────
+# Streaming keeps peak memory flat
+# ──────────────────────────────────────────────
+def test_streaming_peak_memory_is_constant(client):
+    """
+    Streams the whole registry as NDJSON for 25k and 100k accounts.
+    Peak memory while streaming must not grow with the account count,
+    unlike the plain GET /api/accounts list.
+    """
+    streamed = {}
+    full = {}
+    for size in REGISTRY_SIZES:
+        fill_registry(size)
+        streamed[size] = peak_memory(
+            lambda: consume(client.get("/api/accounts?stream=ndjson", buffered=False))
+        )
+        full[size] = peak_memory(lambda: client.get("/api/accounts").get_data())
+        print(f"{size:>7} accounts: streamed peak {streamed[size] / 1024:.0f} KiB, "
+              f"full list peak {full[size] / 1024:.0f} KiB")
+
+    small, large = REGISTRY_SIZES
+    assert streamed[large] < streamed[small] * 1.5
+    assert full[large] > full[small] * 2
+
+
+# ──────────────────────────────────────────────
+# Deep cursors are as cheap as the first page
+# ──────────────────────────────────────────────
+def test_page_latency_independent_of_cursor_depth(client):
+    """
+    Fetches a page at the start and at the end of a 100k registry.
+    The deep page must not be noticeably slower than the first one.
+    """
+    size = REGISTRY_SIZES[-1]
+    fill_registry(size)
+
+    def time_page(after):
+        url = f"/api/accounts?limit={PAGE_SIZE}" + (f"&after={after}" if after else "")
+        start = time.perf_counter()
+        for _ in range(50):
+            assert client.get(url).status_code == 200
+        return (time.perf_counter() - start) / 50
+
+    first = time_page(None)
+    deep = time_page(f"{size - PAGE_SIZE - 1:011d}")
+    print(f"first page: {first * 1e3:.2f} ms, deep page: {deep * 1e3:.2f} ms")
+    assert deep < first * 3
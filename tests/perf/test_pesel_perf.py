@@ -0,0 +1,106 @@
+import random
+import time
+
+import pytest
+
+from account import Account, AccountsRegistry
+from bulk_import import build_accounts, import_accounts
+from pesel import WEIGHTS, age_eligible, classify_pesels, is_valid_pesel
+
+NUM_ROWS = 1_000_000
+MIN_CLASSIFY_SPEEDUP = 3
+MIN_BUILD_SPEEDUP = 1.3  # object construction dominates both paths, so the gap is narrow
+NUM_CREATES = 1_000_000
+MAX_STRICT_COST_NS = 3000  # added per Account(...)
+
+
+def timed(fn):
+    start = time.perf_counter()
+    result = fn()
+    return result, time.perf_counter() - start
+
+
+def make_rows(n):
+    rng = random.Random(0)
+    rows = []
+    for i in range(n):
+        pesel = f"{rng.randrange(40, 100):02d}{rng.randrange(1, 13):02d}{i:07d}"
+        rows.append(("Perf", "Pesel", pesel, "PROM_BULK" if i % 2 else None))
+    return rows
+
+
+# ──────────────────────────────────────────────
+# 1M PESELs: per-object checks vs one vectorized batch
+# ──────────────────────────────────────────────
+def test_classify_and_build_1m_rows():
+    """
+    Checks 1M PESELs one by one (length test plus age validation, as
+    Account.__init__ does) and as one classify_pesels batch, then builds
+    the accounts both ways: Account(...) per row against build_accounts
+    fed by the batch results. Finally imports the rows into a registry.
+    """
+    pytest.importorskip("numpy")
+    rows = make_rows(NUM_ROWS)
+    pesels = [pesel for _, _, pesel, _ in rows]
+
+    per_object, per_object_time = timed(lambda: [(len(p) == 11, age_eligible(p)) for p in pesels])
+    (valid, _, eligible), vectorized_time = timed(lambda: classify_pesels(pesels))
+    assert list(zip(valid, eligible)) == per_object
+
+    accounts, build_per_object_time = timed(lambda: [Account(*row) for row in rows])
+    built, build_vectorized_time = timed(lambda: build_accounts(rows))
+    assert [a.balance for a in built] == [a.balance for a in accounts]
+    del accounts, built
+
+    registry = AccountsRegistry()
+    dict_rows = [{"name": n, "surname": s, "pesel": p, "promo_code": c} for n, s, p, c in rows]
+    results, import_time = timed(lambda: sum(1 for _ in import_accounts(registry, dict_rows)))
+
+    print(f"checks: {per_object_time:.2f}s per object, {vectorized_time:.2f}s vectorized "
+          f"({per_object_time / vectorized_time:.1f}x); "
+          f"accounts: {build_per_object_time:.2f}s per object, {build_vectorized_time:.2f}s batched "
+          f"({build_per_object_time / build_vectorized_time:.1f}x); "
+          f"import of {results} rows: {import_time:.2f}s")
+
+    assert registry.count_accounts() == NUM_ROWS
+    assert per_object_time > vectorized_time * MIN_CLASSIFY_SPEEDUP
+    assert build_per_object_time > build_vectorized_time * MIN_BUILD_SPEEDUP
+
+
+def per_call_ns(fn, items):
+    start = time.perf_counter()
+    for item in items:
+        fn(item)
+    return (time.perf_counter() - start) / len(items) * 1e9
+
+
+# ──────────────────────────────────────────────
+# Cost of full PESEL validation on the create path
+# ──────────────────────────────────────────────
+def test_strict_pesel_cost_per_create(monkeypatch):
+    """
+    Times the old length check against is_valid_pesel (digits, birth
+    date, checksum) on 1M valid PESELs, then Account(...) construction
+    with and without BANK_APP_STRICT_PESEL. The checksum must not add
+    more than MAX_STRICT_COST_NS to each account creation.
+    """
+    rng = random.Random(0)
+    pesels = []
+    for i in range(NUM_CREATES):
+        first_ten = f"{rng.randrange(100):02d}{rng.randrange(1, 13):02d}{rng.randrange(1, 29):02d}{i % 10000:04d}"
+        pesels.append(first_ten + str(-sum(int(d) * w for d, w in zip(first_ten, WEIGHTS)) % 10))
+
+    length_ns = per_call_ns(lambda p: len(p) == 11, pesels)
+    full_ns = per_call_ns(is_valid_pesel, pesels)
+    assert all(map(is_valid_pesel, pesels))
+
+    create = lambda p: Account("Perf", "Pesel", p)
+    lenient_ns = per_call_ns(create, pesels)
+    monkeypatch.setattr(Account, "STRICT_PESEL", True)
+    strict_ns = per_call_ns(create, pesels)
+
+    print(f"length check: {length_ns:.0f} ns, full validation: {full_ns:.0f} ns; "
+          f"Account(...): {lenient_ns:.0f} ns lenient, {strict_ns:.0f} ns strict "
+          f"(+{strict_ns - lenient_ns:.0f} ns per create)")
+
+    assert strict_ns - lenient_ns < MAX_STRICT_COST_NS
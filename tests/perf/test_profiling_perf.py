@@ -0,0 +1,79 @@
+import time
+
+import api
+from profiling import ProfilingMiddleware, SamplingProfiler
+
+NUM_CALLS = 200_000
+NUM_REQUESTS = 2_000
+ROUNDS = 3
+MAX_IDLE_OVERHEAD_US = 2
+MAX_PROFILED_SLOWDOWN = 1.5
+
+
+def per_call_us(fn, n):
+    start = time.perf_counter()
+    for _ in range(n):
+        fn()
+    return (time.perf_counter() - start) / n * 1_000_000
+
+
+def best_per_call_us(fn, n):
+    return min(per_call_us(fn, n) for _ in range(ROUNDS))
+
+
+def per_request_us(client, headers=None):
+    def requests():
+        for i in range(NUM_REQUESTS):
+            pesel = f"{i % 100:011d}"
+            if i % 4 == 0:
+                client.post(f"/api/accounts/{pesel}/transfer", json={"amount": 1, "type": "incoming"},
+                            headers=headers)
+            else:
+                client.get(f"/api/accounts/{pesel}", headers=headers)
+    return best_per_call_us(requests, 1) / NUM_REQUESTS
+
+
+# ──────────────────────────────────────────────
+# Profiling hook cost when idle and when sampling
+# ──────────────────────────────────────────────
+def test_profiling_overhead():
+    """
+    Without BANK_APP_PROFILE the middleware is not installed at all, so
+    requests run through the bare Flask app. Installed but not triggered
+    it costs one header lookup per request, timed here around a trivial
+    WSGI app. Profiled requests (X-Profile: 1) also pay for the sampler
+    thread waking every 5 ms. Prints the hottest collapsed stacks of a
+    profiled 75% reads / 25% transfers run.
+    """
+    assert not isinstance(api.app.wsgi_app, ProfilingMiddleware)
+
+    def trivial_app(environ, start_response):
+        return [b""]
+    environ = {"PATH_INFO": "/api/accounts/00000000000"}
+    bare_call_us = best_per_call_us(lambda: trivial_app(environ, None), NUM_CALLS)
+    middleware = ProfilingMiddleware(trivial_app, SamplingProfiler())
+    idle_call_us = best_per_call_us(lambda: middleware(environ, None), NUM_CALLS)
+
+    client = api.app.test_client()
+    for i in range(100):
+        client.post("/api/accounts", json={"name": "Perf", "surname": "Profile", "pesel": f"{i:011d}"})
+    profiler = SamplingProfiler()
+    original = api.app.wsgi_app
+    api.app.wsgi_app = ProfilingMiddleware(original, profiler)
+    try:
+        unprofiled_us = per_request_us(client)
+        profiled_us = per_request_us(client, headers={"X-Profile": "1"})
+    finally:
+        api.app.wsgi_app = original
+        api.registry.clear()
+        api.metrics.clear()
+
+    print(f"idle middleware: +{idle_call_us - bare_call_us:.2f} us per call; "
+          f"test-client requests: {unprofiled_us:.0f} us unprofiled, {profiled_us:.0f} us profiled, "
+          f"{sum(profiler.counts.values())} samples")
+    for stack, n in profiler.counts.most_common(5):
+        print(f"  {n:4d}  ...{stack[-150:]}")
+
+    assert idle_call_us - bare_call_us < MAX_IDLE_OVERHEAD_US
+    assert profiled_us < unprofiled_us * MAX_PROFILED_SLOWDOWN
+    assert profiler.counts
@@ -0,0 +1,70 @@
+import random
+import time
+
+from account import Account, AccountsRegistry
+
+REGISTRY_SIZES = [1_000, 10_000, 100_000, 1_000_000]
+NUM_LOOKUPS = 100_000
+MAX_SLOWDOWN = 10  # cache misses only; a linear scan would be ~1000x slower
+
+
+def build_registry(size):
+    registry = AccountsRegistry()
+    for i in range(size):
+        registry.add_account(Account("Perf", "Registry", f"{i:011d}"))
+    return registry
+
+
+def time_lookups(registry, pesels):
+    start = time.perf_counter()
+    for pesel in pesels:
+        registry.find_by_pesel(pesel)
+    return (time.perf_counter() - start) / len(pesels)
+
+
+# ──────────────────────────────────────────────
+# Lookup time must stay flat from 1k to 1M accounts
+# ──────────────────────────────────────────────
+def test_find_by_pesel_is_constant_time():
+    """
+    Builds registries of 1k, 10k, 100k and 1M accounts and times
+    100k random find_by_pesel calls against each of them.
+    Per-lookup time on the largest registry must stay within
+    MAX_SLOWDOWN of the smallest one.
+    """
+    rng = random.Random(0)
+    per_lookup = {}
+
+    for size in REGISTRY_SIZES:
+        registry = build_registry(size)
+        pesels = [f"{rng.randrange(size):011d}" for _ in range(NUM_LOOKUPS)]
+        per_lookup[size] = time_lookups(registry, pesels)
+        print(f"{size:>9} accounts: {per_lookup[size] * 1e9:.0f} ns/lookup")
+
+    smallest = per_lookup[REGISTRY_SIZES[0]]
+    largest = per_lookup[REGISTRY_SIZES[-1]]
+    assert largest < smallest * MAX_SLOWDOWN, (
+        f"Lookup slowed down from {smallest * 1e9:.0f} ns "
+        f"to {largest * 1e9:.0f} ns"
+    )
+
+
+# ──────────────────────────────────────────────
+# Insert + delete churn on a large registry
+# ──────────────────────────────────────────────
+def test_add_and_delete_on_large_registry():
+    """
+    Adds and removes 10k accounts on top of a 100k registry.
+    Each add/delete pair must average well under 50 µs.
+    """
+    registry = build_registry(100_000)
+    extra = [Account("Perf", "Churn", f"9{i:010d}") for i in range(10_000)]
+
+    start = time.perf_counter()
+    for acc in extra:
+        registry.add_account(acc)
+        assert registry.delete_by_pesel(acc.pesel) is True
+    per_pair = (time.perf_counter() - start) / len(extra)
+
+    assert registry.count_accounts() == 100_000
+    assert per_pair < 50e-6, f"add+delete took {per_pair * 1e6:.1f} µs"
@@ -0,0 +1,59 @@
+import os
+import threading
+import time
+
+from account import Account, AccountsRegistry
+from sharding import ShardedRegistry
+
+NUM_ACCOUNTS = 10_000
+NUM_CLIENTS = 8
+BATCHES_PER_CLIENT = 10
+BATCH_SIZE = 1000
+SHARD_COUNTS = (1, 2, 4, 8)
+
+
+def transfers_per_second(registry):
+    registry.add_accounts([Account("Perf", "Test", f"{i:011d}") for i in range(NUM_ACCOUNTS)])
+
+    def client(c):
+        for b in range(BATCHES_PER_CLIENT):
+            offset = (c * BATCHES_PER_CLIENT + b) * BATCH_SIZE
+            items = [{"pesel": f"{(offset + i) % NUM_ACCOUNTS:011d}", "amount": 1, "type": "incoming"}
+                     for i in range(BATCH_SIZE)]
+            assert all(r["status"] == 200 for r in registry.apply_batch(items))
+
+    threads = [threading.Thread(target=client, args=(c,)) for c in range(NUM_CLIENTS)]
+    start = time.perf_counter()
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    elapsed = time.perf_counter() - start
+
+    total = NUM_CLIENTS * BATCHES_PER_CLIENT * BATCH_SIZE
+    assert sum(a.balance for a in registry.iter_accounts()) == total
+    return total / elapsed
+
+
+# ──────────────────────────────────────────────
+# Batch transfers: one process vs 1/2/4/8 shard processes
+# ──────────────────────────────────────────────
+def test_sharded_batch_throughput():
+    """
+    8 client threads each send 10 batches of 1000 transfers. The
+    in-process registry is bound to one core by the GIL; shard processes
+    apply their part of each batch in parallel, so throughput should grow
+    with the shard count up to the number of cores.
+    """
+    rates = {"in-process": transfers_per_second(AccountsRegistry())}
+    for shards in SHARD_COUNTS:
+        registry = ShardedRegistry(shards)
+        try:
+            rates[f"{shards} shards"] = transfers_per_second(registry)
+        finally:
+            registry.close()
+
+    print(f"{os.cpu_count()} cores: " + ", ".join(f"{name}: {rate:.0f} transfers/s" for name, rate in rates.items()))
+
+    if os.cpu_count() >= 4:
+        assert rates["4 shards"] > 1.5 * rates["1 shards"]
@@ -0,0 +1,49 @@
+import smtplib
+import time
+
+from smtp.batch import BatchSMTPClient
+
+NUM_MESSAGES = 1000
+MIN_SPEEDUP = 1.5
+
+
+def statement(i):
+    return ("Account Transfer History", f"Personal account history: [{i}, -{i}]", f"user{i}@bank{i % 5}.pl")
+
+
+def send_one(stub, subject, text, email_address):
+    client = BatchSMTPClient(stub.host, stub.port)
+    with smtplib.SMTP(stub.host, stub.port) as smtp:
+        smtp.sendmail(client.sender, *client._build_message(subject, text, email_address))
+    return True
+
+
+# ──────────────────────────────────────────────
+# 1k statements: connection per message vs batched sessions
+# ──────────────────────────────────────────────
+def test_batched_vs_per_message_delivery(smtp_stub):
+    """
+    Sends 1k statement emails to the local SMTP stub, first opening a new
+    SMTP session per message, then through BatchSMTPClient, which keeps one
+    session open and sends whole domain groups over it.
+    """
+    start = time.perf_counter()
+    for i in range(NUM_MESSAGES):
+        assert send_one(smtp_stub, *statement(i))
+    per_message = time.perf_counter() - start
+    per_message_connections = smtp_stub.connections
+
+    client = BatchSMTPClient(smtp_stub.host, smtp_stub.port, batch_size=200)
+    start = time.perf_counter()
+    results = client.send_many([statement(i) for i in range(NUM_MESSAGES)])
+    batched = time.perf_counter() - start
+    client.close()
+    batched_connections = smtp_stub.connections - per_message_connections
+
+    print(f"per-message: {NUM_MESSAGES / per_message:.0f} msgs/s ({per_message_connections} connections), "
+          f"batched: {NUM_MESSAGES / batched:.0f} msgs/s ({batched_connections} connections)")
+
+    assert all(results)
+    assert len(smtp_stub.messages) == 2 * NUM_MESSAGES
+    assert batched_connections == 1
+    assert per_message / batched >= MIN_SPEEDUP
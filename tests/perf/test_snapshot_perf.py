@@ -0,0 +1,60 @@
+import time
+
+from account import Account, AccountsRegistry
+from journal import Journal
+from snapshot import load_snapshot, write_snapshot
+from transfers import apply_transfer
+
+NUM_ACCOUNTS = 1_000_000
+TRANSFERS_PER_ACCOUNT = 2
+
+
+def build_registry(journal_path):
+    registry = AccountsRegistry(Journal(journal_path, fsync="never"))
+    registry.add_accounts(Account("Jan", "Kowalski", f"{i:011d}") for i in range(NUM_ACCOUNTS))
+    for account in registry.iter_accounts():
+        for amount in range(1, TRANSFERS_PER_ACCOUNT + 1):
+            apply_transfer(account, "incoming", amount)
+            registry.record("transfer", account.pesel, type="incoming", amount=amount)
+    registry.journal.close()
+    return registry
+
+
+# ──────────────────────────────────────────────
+# Startup at 1M accounts: journal replay vs snapshot restore
+# ──────────────────────────────────────────────
+def test_startup_from_snapshot_vs_journal(tmp_path):
+    """
+    Builds 1M accounts with 2 transfers each, all journaled, then compares
+    startup by replaying the whole journal against loading a binary
+    snapshot plus the journal tail left after it (empty here).
+    """
+    journal_path = tmp_path / "registry.journal"
+    snapshot_path = tmp_path / "registry.snapshot"
+    registry = build_registry(journal_path)
+
+    start = time.perf_counter()
+    start_lsn = write_snapshot(registry, snapshot_path)
+    snapshot_time = time.perf_counter() - start
+
+    start = time.perf_counter()
+    replayed = AccountsRegistry()
+    replayed.replay(Journal(journal_path).read())
+    replay_time = time.perf_counter() - start
+    journal_size = journal_path.stat().st_size
+
+    Journal(journal_path).truncate(start_lsn)
+
+    start = time.perf_counter()
+    restored = AccountsRegistry()
+    since, versions = load_snapshot(restored, snapshot_path)
+    restored.replay(Journal(journal_path).read(), since, versions)
+    restore_time = time.perf_counter() - start
+
+    print(f"journal: {journal_size / 2**20:.0f} MiB, replay {replay_time:.2f}s; "
+          f"snapshot: {snapshot_path.stat().st_size / 2**20:.0f} MiB, written in {snapshot_time:.2f}s, "
+          f"restore {restore_time:.2f}s")
+
+    assert restored.count_accounts() == replayed.count_accounts() == NUM_ACCOUNTS
+    assert restored.find_by_pesel(f"{NUM_ACCOUNTS - 1:011d}").history == [1, 2]
+    assert restore_time * 2 < replay_time
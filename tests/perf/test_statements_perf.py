@@ -0,0 +1,48 @@
+import tempfile
+import time
+import tracemalloc
+
+from history import History
+from statements import render_history, write_history
+
+NUM_ENTRIES = 1_000_000
+MAX_STREAMED_PEAK = 5 * 1024 * 1024
+
+
+def peak_memory(fn):
+    tracemalloc.start()
+    start = time.perf_counter()
+    fn()
+    elapsed = time.perf_counter() - start
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    return peak, elapsed
+
+
+# ──────────────────────────────────────────────
+# 1M-entry history: whole-list string vs streamed rendering
+# ──────────────────────────────────────────────
+def test_streamed_rendering_peak_memory():
+    """
+    Renders a 1M-entry history three ways under tracemalloc: the old
+    f-string of the whole list, the capped email body, and chunked
+    writing to an attachment file. The streamed paths must stay within a
+    few megabytes regardless of history length.
+    """
+    history = History([(-1) ** i * (i % 5000) for i in range(NUM_ENTRIES)])
+
+    full_peak, full_time = peak_memory(lambda: f"Personal account history: {history}")
+    capped_peak, capped_time = peak_memory(lambda: render_history(history))
+    with tempfile.TemporaryFile("w+") as attachment:
+        streamed_peak, streamed_time = peak_memory(lambda: write_history(history, attachment))
+        attachment.seek(0, 2)
+        attachment_size = attachment.tell()
+
+    mib = 1024 * 1024
+    print(f"full string: {full_peak / mib:.1f} MiB peak ({full_time:.2f}s), "
+          f"capped body: {capped_peak / mib:.1f} MiB ({capped_time:.3f}s), "
+          f"streamed file: {streamed_peak / mib:.1f} MiB ({streamed_time:.2f}s, {attachment_size / mib:.1f} MiB written)")
+
+    assert capped_peak < MAX_STREAMED_PEAK
+    assert streamed_peak < MAX_STREAMED_PEAK
+    assert full_peak > 5 * streamed_peak
@@ -0,0 +1,63 @@
+import time
+
+import api
+
+NUM_ACCOUNTS = 100
+NUM_TRANSFERS = 10_000
+BATCH_SIZE = 1000
+MIN_SPEEDUP = 10
+TRANSFER_AMOUNT = 10
+
+
+def make_transfers():
+    return [
+        {"pesel": f"9001011{i % NUM_ACCOUNTS:04d}", "amount": TRANSFER_AMOUNT, "type": "incoming"}
+        for i in range(NUM_TRANSFERS)
+    ]
+
+
+def create_accounts(client):
+    for i in range(NUM_ACCOUNTS):
+        r = client.post(
+            "/api/accounts",
+            json={"name": "Perf", "surname": "Batch", "pesel": f"9001011{i:04d}"},
+        )
+        assert r.status_code == 201
+
+
+# ──────────────────────────────────────────────
+# 10k single transfers vs 10 batches of 1000
+# ──────────────────────────────────────────────
+def test_batch_transfers_vs_single_requests(client):
+    """
+    Applies 10k incoming transfers spread over 100 accounts, first
+    one request per transfer, then as 10 batched requests.
+    Balances must be identical and batching at least MIN_SPEEDUP faster.
+    """
+    create_accounts(client)
+    transfers = make_transfers()
+
+    start = time.perf_counter()
+    for t in transfers:
+        r = client.post(
+            f"/api/accounts/{t['pesel']}/transfer",
+            json={"amount": t["amount"], "type": t["type"]},
+        )
+        assert r.status_code == 200
+    single = time.perf_counter() - start
+
+    start = time.perf_counter()
+    for i in range(0, NUM_TRANSFERS, BATCH_SIZE):
+        r = client.post("/api/transfers/batch", json=transfers[i:i + BATCH_SIZE])
+        assert r.status_code == 200
+    batched = time.perf_counter() - start
+
+    print(f"single: {NUM_TRANSFERS / single:.0f} transfers/s, "
+          f"batched: {NUM_TRANSFERS / batched:.0f} transfers/s")
+
+    per_account = 2 * NUM_TRANSFERS // NUM_ACCOUNTS * TRANSFER_AMOUNT
+    for acc in api.registry.get_all_accounts():
+        assert acc.balance == per_account
+    assert single / batched > MIN_SPEEDUP, (
+        f"batching only {single / batched:.1f}x faster"
+    )
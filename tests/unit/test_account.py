@@ -21,6 +21,16 @@ class TestAccount:
         account = Account("John", "Doe", pesel)
         assert account.pesel == expected
 
+    @pytest.mark.parametrize("pesel, expected", [
+        ("44051401359", "44051401359"),
+        ("44051401358", "Invalid"),
+        ("44053201359", "Invalid"),
+        ("12345", "Invalid"),
+    ])
+    def test_strict_pesel(self, monkeypatch, pesel, expected):
+        monkeypatch.setattr(Account, "STRICT_PESEL", True)
+        assert Account("John", "Doe", pesel).pesel == expected
+
     def test_age_validation_invalid_pesel(self):
         acc = Account("X", "Y", "12345")
         assert acc.pesel == "Invalid"
@@ -214,6 +224,38 @@ class TestAccount:
         assert acc.balance == 0
         assert acc.history == [0]
 
+    def test_fractional_amounts_do_not_drift(self, valid_pesel):
+        acc = Account("A", "B", valid_pesel)
+        for _ in range(10):
+            acc.deposit(0.1)
+        acc.deposit(0.2)
+        assert acc.balance == 1.2
+        assert acc.balance_grosze == 120
+        acc.express_transfer(0.2)
+        assert acc.balance == 0
+        assert acc.history[-2:] == [-0.2, -1]
+
+    @pytest.mark.parametrize("amount, error", [
+        ("100", TypeError),
+        (True, TypeError),
+        (0.001, ValueError),
+        (float("nan"), ValueError),
+    ])
+    def test_invalid_amount_leaves_account_unchanged(self, valid_pesel, amount, error):
+        acc = Account("A", "B", valid_pesel)
+        acc.deposit(100)
+        for operation in (acc.deposit, acc.withdraw, acc.express_transfer, acc.submit_for_loan):
+            with pytest.raises(error):
+                operation(amount)
+        assert acc.balance == 100
+        assert acc.history == [100]
+
+    def test_balance_setter(self, valid_pesel):
+        acc = Account("A", "B", valid_pesel)
+        acc.balance = 12.34
+        assert acc.balance_grosze == 1234
+        assert acc.balance == 12.34
+
     def test_express_transfer_history_entries(self, valid_pesel):
         acc = Account("A", "B", valid_pesel)
         acc.deposit(100)
@@ -247,3 +289,43 @@ class TestAccount:
     def test_registry_add_non_account_object(self, registry):
         with pytest.raises(AttributeError):
             registry.add_account("not an account")
+
+    def test_registry_iter_accounts_after_cursor(self, registry):
+        pesels = [f"9001011234{i}" for i in range(4)]
+        for pesel in pesels:
+            registry.add_account(Account("Jan", "Test", pesel))
+
+        assert [a.pesel for a in registry.iter_accounts()] == pesels
+        assert [a.pesel for a in registry.iter_accounts(after=pesels[1])] == pesels[2:]
+        with pytest.raises(KeyError):
+            list(registry.iter_accounts(after="99999999999"))
+
+    def test_registry_iter_accounts_skips_deleted_and_readds(self, registry):
+        for i in range(3):
+            registry.add_account(Account("Jan", "Test", f"9001011234{i}"))
+        registry.delete_by_pesel("90010112341")
+        registry.add_account(Account("Jan", "Again", "90010112341"))
+
+        assert [a.pesel for a in registry.iter_accounts()] == [
+            "90010112340", "90010112342", "90010112341",
+        ]
+
+    def test_registry_compacts_order_after_many_deletes(self, registry):
+        for i in range(3000):
+            registry.add_account(Account("Jan", "Test", f"{i:011d}"))
+        for i in range(2000):
+            registry.delete_by_pesel(f"{i:011d}")
+
+        assert len(registry._order) < 3000
+        assert [a.pesel for a in registry.iter_accounts()] == [f"{i:011d}" for i in range(2000, 3000)]
+        assert registry.get_all_accounts()[0].pesel == "00000002000"
+
+    def test_registry_clear(self, registry):
+        registry.add_account(Account("Jan", "Test", "90010112345"))
+        registry.clear()
+        assert registry.count_accounts() == 0
+        assert list(registry.iter_accounts()) == []
+
+    def test_registry_operations_on_missing_account(self, registry):
+        assert registry.update_account("99999999999", first_name="Jan") is False
+        assert registry.transfer("99999999999", "incoming", 10) is False
@@ -11,7 +11,7 @@ class TestBuisnessAccount:
         ("12345", "Invalid"),
         ("1234567891", "1234567891"),
     ])
-    @patch('buisness_account.requests.get')
+    @patch('buisness_account.BuisnessAccount.session.get')
     def test_nip_validation(self, mock_get, nip, expected):
         if len(nip) == 10:
             mock_response = Mock()
@@ -25,7 +25,7 @@ class TestBuisnessAccount:
         acc = BuisnessAccount("Firma 1", nip)
         assert acc.nip == expected
 
-    @patch('buisness_account.requests.get')
+    @patch('buisness_account.BuisnessAccount.session.get')
     def test_deposit(self, mock_get, valid_nip):
         mock_response = Mock()
         mock_response.status_code = 200
@@ -39,7 +39,7 @@ class TestBuisnessAccount:
         acc.deposit(300)
         assert acc.balance == 300
 
-    @patch('buisness_account.requests.get')
+    @patch('buisness_account.BuisnessAccount.session.get')
     def test_withdraw(self, mock_get, valid_nip):
         mock_response = Mock()
         mock_response.status_code = 200
@@ -54,7 +54,7 @@ class TestBuisnessAccount:
         acc.withdraw(200)
         assert acc.balance == 800
 
-    @patch('buisness_account.requests.get')
+    @patch('buisness_account.BuisnessAccount.session.get')
     def test_withdraw_no_funds(self, mock_get, valid_nip):
         mock_response = Mock()
         mock_response.status_code = 200
@@ -68,7 +68,7 @@ class TestBuisnessAccount:
         with pytest.raises(ValueError):
             acc.withdraw(500)
 
-    @patch('buisness_account.requests.get')
+    @patch('buisness_account.BuisnessAccount.session.get')
     @pytest.mark.parametrize("amount, expected", [
         (50, 945),
         (300, 695),
@@ -87,7 +87,7 @@ class TestBuisnessAccount:
         acc.express_transfer(amount)
         assert acc.balance == expected
 
-    @patch('buisness_account.requests.get')
+    @patch('buisness_account.BuisnessAccount.session.get')
     def test_express_transfer_insufficient_funds(self, mock_get, valid_nip):
         mock_response = Mock()
         mock_response.status_code = 200
@@ -101,7 +101,7 @@ class TestBuisnessAccount:
         with pytest.raises(ValueError):
             acc.express_transfer(200)
 
-    @patch('buisness_account.requests.get')
+    @patch('buisness_account.BuisnessAccount.session.get')
     def test_history_express(self, mock_get, valid_nip):
         mock_response = Mock()
         mock_response.status_code = 200
@@ -122,7 +122,7 @@ class TestBuisnessAccount:
 
     @pytest.fixture(autouse=True)
     def mock_requests(self):
-        with patch('buisness_account.requests.get') as mock_get:
+        with patch('buisness_account.BuisnessAccount.session.get') as mock_get:
             mock_response = Mock()
             mock_response.status_code = 200
             mock_response.json.return_value = {
@@ -165,9 +165,33 @@ class TestBuisnessAccount:
         assert result is expected_result
         assert business_account.balance == expected_balance
 
+    def test_zus_withdrawal_is_tagged(self, business_account):
+        business_account.deposit(10000)
+        business_account.withdraw(1775)
+        assert business_account.history.tag_count("zus") == 1
+        assert business_account.take_loan(1000) is True
+
+    def test_express_transfer_of_zus_amount_is_tagged(self, business_account):
+        business_account.deposit(10000)
+        business_account.express_transfer(1775)
+        assert business_account.history.tag_counts() == {"zus": 1}
+
+    def test_fractional_amounts_are_exact(self, business_account):
+        business_account.deposit(0.1)
+        business_account.deposit(0.2)
+        assert business_account.balance == 0.3
+        business_account.withdraw(0.3)
+        business_account.deposit(10.05)
+        business_account.express_transfer(5.05)
+        assert business_account.balance == 0
+        assert business_account.history[-2:] == [-5.05, -5]
+        with pytest.raises(ValueError):
+            business_account.deposit(0.001)
+        assert business_account.balance_grosze == 0
+
     class TestFeature18NIPValidation:
 
-        @patch('buisness_account.requests.get')
+        @patch('buisness_account.BuisnessAccount.session.get')
         def test_create_account_with_valid_nip(self, mock_get):
             mock_response = Mock()
             mock_response.status_code = 200
@@ -190,7 +214,7 @@ class TestBuisnessAccount:
             assert mock_get.called
             assert "8461627563" in mock_get.call_args[0][0]
 
-        @patch('buisness_account.requests.get')
+        @patch('buisness_account.BuisnessAccount.session.get')
         def test_create_account_with_invalid_nip_raises_error(self, mock_get):
             mock_response = Mock()
             mock_response.status_code = 200
@@ -209,7 +233,7 @@ class TestBuisnessAccount:
 
             assert "Company not registered!!" in str(exc_info.value)
 
-        @patch('buisness_account.requests.get')
+        @patch('buisness_account.BuisnessAccount.session.get')
         def test_create_account_nip_not_found(self, mock_get):
             mock_response = Mock()
             mock_response.status_code = 200
@@ -222,7 +246,7 @@ class TestBuisnessAccount:
 
             assert "Company not registered!!" in str(exc_info.value)
 
-        @patch('buisness_account.requests.get')
+        @patch('buisness_account.BuisnessAccount.session.get')
         def test_create_account_api_returns_404(self, mock_get):
             mock_response = Mock()
             mock_response.status_code = 404
@@ -239,7 +263,7 @@ class TestBuisnessAccount:
             assert account.company_name == "Test Firma"
             assert account.balance == 0
 
-        @patch('buisness_account.requests.get')
+        @patch('buisness_account.BuisnessAccount.session.get')
         def test_create_account_api_timeout(self, mock_get):
             import requests
             mock_get.side_effect = requests.Timeout("Connection timeout")
@@ -253,7 +277,7 @@ class TestBuisnessAccount:
             ("Niezarejestrowany", False),
             ("", False),
         ])
-        @patch('buisness_account.requests.get')
+        @patch('buisness_account.BuisnessAccount.session.get')
         def test_various_vat_statuses(self, mock_get, status_vat, should_succeed):
             mock_response = Mock()
             mock_response.status_code = 200
@@ -270,7 +294,7 @@ class TestBuisnessAccount:
                 with pytest.raises(ValueError):
                     BuisnessAccount("Test Firma", "8461627563")
 
-        @patch('buisness_account.requests.get')
+        @patch('buisness_account.BuisnessAccount.session.get')
         def test_validate_nip_uses_correct_date_format(self, mock_get):
             mock_response = Mock()
             mock_response.status_code = 200
@@ -289,7 +313,7 @@ class TestBuisnessAccount:
             date_match = re.search(r'date=(\d{4}-\d{2}-\d{2})', call_url)
             assert date_match is not None
 
-        @patch('buisness_account.requests.get')
+        @patch('buisness_account.BuisnessAccount.session.get')
         def test_account_can_use_methods_after_creation(self, mock_get):
             mock_response = Mock()
             mock_response.status_code = 200
@@ -0,0 +1,130 @@
+import io
+import pytest
+from account import Account, AccountsRegistry
+from bulk_import import (
+    INVALID_ROW,
+    build_accounts,
+    import_accounts,
+    iter_json_array,
+    iter_ndjson,
+    validate_row,
+)
+
+
+class TestBulkImport:
+
+    @pytest.fixture
+    def registry(self):
+        return AccountsRegistry()
+
+    def test_iter_ndjson_skips_blank_lines_and_flags_bad_json(self):
+        stream = io.BytesIO(b'{"a": 1}\n\n{broken\n[2]\n')
+        assert list(iter_ndjson(stream, chunk_size=3)) == [{"a": 1}, INVALID_ROW, [2]]
+
+    def test_iter_ndjson_last_line_without_newline(self):
+        stream = io.BytesIO(b'{"a": 1}\n{"b": 2}')
+        assert list(iter_ndjson(stream)) == [{"a": 1}, {"b": 2}]
+
+    def test_iter_ndjson_rejects_oversized_row(self, monkeypatch):
+        monkeypatch.setattr("bulk_import.MAX_ROW_BYTES", 8)
+        with pytest.raises(ValueError):
+            list(iter_ndjson(io.BytesIO(b"x" * 64), chunk_size=16))
+
+    @pytest.mark.parametrize("chunk_size", [1, 3, 7, 1024])
+    def test_iter_json_array_across_chunk_boundaries(self, chunk_size):
+        payload = ' [ {"pesel": "90010112345"} , 12345 ,"zażółć", [1, 2] ] '
+        stream = io.BytesIO(payload.encode("utf-8"))
+        values = list(iter_json_array(stream, chunk_size=chunk_size))
+        assert values == [{"pesel": "90010112345"}, 12345, "zażółć", [1, 2]]
+
+    def test_iter_json_array_empty(self):
+        assert list(iter_json_array(io.BytesIO(b"[]"))) == []
+
+    def test_iter_json_array_accepts_text_stream(self):
+        assert list(iter_json_array(io.StringIO("[1,2]"))) == [1, 2]
+
+    @pytest.mark.parametrize("payload", [
+        b'{"a": 1}',
+        b'[1, 2',
+        b'[1 2]',
+        b'[1, nope]',
+        b'',
+    ])
+    def test_iter_json_array_rejects_malformed(self, payload):
+        with pytest.raises(ValueError):
+            list(iter_json_array(io.BytesIO(payload), chunk_size=4))
+
+    def test_iter_json_array_rejects_oversized_row(self, monkeypatch):
+        monkeypatch.setattr("bulk_import.MAX_ROW_BYTES", 8)
+        with pytest.raises(ValueError):
+            list(iter_json_array(io.BytesIO(b'["' + b"x" * 64 + b'"]'), chunk_size=4))
+
+    @pytest.mark.parametrize("row", [
+        ["Jan", "Kowalski", "90010112345"],
+        {"name": "Jan", "surname": "Kowalski"},
+        {"name": "Jan", "surname": "Kowalski", "pesel": 90010112345},
+        {"name": "Jan", "surname": "Kowalski", "pesel": "123"},
+        {"name": "Jan", "surname": "Kowalski", "pesel": "90010112345", "promo_code": 5},
+    ])
+    def test_validate_row_invalid(self, row):
+        assert validate_row(row) is None
+
+    def test_validate_row_builds_account(self):
+        acc = validate_row({"name": "Jan", "surname": "Kowalski", "pesel": "90010112345"})
+        assert acc.first_name == "Jan"
+        assert acc.pesel == "90010112345"
+
+    def test_import_accounts_reports_every_row(self, registry):
+        rows = [
+            {"name": "Jan", "surname": "Kowalski", "pesel": "90010112345"},
+            {"name": "Jan", "surname": "Kowalski", "pesel": "90010112345"},
+            INVALID_ROW,
+            {"name": "Anna"},
+            {"name": "Anna", "surname": "Nowak", "pesel": "92020212345"},
+        ]
+        results = list(import_accounts(registry, rows, batch_size=2))
+
+        assert [r["status"] for r in results] == [
+            "created", "duplicate", "invalid", "invalid", "created",
+        ]
+        assert [r["row"] for r in results] == [0, 1, 2, 3, 4]
+        assert registry.count_accounts() == 2
+
+    def test_build_accounts_applies_promo_bonus_to_eligible(self):
+        rows = [
+            ("Jan", "Kowalski", "90010112345", "PROM_ABC"),
+            ("Jan", "Kowalski", "90010112346", None),
+            ("Jan", "Kowalski", "40010112345", "PROM_ABC"),
+            ("Jan", "Kowalski", "123", "PROM_ABC"),
+        ]
+        accounts = build_accounts(rows)
+        assert [a.balance for a in accounts[:3]] == [50, 0, 0]
+        assert accounts[3] is None
+        assert [a.balance for a in accounts[:3]] == [validate_row(dict(zip(
+            ("name", "surname", "pesel", "promo_code"), row))).balance for row in rows[:3]]
+
+    def test_import_accounts_rejects_bad_pesel_and_promo(self, registry):
+        rows = [
+            {"name": "Jan", "surname": "Kowalski", "pesel": "123"},
+            {"name": "Jan", "surname": "Kowalski", "pesel": "90010112345", "promo_code": 7},
+            {"name": "Jan", "surname": "Kowalski", "pesel": "90010112345", "promo_code": "PROM_X"},
+        ]
+        results = list(import_accounts(registry, rows))
+        assert [r["status"] for r in results] == ["invalid", "invalid", "created"]
+        assert registry.find_by_pesel("90010112345").balance == 50
+
+    def test_import_accounts_strict_pesel(self, registry, monkeypatch):
+        monkeypatch.setattr(Account, "STRICT_PESEL", True)
+        rows = [
+            {"name": "Jan", "surname": "Kowalski", "pesel": "44051401359"},
+            {"name": "Jan", "surname": "Kowalski", "pesel": "44051401358"},
+        ]
+        assert [r["status"] for r in import_accounts(registry, rows)] == ["created", "invalid"]
+        assert validate_row(rows[1]) is None
+
+    def test_registry_add_accounts(self, registry):
+        rows = [{"name": "A", "surname": "B", "pesel": f"9001011234{i}"} for i in range(3)]
+        accounts = [validate_row(r) for r in rows]
+        assert registry.add_accounts(accounts) == [True, True, True]
+        assert registry.add_accounts(accounts[:1]) == [False]
+        assert registry.count_accounts() == 3
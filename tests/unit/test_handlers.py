@@ -0,0 +1,41 @@
+import pytest
+import handlers
+from account import Account, AccountsRegistry
+
+
+class TestHandlers:
+
+    @pytest.fixture
+    def registry(self):
+        registry = AccountsRegistry()
+        registry.add_account(Account("Jan", "Kowalski", "90010112345"))
+        return registry
+
+    def test_create_account(self, registry):
+        data = {"name": "Anna", "surname": "Nowak", "pesel": "92020212345"}
+        assert handlers.create_account(registry, data) == (None, 201)
+        assert handlers.create_account(registry, data) == ({"error": "Pesel already exists"}, 409)
+        assert handlers.get_account(registry, "92020212345") == (
+            {"name": "Anna", "surname": "Nowak", "pesel": "92020212345", "balance": 0}, 200)
+
+    def test_list_accounts_stream(self, registry):
+        body, status = handlers.list_accounts(registry, {"stream": "ndjson"})
+        assert status == 200
+        assert body.content_type == "application/x-ndjson"
+        assert "".join(body.chunks).count("\n") == 1
+
+    def test_update_of_account_deleted_meanwhile(self, registry, monkeypatch):
+        monkeypatch.setattr(registry, "update_account", lambda pesel, **changes: False)
+        assert handlers.update_account(registry, "90010112345", {"name": "X"}) == ({"error": "Not found"}, 404)
+
+    def test_transfer_to_account_deleted_meanwhile(self, registry, monkeypatch):
+        monkeypatch.setattr(registry, "transfer", lambda pesel, kind, amount: False)
+        data = {"amount": 5, "type": "incoming"}
+        assert handlers.transfer(registry, "90010112345", data) == ({"error": "Not found"}, 404)
+
+    def test_email_for_account_deleted_meanwhile(self, registry, monkeypatch):
+        found = registry.find_by_pesel("90010112345")
+        lookups = iter([found, None])
+        monkeypatch.setattr(registry, "find_by_pesel", lambda pesel: next(lookups))
+        data = {"email": "jan@x.pl"}
+        assert handlers.email_history(registry, None, "90010112345", data) == ({"error": "Not found"}, 404)
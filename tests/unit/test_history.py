@@ -0,0 +1,185 @@
+import pickle
+from array import array
+import pytest
+from history import History
+from metrics import LengthHistogram
+from money import MAX_GROSZE, to_zloty
+
+
+class TestHistory:
+
+    def test_behaves_like_list(self):
+        h = History([100, -20, 50])
+        assert h == [100, -20, 50]
+        assert len(h) == 3
+        assert list(h) == [100, -20, 50]
+        assert h[-1] == 50
+        assert h[-2:] == [-20, 50]
+        assert repr(h) == "[100, -20, 50]"
+        assert h.tolist() == [100, -20, 50]
+
+    def test_empty_histories_are_independent(self):
+        a, b, c = History(), History(), History()
+        a.append(1)
+        b.extend([2, 3])
+        del c[0:]
+        assert a == [1]
+        assert b == [2, 3]
+        assert c == []
+
+    def test_equality(self):
+        assert History([1, 2]) == History([1, 2])
+        assert History([1, 2]) != History([2, 1])
+        assert History([1]) != "not a history"
+
+    @pytest.mark.parametrize("amounts, expected", [
+        ([], 0),
+        ([10, 20], 30),
+        ([1, 2, 3, 4, 5], 15),
+        ([100, 1, 2, 3, 4, 5], 15),
+        ([100, 200, -5, -1, 1, 7, 8], 10),
+    ])
+    def test_recent_sum_is_last_window(self, amounts, expected):
+        assert History(amounts).recent_sum() == expected
+
+    def test_fractional_amounts_are_exact_grosze(self):
+        h = History([100, 200])
+        h.append(0.5)
+        assert h == [100, 200, 0.5]
+        assert h.recent_sum() == 300.5
+        assert h.recent_sum_grosze() == 30050
+        assert h.tobytes() == array("q", [10000, 20000, 50]).tobytes()
+
+    def test_extend_with_fractions(self):
+        h = History([1, 2], tags={-1775: "zus"})
+        h.extend(x for x in [0.5, -1775])
+        assert h == [1, 2, 0.5, -1775]
+        assert h.recent_sum() == -1771.5
+        assert -1775 in h
+
+    def test_extend_grosze(self):
+        h = History([1])
+        h.extend_grosze(array("q", [250, -5]))
+        assert h == [1, 2.5, -0.05]
+        assert h.recent_sum_grosze() == 345
+
+    def test_extend_rejects_non_numbers_without_change(self):
+        h = History([0.5])
+        with pytest.raises(TypeError):
+            h.extend(["x"])
+        with pytest.raises(ValueError):
+            h.extend([1, 0.001])
+        assert h == [0.5]
+
+    def test_window_sum_has_no_drift(self):
+        h = History()
+        h.extend([0.1] * 10_000)
+        assert h.recent_sum() == 0.5
+        h.append(0.2)
+        assert h.recent_sum() == 0.6
+
+    def test_non_number_rejected_without_change(self):
+        h = History([1])
+        with pytest.raises(TypeError):
+            h.append("10")
+        with pytest.raises(ValueError):
+            h.append(0.005)
+        assert h == [1]
+
+    def test_contains_non_number(self):
+        h = History([1])
+        assert "1" not in h
+        assert 0.001 not in h
+
+    @pytest.mark.parametrize("size", [0, 10, 3000])
+    def test_total(self, size):
+        amounts = [(-1) ** i * (i % 997) + 0.01 for i in range(size)]
+        h = History(amounts)
+        assert h.total_grosze() == sum(round(a * 100) for a in amounts)
+        assert h.total() == to_zloty(h.total_grosze())
+
+    def test_total_follows_appends_and_deletes(self):
+        h = History([10, -2.5])
+        h.append(0.35)
+        h.extend_grosze([100, 200])
+        assert h.total_grosze() == 1000 - 250 + 35 + 300
+        del h[-2:]
+        del h[0]
+        assert h.total_grosze() == -250 + 35
+        assert pickle.loads(pickle.dumps(h)).total_grosze() == -215
+
+    def test_total_beyond_64_bits(self):
+        h = History()
+        h.extend_grosze([MAX_GROSZE] * 1000)
+        h.append_grosze(MAX_GROSZE)
+        assert h.total_grosze() == MAX_GROSZE * 1001
+
+    def test_tagged_amount_lookup(self):
+        h = History([10, -1775, 20], tags={-1775: "zus"})
+        assert -1775 in h
+        assert 20 in h
+        assert 999 not in h
+
+    def test_tagged_amount_not_present(self):
+        h = History([10, 20], tags={-1775: "zus"})
+        assert -1775 not in h
+
+    def test_delete_tail_updates_aggregates(self):
+        h = History([1, 2, 3, 4, 5, 6, -1775], tags={-1775: "zus"})
+        del h[5:]
+        assert h == [1, 2, 3, 4, 5]
+        assert h.recent_sum() == 15
+        assert -1775 not in h
+        h.append(10)
+        assert h.recent_sum() == 24
+
+    def test_delete_single_index(self):
+        h = History([-1775, 1], tags={-1775: "zus"})
+        del h[0]
+        assert h == [1]
+        assert -1775 not in h
+
+    def test_tag_count_groups_amounts_by_category(self):
+        tags = {-1775: "zus", -1500: "zus", -5: "fee"}
+        h = History([-1775, 100, -1500, -5, -1775], tags=tags)
+        assert h.tag_count("zus") == 3
+        assert h.tag_count("fee") == 1
+        assert h.tag_count("unknown") == 0
+        assert h.tag_counts() == {"zus": 3, "fee": 1}
+
+    def test_tag_counts_follow_appends_and_deletes(self):
+        h = History(tags={-1775: "zus"})
+        assert h.tag_count("zus") == 0
+        assert h.tag_counts() == {"zus": 0}
+        h.append(-1775)
+        h.append(-1775.0)
+        assert h.tag_count("zus") == 2
+        del h[1:]
+        assert h.tag_count("zus") == 1
+
+    def test_length_tracking(self):
+        histogram = LengthHistogram(buckets=(0, 2), stripes=4)
+        lengths = histogram.stripe("90010112345")
+        h = History([1])
+        assert h.track_length(lengths) is None
+        assert lengths.snapshot() == ([0, 1, 0], 1)
+        h.append(2)
+        h.extend([3, 4])
+        assert lengths.snapshot() == ([0, 0, 1], 4)
+        del h[1:]
+        assert lengths.snapshot() == ([0, 1, 0], 1)
+        del h[0]
+        assert lengths.snapshot() == ([1, 0, 0], 0)
+
+        copy = pickle.loads(pickle.dumps(h))
+        copy.append(5)
+        assert copy == [5]
+        assert lengths.snapshot() == ([1, 0, 0], 0)
+        assert h.track_length(None) is lengths
+        assert lengths.snapshot() == ([0, 0, 0], 0)
+
+    def test_length_stripes_add_up(self):
+        histogram = LengthHistogram(buckets=(0, 2), stripes=4)
+        for key, length in [("a", 1), ("b", 3), ("c", 0)]:
+            History([1] * length).track_length(histogram.stripe(key))
+        assert histogram.snapshot() == ([1, 1, 1], 4)
@@ -0,0 +1,138 @@
+import pytest
+from account import Account, AccountsRegistry
+from journal import Journal
+from transfers import apply_batch
+
+
+@pytest.fixture
+def journal_path(tmp_path):
+    return tmp_path / "registry.journal"
+
+
+def reopen(path):
+    registry = AccountsRegistry()
+    journal = Journal(path)
+    registry.replay(journal.read())
+    journal.close()
+    return registry
+
+
+class TestJournal:
+
+    @pytest.mark.parametrize("mode", ["always", "group", "never"])
+    def test_append_and_read(self, journal_path, mode):
+        journal = Journal(journal_path, fsync=mode)
+        journal.append({"op": "delete", "pesel": "1"})
+        journal.append({"op": "delete", "pesel": "2"})
+        journal.sync()
+        journal.sync()
+        assert list(Journal(journal_path).read()) == [
+            {"lsn": 1, "op": "delete", "pesel": "1"},
+            {"lsn": 2, "op": "delete", "pesel": "2"},
+        ]
+        journal.close()
+
+    def test_unknown_fsync_mode(self, journal_path):
+        with pytest.raises(ValueError):
+            Journal(journal_path, fsync="sometimes")
+
+    @pytest.mark.parametrize("tail", [b'{"lsn":2,"op":"delete","pe', b'{"lsn":2,"op":"delete","pesel":"3"}'])
+    def test_torn_tail_is_cut_off(self, journal_path, tail):
+        journal_path.write_bytes(b'{"lsn":1,"op":"delete","pesel":"1"}\n' + tail)
+        journal = Journal(journal_path)
+        assert journal.last_lsn == 1
+        assert [e["pesel"] for e in journal.read()] == ["1"]
+        journal.append({"op": "delete", "pesel": "2"})
+        journal.close()
+        assert [(e["lsn"], e["pesel"]) for e in Journal(journal_path).read()] == [(1, "1"), (2, "2")]
+
+    def test_lsn_continues_after_reopen(self, journal_path):
+        journal = Journal(journal_path)
+        for pesel in ("1", "2", "3"):
+            journal.append({"op": "delete", "pesel": pesel})
+        journal.close()
+        assert Journal(journal_path).last_lsn == 3
+
+    def test_lsn_continues_after_start_lsn(self, journal_path):
+        journal = Journal(journal_path, start_lsn=7)
+        journal.append({"op": "delete", "pesel": "1"})
+        journal.close()
+        assert [e["lsn"] for e in Journal(journal_path).read()] == [8]
+        assert Journal(journal_path, start_lsn=3).last_lsn == 8
+
+    def test_last_lsn_behind_long_entry(self, journal_path):
+        journal = Journal(journal_path)
+        journal.append({"op": "create", "pesel": "1", "history": list(range(50_000))})
+        journal.close()
+        assert Journal(journal_path).last_lsn == 1
+
+    def test_truncate_keeps_newer_entries(self, journal_path):
+        journal = Journal(journal_path)
+        for pesel in ("1", "2", "3"):
+            journal.append({"op": "delete", "pesel": pesel})
+        journal.truncate(0)
+        journal.truncate(2)
+        journal.append({"op": "delete", "pesel": "4"})
+        journal.close()
+        assert [e["lsn"] for e in Journal(journal_path).read()] == [3, 4]
+
+    def test_truncate_stops_at_torn_tail(self, journal_path):
+        journal_path.write_bytes(b'{"lsn":1,"op":"delete","pesel":"1"}\n{"lsn":2,"op"')
+        journal = Journal(journal_path)
+        journal.truncate(5)
+        assert journal_path.read_bytes() == b'{"lsn":2,"op"'
+
+    def test_registry_without_journal_ignores_records(self):
+        registry = AccountsRegistry()
+        registry.record("transfer", "90010112345", type="incoming", amount=1)
+        registry.commit()
+
+    def test_replay_restores_registry(self, journal_path):
+        registry = AccountsRegistry(Journal(journal_path))
+        registry.add_account(Account("Jan", "Kowalski", "90010112345"))
+        registry.add_accounts([Account("Anna", "Nowak", "92020212345"), Account("Ewa", "Lis", "93030312345")])
+        promo = Account("Olek", "Promo", "05210112345", "PROM_XYZ")
+        registry.add_account(promo)
+        acc = registry.find_by_pesel("90010112345")
+        acc.deposit(100)
+        registry.record("transfer", acc.pesel, type="incoming", amount=100)
+        acc.first_name = "Janek"
+        registry.record("update", acc.pesel, first_name="Janek")
+        registry.delete_by_pesel("92020212345")
+        registry.delete_by_pesel("99999999999")
+        registry.commit()
+
+        restored = reopen(journal_path)
+        assert [a.pesel for a in restored.iter_accounts()] == ["90010112345", "93030312345", "05210112345"]
+        jan = restored.find_by_pesel("90010112345")
+        assert (jan.first_name, jan.last_name, jan.balance, jan.history) == ("Janek", "Kowalski", 100, [100])
+        assert restored.find_by_pesel("05210112345").balance == promo.balance == 50
+
+    def test_replay_unknown_entry(self):
+        with pytest.raises(ValueError):
+            AccountsRegistry().replay([{"lsn": 1, "op": "rename", "pesel": "1"}])
+
+    @pytest.mark.parametrize("atomic", [False, True])
+    def test_batch_transfers_are_journaled(self, journal_path, atomic):
+        registry = AccountsRegistry(Journal(journal_path))
+        registry.add_account(Account("Jan", "Kowalski", "90010112345"))
+        items = [
+            {"pesel": "90010112345", "amount": 100, "type": "incoming"},
+            {"pesel": "90010112345", "amount": 30, "type": "express"},
+        ]
+        apply_batch(registry, items, atomic=atomic)
+        registry.commit()
+
+        assert reopen(journal_path).find_by_pesel("90010112345").history == [100, -30, -1]
+
+    def test_rolled_back_batch_is_not_journaled(self, journal_path):
+        registry = AccountsRegistry(Journal(journal_path))
+        registry.add_account(Account("Jan", "Kowalski", "90010112345"))
+        items = [
+            {"pesel": "90010112345", "amount": 100, "type": "incoming"},
+            {"pesel": "90010112345", "amount": 500, "type": "outgoing"},
+        ]
+        apply_batch(registry, items, atomic=True)
+        registry.commit()
+
+        assert reopen(journal_path).find_by_pesel("90010112345").history == []
@@ -0,0 +1,93 @@
+import random
+import pytest
+from loadtest import Histogram, Report, VirtualUser, compare, format_report
+
+
+class TestHistogram:
+
+    def test_empty_histogram_percentiles_are_zero(self):
+        assert Histogram().percentile(99) == 0.0
+
+    def test_percentiles_within_precision(self):
+        h = Histogram()
+        for ms in range(1, 1001):
+            h.record(ms / 1000)
+        assert h.percentile(50) == pytest.approx(0.5, rel=1e-3)
+        assert h.percentile(99) == pytest.approx(0.99, rel=1e-3)
+        assert h.percentile(99.9) == pytest.approx(0.999, rel=1e-3)
+        assert h.percentile(100) == 1.0
+
+    def test_percentile_never_exceeds_max(self):
+        h = Histogram()
+        h.record(0.123456)
+        assert h.percentile(50) == 0.123456
+
+    def test_merge(self):
+        a, b = Histogram(), Histogram()
+        a.record(0.001)
+        b.record(0.002)
+        b.record(0.003)
+        a.merge(b)
+        assert a.total == 3
+        assert a.percentile(100) == 0.003
+        assert a.summary()["count"] == 3
+
+
+class TestVirtualUser:
+
+    def test_deletes_only_own_accounts(self):
+        vu = VirtualUser(0, 7, "write_heavy", 10, random.Random(1))
+        created = set()
+        for _ in range(500):
+            operation, method, path, body = vu.next_request()
+            if operation == "create":
+                created.add(body["pesel"])
+            elif operation == "delete":
+                pesel = path.rsplit("/", 1)[1]
+                assert pesel in created
+                created.remove(pesel)
+            else:
+                assert path.split("/")[3].startswith("6")
+        assert created == set(vu.created)
+
+    def test_first_delete_becomes_create(self):
+        vu = VirtualUser(0, 0, "mixed", 10, random.Random(0))
+        vu.operations, vu.weights = ("delete",), (1,)
+        assert vu.next_request()[0] == "create"
+        assert vu.next_request()[0] == "delete"
+
+
+class TestReport:
+
+    def test_counts_failures_as_errors(self):
+        report = Report("mixed", 2)
+        report.add("get", 200, 0.01)
+        report.add("get", 404, 0.01)
+        report.add("create", None, 0.01)
+        report.duration = 1.0
+        result = report.to_dict()
+        assert result["throughput"] == 1.0
+        assert result["errors"] == 2
+        assert set(result["operations"]) == {"get", "create"}
+        assert "p999" in format_report(result)
+
+
+class TestCompare:
+
+    BASELINE = {"throughput": 1000.0, "errors": 0,
+                "latency_ms": {"count": 1, "p50": 10.0, "p95": 20.0, "p99": 30.0, "p999": 40.0}}
+
+    def test_no_regression(self):
+        assert compare(self.BASELINE, self.BASELINE) == []
+
+    def test_detects_regressions(self):
+        result = {"throughput": 500.0, "errors": 3,
+                  "latency_ms": {"count": 1, "p50": 10.5, "p95": 20.0, "p99": 60.0, "p999": 40.0}}
+        regressions = compare(result, self.BASELINE, tolerance=0.25)
+        assert len(regressions) == 3
+        assert regressions[2].startswith("p99")
+
+    def test_ignores_small_absolute_changes(self):
+        baseline = {**self.BASELINE, "latency_ms": {"count": 1, "p50": 0.1, "p95": 0.1, "p99": 0.1, "p999": 0.1}}
+        result = {**self.BASELINE, "latency_ms": {"count": 1, "p50": 0.5, "p95": 0.5, "p99": 0.5, "p999": 0.5}}
+        assert compare(result, baseline) == []
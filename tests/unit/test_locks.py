@@ -0,0 +1,80 @@
+import threading
+import pytest
+import account as account_module
+from locks import StripedLock
+from account import Account, AccountsRegistry
+from journal import Journal
+
+
+class TestStripedLock:
+
+    def test_same_key_gets_same_lock(self):
+        locks = StripedLock(8)
+        assert locks.for_key("90010112345") is locks.for_key("90010112345")
+
+    def test_single_stripe_shares_lock(self):
+        locks = StripedLock(1)
+        assert locks.for_key("a") is locks.for_key("b")
+
+    def test_hold_many_takes_each_stripe_once(self):
+        locks = StripedLock(1)
+        with locks.hold_many(["a", "b", "c"]):
+            assert locks.for_key("a").locked()
+        assert not locks.for_key("a").locked()
+
+    def test_hold_many_releases_on_error(self):
+        locks = StripedLock(4)
+        with pytest.raises(RuntimeError):
+            with locks.hold_many(["a", "b"]):
+                raise RuntimeError("fail")
+        assert not any(locks.for_key(k).locked() for k in ("a", "b"))
+
+    def test_registry_account_lock_serializes_deposits(self):
+        registry = AccountsRegistry()
+        acc = Account("Jan", "Kowalski", "02270803628")
+        registry.add_account(acc)
+
+        def worker():
+            for _ in range(1000):
+                with registry.account_lock(acc.pesel):
+                    acc.deposit(1)
+
+        threads = [threading.Thread(target=worker) for _ in range(4)]
+        for t in threads:
+            t.start()
+        for t in threads:
+            t.join()
+
+        assert acc.balance == 4000
+        assert len(acc.history) == 4000
+
+    def test_delete_waits_for_transfer_in_flight(self, monkeypatch, tmp_path):
+        registry = AccountsRegistry(Journal(tmp_path / "registry.journal"))
+        pesel = "02270803628"
+        registry.add_account(Account("Jan", "Kowalski", pesel))
+        entered, release = threading.Event(), threading.Event()
+        apply_transfer = account_module.apply_transfer
+
+        def slow_transfer(account, transfer_type, amount):
+            entered.set()
+            release.wait()
+            apply_transfer(account, transfer_type, amount)
+        monkeypatch.setattr(account_module, "apply_transfer", slow_transfer)
+
+        transfer = threading.Thread(target=registry.transfer, args=(pesel, "incoming", 100))
+        transfer.start()
+        entered.wait()
+        delete = threading.Thread(target=registry.delete_by_pesel, args=(pesel,))
+        delete.start()
+        delete.join(0.05)
+        assert delete.is_alive()
+        release.set()
+        transfer.join()
+        delete.join()
+
+        registry.add_account(Account("Jan", "Kowalski", pesel))
+        assert registry.transfer("nope", "incoming", 1) is False
+        registry.journal.close()
+        replayed = AccountsRegistry()
+        replayed.replay(Journal(tmp_path / "registry.journal").read())
+        assert replayed.find_by_pesel(pesel).balance == registry.find_by_pesel(pesel).balance == 0
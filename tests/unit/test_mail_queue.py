@@ -0,0 +1,152 @@
+import threading
+import time
+import pytest
+import smtp.smtp as smtpmod
+from account import Account
+from buisness_account import BuisnessAccount
+from smtp.queue import MailQueue, MailQueueFull
+
+
+class FakeSMTPClient:
+    """Stands in for SMTPClient.send with a fixed latency and scripted failures."""
+
+    def __init__(self, latency=0.0, failures=0, error=None):
+        self.latency = latency
+        self.failures = failures
+        self.error = error
+        self.sent = []
+        self.calls = 0
+        self._lock = threading.Lock()
+
+    def send(self, subject, text, email_address):
+        time.sleep(self.latency)
+        with self._lock:
+            self.calls += 1
+            if self.failures:
+                self.failures -= 1
+                if self.error:
+                    raise self.error
+                return False
+            self.sent.append((subject, text, email_address))
+        return True
+
+
+@pytest.fixture
+def fake_smtp(monkeypatch):
+    fake = FakeSMTPClient()
+    monkeypatch.setattr(smtpmod.SMTPClient, "send", fake.send)
+    return fake
+
+
+@pytest.fixture
+def mail_queue():
+    mail_queue = MailQueue(workers=2, capacity=100, backoff=0.001)
+    yield mail_queue
+    mail_queue.stop()
+
+
+class TestMailQueue:
+
+    def test_enqueue_returns_before_delivery(self, fake_smtp, mail_queue):
+        fake_smtp.latency = 0.2
+        start = time.perf_counter()
+        message_id = mail_queue.enqueue("s", "t", "a@b.com")
+        assert time.perf_counter() - start < 0.1
+        assert mail_queue.status(message_id)["status"] in (MailQueue.QUEUED, MailQueue.SENDING)
+
+        mail_queue.join()
+        assert mail_queue.status(message_id) == {"status": "sent", "attempts": 1, "error": None}
+        assert fake_smtp.sent == [("s", "t", "a@b.com")]
+
+    def test_workers_send_in_parallel(self, fake_smtp, mail_queue):
+        fake_smtp.latency = 0.1
+        start = time.perf_counter()
+        for _ in range(4):
+            mail_queue.enqueue("s", "t", "a@b.com")
+        mail_queue.join()
+        assert len(fake_smtp.sent) == 4
+        assert time.perf_counter() - start < 0.35
+
+    def test_retries_until_delivered(self, fake_smtp, mail_queue):
+        fake_smtp.failures = 2
+        message_id = mail_queue.enqueue("s", "t", "a@b.com")
+        mail_queue.join()
+        assert mail_queue.status(message_id) == {"status": "sent", "attempts": 3, "error": None}
+
+    def test_gives_up_after_max_attempts(self, fake_smtp, mail_queue):
+        fake_smtp.failures = 5
+        fake_smtp.error = ConnectionError("SMTP down")
+        message_id = mail_queue.enqueue("s", "t", "a@b.com")
+        mail_queue.join()
+        assert mail_queue.status(message_id) == {"status": "failed", "attempts": 3, "error": "SMTP down"}
+        assert fake_smtp.calls == 3
+
+    def test_failed_send_without_error(self, fake_smtp, mail_queue):
+        fake_smtp.failures = 5
+        message_id = mail_queue.enqueue("s", "t", "a@b.com")
+        mail_queue.join()
+        assert mail_queue.status(message_id)["error"] == "Delivery failed"
+
+    def test_full_queue_rejects(self, fake_smtp):
+        fake_smtp.latency = 0.2
+        mail_queue = MailQueue(workers=1, capacity=1)
+        try:
+            mail_queue.enqueue("s", "t", "a@b.com")
+            time.sleep(0.05)
+            mail_queue.enqueue("s", "t", "a@b.com")
+            assert mail_queue.pending() == 1
+            with pytest.raises(MailQueueFull):
+                mail_queue.enqueue("s", "t", "a@b.com", timeout=0.01)
+            with pytest.raises(MailQueueFull):
+                mail_queue.enqueue("s", "t", "a@b.com")
+        finally:
+            mail_queue.stop()
+
+    def test_stop_interrupts_backoff(self, fake_smtp):
+        fake_smtp.failures = 5
+        mail_queue = MailQueue(workers=1, backoff=10)
+        message_id = mail_queue.enqueue("s", "t", "a@b.com")
+        time.sleep(0.05)
+        start = time.perf_counter()
+        mail_queue.stop()
+        assert time.perf_counter() - start < 1
+        assert mail_queue.status(message_id)["status"] == "failed"
+
+    def test_status_of_unknown_message(self, mail_queue):
+        assert mail_queue.status("nope") is None
+
+    def test_status_limit_evicts_oldest(self, fake_smtp):
+        mail_queue = MailQueue(workers=1, status_limit=2)
+        try:
+            ids = [mail_queue.enqueue("s", "t", "a@b.com") for _ in range(3)]
+            mail_queue.join()
+        finally:
+            mail_queue.stop()
+        assert mail_queue.status(ids[0]) is None
+        assert mail_queue.status(ids[2])["status"] == "sent"
+
+    def test_custom_send(self):
+        sent = []
+        mail_queue = MailQueue(workers=1, send=lambda *args: sent.append(args) or True)
+        try:
+            mail_queue.enqueue("s", "t", "a@b.com")
+            mail_queue.join()
+        finally:
+            mail_queue.stop()
+        assert sent == [("s", "t", "a@b.com")]
+
+    def test_account_queue_history_email(self, fake_smtp, mail_queue):
+        acc = Account("Jan", "Kowalski", "90010112345")
+        acc.deposit(100)
+        message_id = acc.queue_history_email("jan@x.pl", mail_queue)
+        mail_queue.join()
+        assert mail_queue.status(message_id)["status"] == "sent"
+        assert fake_smtp.sent[0][1] == "Personal account history: [100]"
+
+    def test_business_account_queue_history_email(self, fake_smtp, mail_queue, monkeypatch):
+        monkeypatch.setattr(BuisnessAccount, "_nip_validation", lambda self: True)
+        acc = BuisnessAccount("Firma", "1234567890")
+        acc.deposit(100)
+        acc.queue_history_email("firma@x.pl", mail_queue)
+        mail_queue.join()
+        assert fake_smtp.sent[0][1] == "Company account history: [100]"
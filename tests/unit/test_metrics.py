@@ -0,0 +1,89 @@
+import pytest
+from account import Account, AccountsRegistry
+from metrics import HISTORY_BUCKETS, Metrics
+
+
+@pytest.fixture
+def metrics():
+    return Metrics(buckets=(0.001, 0.01))
+
+
+def samples(text, name):
+    return {line.rsplit(" ", 1)[0]: line.rsplit(" ", 1)[1]
+            for line in text.splitlines() if line.startswith(name + "{") or line.startswith(name + " ")}
+
+
+class TestMetrics:
+
+    def test_latency_histogram_is_cumulative(self, metrics):
+        for seconds in (0.0005, 0.001, 0.005, 0.5):
+            metrics.observe("/api/accounts", "GET", 200, seconds)
+        text = metrics.render()
+        labels = 'route="/api/accounts",method="GET",status="200"'
+        assert samples(text, "bank_http_request_duration_seconds_bucket") == {
+            f'bank_http_request_duration_seconds_bucket{{{labels},le="0.001"}}': "2",
+            f'bank_http_request_duration_seconds_bucket{{{labels},le="0.01"}}': "3",
+            f'bank_http_request_duration_seconds_bucket{{{labels},le="+Inf"}}': "4",
+        }
+        assert samples(text, "bank_http_request_duration_seconds_count") == {
+            f"bank_http_request_duration_seconds_count{{{labels}}}": "4"}
+        sum_line = samples(text, "bank_http_request_duration_seconds_sum")
+        assert float(sum_line[f"bank_http_request_duration_seconds_sum{{{labels}}}"]) == pytest.approx(0.5065)
+
+    def test_counts_per_route_and_status(self, metrics):
+        metrics.observe("/api/accounts", "POST", 201, 0.0001)
+        metrics.observe("/api/accounts", "POST", 409, 0.0001)
+        metrics.observe("/api/accounts", "POST", 409, 0.0001)
+        text = metrics.render()
+        assert samples(text, "bank_http_requests_total") == {
+            'bank_http_requests_total{route="/api/accounts",method="POST",status="201"}': "1",
+            'bank_http_requests_total{route="/api/accounts",method="POST",status="409"}': "2",
+        }
+        assert samples(text, "bank_http_errors_total") == {
+            'bank_http_errors_total{route="/api/accounts",method="POST",status="409"}': "2",
+        }
+        assert "# TYPE bank_http_request_duration_seconds histogram" in text
+
+    def test_label_values_are_escaped(self, metrics):
+        metrics.observe('a"b\\c\n', "GET", 200, 0.0)
+        assert 'route="a\\"b\\\\c\\n"' in metrics.render()
+
+    def test_clear(self, metrics):
+        metrics.observe("/metrics", "GET", 200, 0.0)
+        metrics.clear()
+        assert metrics.snapshot() == {}
+
+    def test_registry_size_and_history_length_distribution(self, metrics):
+        registry = AccountsRegistry()
+        for i, length in enumerate((0, 3, 3, 20000)):
+            acc = Account("Jan", "Kowalski", f"9001011234{i}")
+            acc.history = [1] * length
+            registry.add_account(acc)
+
+        text = metrics.render(registry)
+        assert "bank_accounts 4" in text.splitlines()
+        buckets = samples(text, "bank_account_history_length_bucket")
+        assert buckets['bank_account_history_length_bucket{le="0.0"}'] == "1"
+        assert buckets['bank_account_history_length_bucket{le="5.0"}'] == "3"
+        assert buckets[f'bank_account_history_length_bucket{{le="{float(HISTORY_BUCKETS[-1])}"}}'] == "3"
+        assert buckets['bank_account_history_length_bucket{le="+Inf"}'] == "4"
+        assert "bank_account_history_length_sum 20006" in text.splitlines()
+        assert "bank_account_history_length_count 4" in text.splitlines()
+
+    def test_history_lengths_follow_registry_changes(self, metrics, monkeypatch):
+        registry = AccountsRegistry()
+        for i in range(3):
+            registry.add_account(Account("Jan", "Kowalski", f"9001011234{i}"))
+        registry.transfer("90010112340", "incoming", 100)
+        registry.transfer("90010112341", "incoming", 100)
+        registry.find_by_pesel("90010112341").history = [1] * 7
+        registry.delete_by_pesel("90010112342")
+        monkeypatch.setattr(registry, "iter_accounts", None)
+
+        assert registry.history_lengths() == ([0, 1, 0, 1] + [0] * (len(HISTORY_BUCKETS) - 3), 8)
+        lines = metrics.render(registry).splitlines()
+        assert "bank_account_history_length_count 2" in lines
+        assert "bank_account_history_length_sum 8" in lines
+
+        registry.clear()
+        assert registry.history_lengths() == ([0] * (len(HISTORY_BUCKETS) + 1), 0)
@@ -0,0 +1,69 @@
+import threading
+import time
+import pytest
+from buisness_account import BuisnessAccount
+from mf.batch import validate_concurrently
+
+
+class TestValidateConcurrently:
+
+    def test_empty(self):
+        assert validate_concurrently([], lambda nip: True, 4) == {}
+
+    def test_deduplicates_and_keeps_order(self):
+        calls = []
+        result = validate_concurrently(["b", "a", "b", "c", "a"], lambda nip: calls.append(nip) or nip, 2)
+        assert list(result) == ["b", "a", "c"]
+        assert sorted(calls) == ["a", "b", "c"]
+
+    def test_respects_concurrency_limit(self):
+        running = 0
+        peak = 0
+        lock = threading.Lock()
+
+        def validate(nip):
+            nonlocal running, peak
+            with lock:
+                running += 1
+                peak = max(peak, running)
+            time.sleep(0.01)
+            with lock:
+                running -= 1
+            return True
+
+        validate_concurrently([str(i) for i in range(20)], validate, 3)
+        assert peak <= 3
+
+
+class TestBuisnessAccountBatchValidation:
+
+    def test_validate_nips_queries_each_nip_once(self, mf_stub):
+        mf_stub.active_nips.update({"8461627563", "1234567891"})
+        result = BuisnessAccount.validate_nips(
+            ["8461627563", "1234567891", "8461627563", "0000000000", "123"]
+        )
+        assert result == {
+            "8461627563": True,
+            "1234567891": True,
+            "0000000000": False,
+            "123": False,
+        }
+        assert mf_stub.hits == 3
+
+    def test_accounts_built_from_results_do_not_requery(self, mf_stub):
+        mf_stub.active_nips.add("8461627563")
+        result = BuisnessAccount.validate_nips(["8461627563", "0000000000"])
+        hits = mf_stub.hits
+
+        acc = BuisnessAccount("Firma", "8461627563", mf_result=result["8461627563"])
+        with pytest.raises(ValueError):
+            BuisnessAccount("Firma", "0000000000", mf_result=result["0000000000"])
+
+        assert acc.nip == "8461627563"
+        assert mf_stub.hits == hits
+
+    def test_validate_nips_uses_cache(self, mf_stub):
+        mf_stub.active_nips.add("8461627563")
+        BuisnessAccount("Firma", "8461627563")
+        assert BuisnessAccount.validate_nips(["8461627563"]) == {"8461627563": True}
+        assert mf_stub.hits == 1
@@ -0,0 +1,180 @@
+import time
+import pytest
+from buisness_account import BuisnessAccount
+from mf.breaker import CircuitBreaker
+
+
+class FakeClock:
+    def __init__(self):
+        self.now = 0.0
+
+    def __call__(self):
+        return self.now
+
+
+class TestCircuitBreaker:
+
+    @pytest.fixture
+    def clock(self):
+        return FakeClock()
+
+    @pytest.fixture
+    def breaker(self, clock):
+        return CircuitBreaker(failure_threshold=3, reset_timeout=10, clock=clock)
+
+    def test_opens_after_consecutive_failures(self, breaker):
+        for _ in range(3):
+            assert breaker.allow()
+            breaker.record_failure(0.01)
+        assert breaker.state == CircuitBreaker.OPEN
+        assert breaker.allow() is False
+        assert breaker.stats()["rejected"] == 1
+
+    def test_success_resets_failure_count(self, breaker):
+        breaker.record_failure(0.01)
+        breaker.record_failure(0.01)
+        breaker.record_success(0.01)
+        breaker.record_failure(0.01)
+        assert breaker.state == CircuitBreaker.CLOSED
+
+    def test_half_open_allows_single_probe(self, breaker, clock):
+        for _ in range(3):
+            breaker.record_failure(0.01)
+        clock.now += 10
+        assert breaker.allow() is True
+        assert breaker.state == CircuitBreaker.HALF_OPEN
+        assert breaker.allow() is False
+
+    def test_successful_probe_closes(self, breaker, clock):
+        for _ in range(3):
+            breaker.record_failure(0.01)
+        clock.now += 10
+        breaker.allow()
+        breaker.record_success(0.01)
+        assert breaker.state == CircuitBreaker.CLOSED
+        assert breaker.allow() is True
+
+    def test_failed_probe_reopens(self, breaker, clock):
+        for _ in range(3):
+            breaker.record_failure(0.01)
+        clock.now += 10
+        breaker.allow()
+        breaker.record_failure(0.01)
+        assert breaker.state == CircuitBreaker.OPEN
+        clock.now += 5
+        assert breaker.allow() is False
+
+    def test_stats(self, breaker):
+        assert "latency_avg" not in breaker.stats()
+        for latency in (0.1, 0.2, 0.3):
+            breaker.record_success(latency)
+        breaker.record_failure(0.4)
+        stats = breaker.stats()
+        assert stats["state"] == CircuitBreaker.CLOSED
+        assert stats["calls"] == 4
+        assert stats["failures"] == 1
+        assert stats["latency_max"] == 0.4
+        assert stats["latency_p50"] == 0.3
+        assert stats["latency_avg"] == pytest.approx(0.25)
+
+    def test_reset(self, breaker):
+        for _ in range(3):
+            breaker.record_failure(0.01)
+        breaker.reset()
+        assert breaker.stats() == {"state": "closed", "calls": 0, "failures": 0, "rejected": 0}
+
+
+class TestBuisnessAccountMFResilience:
+
+    def test_open_breaker_stops_calling_mf(self, mf_stub):
+        mf_stub.status = 500
+        threshold = BuisnessAccount.mf_breaker.failure_threshold
+        for i in range(threshold):
+            with pytest.raises(ValueError):
+                BuisnessAccount("Firma", f"{i:010d}")
+        hits = mf_stub.hits
+
+        mf_stub.status = 200
+        mf_stub.active_nips.add("8461627563")
+        with pytest.raises(ValueError):
+            BuisnessAccount("Firma", "8461627563")
+        assert mf_stub.hits == hits
+        assert BuisnessAccount.mf_stats()["breaker"]["state"] == "open"
+
+    def test_deadline_cuts_slow_request(self, mf_stub):
+        mf_stub.delay = 1
+        mf_stub.active_nips.add("8461627563")
+        start = time.monotonic()
+        with pytest.raises(ValueError):
+            BuisnessAccount("Firma", "8461627563", deadline=time.monotonic() + 0.1)
+        assert time.monotonic() - start < 0.5
+
+    def test_expired_deadline_skips_request(self, mf_stub):
+        with pytest.raises(ValueError):
+            BuisnessAccount("Firma", "8461627563", deadline=time.monotonic() - 1)
+        assert mf_stub.hits == 0
+
+    def test_deadline_bounds_retries(self, mf_stub):
+        mf_stub.status = 503
+        mf_stub.delay = 0.4
+        deadline = time.monotonic() + 0.5
+        with pytest.raises(ValueError):
+            BuisnessAccount("Firma", "8461627563", deadline=deadline)
+        assert time.monotonic() <= deadline
+        assert mf_stub.hits == 1
+        assert BuisnessAccount.mf_stats()["breaker"]["failures"] == 1
+
+    def test_transient_errors_are_retried(self, mf_stub, monkeypatch):
+        monkeypatch.setattr(BuisnessAccount, "MF_BACKOFF", 0)
+        mf_stub.status = 503
+        with pytest.raises(ValueError):
+            BuisnessAccount("Firma", "8461627563")
+        assert mf_stub.hits == BuisnessAccount.MF_RETRIES + 1
+        assert BuisnessAccount.mf_stats()["breaker"]["failures"] == BuisnessAccount.MF_RETRIES + 1
+
+    def test_connection_errors_are_retried(self, monkeypatch):
+        monkeypatch.setattr(BuisnessAccount, "MF_BACKOFF", 0)
+        monkeypatch.setattr(BuisnessAccount, "MF_API_URL", "http://127.0.0.1:9")
+        with pytest.raises(ValueError):
+            BuisnessAccount("Firma", "8461627563")
+        assert BuisnessAccount.mf_stats()["breaker"]["failures"] == BuisnessAccount.MF_RETRIES + 1
+
+    def test_server_error_is_not_retried(self, mf_stub):
+        mf_stub.status = 500
+        with pytest.raises(ValueError):
+            BuisnessAccount("Firma", "8461627563")
+        assert mf_stub.hits == 1
+
+    def test_rate_limit_is_not_cached_as_rejection(self, mf_stub):
+        mf_stub.active_nips.add("8461627563")
+        mf_stub.status = 429
+        with pytest.raises(ValueError):
+            BuisnessAccount("Firma", "8461627563")
+        assert mf_stub.hits == 1
+        assert BuisnessAccount.mf_stats()["breaker"]["failures"] == 1
+
+        mf_stub.status = 200
+        assert BuisnessAccount("Firma", "8461627563").nip == "8461627563"
+        assert mf_stub.hits == 2
+
+    @pytest.mark.parametrize("status, answer", [(404, False), (400, None), (403, None)])
+    def test_client_errors(self, mf_stub, status, answer):
+        mf_stub.status = status
+        assert BuisnessAccount._query_mf("8461627563") is answer
+        assert BuisnessAccount.mf_stats()["breaker"]["failures"] == 0
+
+    def test_deadline_with_fast_mf(self, mf_stub):
+        mf_stub.active_nips.add("8461627563")
+        acc = BuisnessAccount("Firma", "8461627563", deadline=time.monotonic() + 5)
+        assert acc.nip == "8461627563"
+        assert BuisnessAccount.mf_stats()["breaker"]["calls"] == 1
+
+    def test_unparseable_response_is_unknown(self, monkeypatch):
+        class Response:
+            status_code = 200
+
+            def json(self):
+                raise ValueError("not json")
+
+        monkeypatch.setattr(BuisnessAccount.session, "get", lambda *a, **kw: Response())
+        assert BuisnessAccount._query_mf("8461627563") is None
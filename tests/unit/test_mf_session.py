@@ -0,0 +1,31 @@
+import requests
+from buisness_account import BuisnessAccount
+from mf.session import make_session
+
+
+class TestMFSession:
+
+    def test_session_reuses_connection(self, mf_stub):
+        session = make_session(pool_size=2)
+        for _ in range(10):
+            assert session.get(f"{mf_stub.url}/api/search/nip/1", timeout=5).status_code == 200
+        assert mf_stub.hits == 10
+        assert mf_stub.connections == 1
+
+    def test_plain_requests_opens_connection_per_call(self, mf_stub):
+        for _ in range(3):
+            requests.get(f"{mf_stub.url}/api/search/nip/1", timeout=5)
+        assert mf_stub.connections == 3
+
+    def test_retries_transient_errors(self, mf_stub):
+        session = make_session(retries=2, backoff_factor=0)
+        mf_stub.status = 503
+        assert session.get(f"{mf_stub.url}/api/search/nip/1", timeout=5).status_code == 503
+        assert mf_stub.hits == 3
+
+    def test_business_account_uses_shared_session(self, mf_stub):
+        mf_stub.active_nips.update({"8461627563", "1234567891"})
+        BuisnessAccount("Firma 1", "8461627563")
+        BuisnessAccount("Firma 2", "1234567891")
+        assert mf_stub.hits == 2
+        assert mf_stub.connections == 1
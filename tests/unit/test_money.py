@@ -0,0 +1,46 @@
+import pytest
+from money import MAX_GROSZE, to_grosze, to_zloty
+
+
+class TestMoney:
+
+    @pytest.mark.parametrize("amount, grosze", [
+        (0, 0),
+        (150, 15000),
+        (-1775, -177500),
+        (12.5, 1250),
+        (0.29, 29),
+        (0.1, 10),
+        (-0.01, -1),
+        (1e6, 100_000_000),
+    ])
+    def test_to_grosze(self, amount, grosze):
+        assert to_grosze(amount) == grosze
+        assert type(to_grosze(amount)) is int
+
+    @pytest.mark.parametrize("amount", [0.001, 0.125, float("nan"), float("inf"), -float("inf"),
+                                        MAX_GROSZE, -MAX_GROSZE, 1e17])
+    def test_invalid_amount(self, amount):
+        with pytest.raises(ValueError):
+            to_grosze(amount)
+
+    @pytest.mark.parametrize("amount", ["10", None, True, [1]])
+    def test_not_a_number(self, amount):
+        with pytest.raises(TypeError):
+            to_grosze(amount)
+
+    @pytest.mark.parametrize("grosze, amount", [
+        (0, 0),
+        (15000, 150),
+        (-177500, -1775),
+        (1250, 12.5),
+        (-150, -1.5),
+        (30, 0.3),
+    ])
+    def test_to_zloty(self, grosze, amount):
+        assert to_zloty(grosze) == amount
+        assert type(to_zloty(grosze)) is type(amount)
+
+    def test_round_trip(self):
+        for grosze in range(-10_000, 10_000, 7):
+            assert to_grosze(to_zloty(grosze)) == grosze
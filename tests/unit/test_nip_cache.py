@@ -0,0 +1,110 @@
+import json
+import pytest
+from buisness_account import BuisnessAccount
+from mf.cache import NipValidationCache
+
+
+class FakeClock:
+    def __init__(self):
+        self.now = 1000.0
+
+    def __call__(self):
+        return self.now
+
+
+class TestNipValidationCache:
+
+    @pytest.fixture
+    def clock(self):
+        return FakeClock()
+
+    @pytest.fixture
+    def cache(self, clock):
+        return NipValidationCache(ttl=60, negative_ttl=10, maxsize=3, clock=clock)
+
+    def test_miss_then_hit(self, cache):
+        assert cache.get("8461627563") is None
+        cache.put("8461627563", True)
+        assert cache.get("8461627563") is True
+        assert cache.stats() == {"hits": 1, "misses": 1, "size": 1}
+
+    def test_positive_and_negative_ttl(self, cache, clock):
+        cache.put("1111111111", True)
+        cache.put("2222222222", False)
+        clock.now += 30
+        assert cache.get("1111111111") is True
+        assert cache.get("2222222222") is None
+        clock.now += 31
+        assert cache.get("1111111111") is None
+        assert cache.stats()["size"] == 0
+
+    def test_zero_ttl_disables_caching(self, clock):
+        cache = NipValidationCache(ttl=0, negative_ttl=0, clock=clock)
+        cache.put("1111111111", True)
+        assert cache.get("1111111111") is None
+
+    def test_lru_eviction(self, cache):
+        for nip in ("1", "2", "3"):
+            cache.put(nip, True)
+        cache.get("1")
+        cache.put("4", True)
+        assert cache.get("2") is None
+        assert cache.get("1") is True
+        assert cache.get("4") is True
+
+    def test_clear(self, cache):
+        cache.put("1", True)
+        cache.get("1")
+        cache.clear()
+        assert cache.stats() == {"hits": 0, "misses": 0, "size": 0}
+
+    def test_persist_across_restarts(self, tmp_path, clock):
+        path = str(tmp_path / "nip_cache.json")
+        cache = NipValidationCache(ttl=60, negative_ttl=10, path=path, clock=clock)
+        cache.put("1111111111", True)
+        cache.put("2222222222", False)
+        cache.save()
+
+        clock.now += 20
+        restored = NipValidationCache(ttl=60, negative_ttl=10, maxsize=5, path=path, clock=clock)
+        assert restored.get("1111111111") is True
+        assert restored.get("2222222222") is None
+
+    def test_load_respects_maxsize(self, tmp_path, clock):
+        path = tmp_path / "nip_cache.json"
+        path.write_text(json.dumps({str(i): [True, clock.now + 60] for i in range(5)}))
+        cache = NipValidationCache(maxsize=2, path=str(path), clock=clock)
+        assert cache.stats()["size"] == 2
+
+    def test_load_ignores_missing_or_corrupt_file(self, tmp_path):
+        assert NipValidationCache(path=str(tmp_path / "missing.json")).stats()["size"] == 0
+        corrupt = tmp_path / "corrupt.json"
+        corrupt.write_text("{not json")
+        assert NipValidationCache(path=str(corrupt)).stats()["size"] == 0
+
+
+class TestBuisnessAccountNipCache:
+
+    def test_repeated_nip_hits_mf_once(self, mf_stub):
+        mf_stub.active_nips.add("8461627563")
+        for _ in range(5):
+            BuisnessAccount("Firma", "8461627563")
+        assert mf_stub.hits == 1
+        assert BuisnessAccount.nip_cache.stats()["hits"] == 4
+
+    def test_negative_result_is_cached(self, mf_stub):
+        for _ in range(3):
+            with pytest.raises(ValueError):
+                BuisnessAccount("Firma", "1234567890")
+        assert mf_stub.hits == 1
+
+    def test_server_error_is_not_cached(self, mf_stub):
+        mf_stub.active_nips.add("8461627563")
+        mf_stub.status = 503
+        with pytest.raises(ValueError):
+            BuisnessAccount("Firma", "8461627563")
+        failed_hits = mf_stub.hits
+
+        mf_stub.status = 200
+        BuisnessAccount("Firma", "8461627563")
+        assert mf_stub.hits == failed_hits + 1
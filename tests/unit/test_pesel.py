@@ -0,0 +1,84 @@
+import random
+import pytest
+import pesel
+from pesel import WEIGHTS, age_eligible, birth_year, classify_pesels, is_valid_pesel
+
+
+def with_checksum(first_ten):
+    return first_ten + str(-sum(int(d) * w for d, w in zip(first_ten, WEIGHTS)) % 10)
+
+
+@pytest.fixture(params=["numpy", "python"])
+def backend(request, monkeypatch):
+    if request.param == "python":
+        monkeypatch.setattr(pesel, "np", None)
+    elif pesel.np is None:
+        pytest.skip("NumPy is not installed")
+    return request.param
+
+
+class TestPesel:
+
+    @pytest.mark.parametrize("value, year", [
+        ("50010112345", 1950),
+        ("02210112345", 2002),
+        ("02410112345", 2102),
+        ("02610112345", 2202),
+        ("80810112345", 1880),
+        ("99990803628", 0),
+        ("00000000000", 0),
+        ("12345", 0),
+        ("Invalid", 0),
+        ("5001011234x", 0),
+        ("５００１０１１２３４５", 0),
+    ])
+    def test_birth_year(self, value, year):
+        assert birth_year(value) == year
+
+    def test_age_eligible(self):
+        assert age_eligible("50010112345")
+        assert not age_eligible("49120112345")
+        assert not age_eligible("27210112345")
+
+    def test_classify_matches_per_pesel_checks(self, backend):
+        rng = random.Random(0)
+        pesels = ["".join(rng.choice("0123456789") for _ in range(11)) for _ in range(2000)]
+        valid, years, eligible = classify_pesels(pesels)
+        assert valid == [True] * len(pesels)
+        assert years == [birth_year(p) for p in pesels]
+        assert eligible == [age_eligible(p) for p in pesels]
+
+    def test_classify_mixed_rows(self, backend):
+        pesels = ["02210112345", "123", "0221011234ż", "0221011234a", "022101123456", "", "90010112345"]
+        valid, years, eligible = classify_pesels(pesels)
+        assert valid == [True, False, True, True, False, False, True]
+        assert years == [2002, 0, 0, 0, 0, 0, 1990]
+        assert eligible == [True, False, False, False, False, False, True]
+
+    def test_classify_empty(self, backend):
+        assert classify_pesels([]) == ([], [], [])
+
+    @pytest.mark.parametrize("value, expected", [
+        ("44051401359", True),
+        (with_checksum("0022290123"), True),    # 29 Feb 2000
+        (with_checksum("0122290123"), False),   # 29 Feb 2001
+        (with_checksum("9913310123"), False),   # month 13
+        (with_checksum("9004310123"), False),   # 31 April
+        (with_checksum("9004000123"), False),   # day 0
+        (with_checksum("2381010123"), True),    # 1823
+        ("44051401358", False),                 # checksum
+        ("4405140135x", False),
+        ("4405140135", False),
+        ("４４０５１４０１３５９", False),
+    ])
+    def test_is_valid_pesel(self, value, expected):
+        assert is_valid_pesel(value) is expected
+
+    def test_classify_strict_matches_is_valid_pesel(self, backend):
+        rng = random.Random(1)
+        pesels = ["".join(rng.choice("0123456789") for _ in range(11)) for _ in range(2000)]
+        pesels += [with_checksum(p[:10]) for p in pesels]
+        pesels += ["123", "0221011234ż", "4405140135x"]
+        valid, _, _ = classify_pesels(pesels, strict=True)
+        assert valid == [is_valid_pesel(p) for p in pesels]
+        assert sum(valid) > 100
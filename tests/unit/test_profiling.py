@@ -0,0 +1,148 @@
+import sys
+import threading
+import time
+import pytest
+from profiling import ProfilingMiddleware, SamplingProfiler
+
+
+def run_profiled(profiler, target):
+    """Runs target in a thread registered with the profiler from its own frame."""
+    def worker():
+        ident = profiler.start(sys._getframe())
+        try:
+            target()
+        finally:
+            profiler.stop(ident)
+    thread = threading.Thread(target=worker)
+    thread.start()
+    return thread
+
+
+class TestSamplingProfiler:
+
+    def test_sample_records_stack_below_root(self):
+        profiler = SamplingProfiler()
+        entered, release = threading.Event(), threading.Event()
+
+        def busy():
+            entered.set()
+            release.wait()
+
+        thread = run_profiled(profiler, busy)
+        entered.wait()
+        profiler.sample()
+        release.set()
+        thread.join()
+
+        [(stack, n)] = profiler.counts.items()
+        assert stack.startswith("test_profiling.py:busy;threading.py:wait")
+        assert n == 1
+        assert profiler.collapsed() == f"{stack} 1\n"
+
+    def test_background_sampling(self):
+        profiler = SamplingProfiler(interval=0.001)
+        run_profiled(profiler, lambda: time.sleep(0.1)).join()
+        assert any(stack.startswith("test_profiling.py:<lambda>") for stack in profiler.counts)
+        assert not profiler._active.is_set()
+
+    def test_ignores_threads_outside_their_root(self):
+        profiler = SamplingProfiler()
+
+        def finished():
+            return sys._getframe()
+        ident = profiler.start(finished())
+        profiler.sample()
+        profiler.stop(ident)
+        assert profiler.counts == {}
+
+    def test_dump_and_clear(self, tmp_path):
+        profiler = SamplingProfiler()
+        profiler.counts["a.py:f;b.py:g"] = 3
+        profiler.dump(tmp_path / "profile.folded")
+        assert (tmp_path / "profile.folded").read_text() == "a.py:f;b.py:g 3\n"
+        profiler.clear()
+        assert profiler.collapsed() == ""
+
+
+class TestProfilingMiddleware:
+
+    class Body:
+        closed = False
+
+        def __iter__(self):
+            time.sleep(0.05)
+            yield b"ok"
+
+        def close(self):
+            self.closed = True
+
+    def call(self, middleware, path="/", **environ):
+        started = []
+        result = middleware({"PATH_INFO": path, **environ}, lambda status, headers: started.append(status))
+        body = b"".join(result)
+        if hasattr(result, "close"):
+            result.close()
+        return started[0], body
+
+    @pytest.fixture
+    def profiler(self):
+        return SamplingProfiler(interval=0.001)
+
+    def test_profiles_streamed_body_and_closes_it(self, profiler):
+        body = self.Body()
+
+        def app(environ, start_response):
+            start_response("200 OK", [])
+            return body
+
+        middleware = ProfilingMiddleware(app, profiler, rate=1.0)
+        assert self.call(middleware) == ("200 OK", b"ok")
+        assert body.closed
+        assert any("test_profiling.py:__iter__" in stack for stack in profiler.counts)
+
+    def test_header_triggers_profiling(self, profiler):
+        def app(environ, start_response):
+            start_response("200 OK", [])
+            time.sleep(0.05)
+            return [b"ok"]
+
+        middleware = ProfilingMiddleware(app, profiler)
+        self.call(middleware)
+        assert profiler._thread is None
+        self.call(middleware, HTTP_X_PROFILE="1")
+        assert any(stack.startswith("test_profiling.py:app") for stack in profiler.counts)
+
+    def test_serves_collapsed_stacks(self, profiler):
+        profiler.counts["a.py:f"] = 2
+        middleware = ProfilingMiddleware(None, profiler)
+        assert self.call(middleware, "/debug/profile") == ("200 OK", b"a.py:f 2\n")
+
+    def test_failing_app_stops_profiling(self, profiler):
+        def app(environ, start_response):
+            raise RuntimeError("boom")
+
+        middleware = ProfilingMiddleware(app, profiler, rate=1.0)
+        with pytest.raises(RuntimeError):
+            self.call(middleware)
+        assert profiler._roots == {}
+
+    def test_abandoned_body_stops_on_close_from_another_thread(self, profiler):
+        def app(environ, start_response):
+            start_response("200 OK", [])
+            return [b"a", b"b"]
+
+        middleware = ProfilingMiddleware(app, profiler, rate=1.0)
+        result = middleware({"PATH_INFO": "/"}, lambda status, headers: None)
+        assert next(iter(result)) == b"a"
+        closer = threading.Thread(target=result.close)
+        closer.start()
+        closer.join()
+        assert profiler._roots == {}
+        assert not profiler._active.is_set()
+
+    def test_stop_from_finalizer_inside_start_does_not_deadlock(self, profiler):
+        ident = profiler.start(sys._getframe())
+        with profiler._lock:
+            # What a garbage-collector finalizer running inside start() does.
+            profiler.stop(ident)
+        assert profiler._roots == {}
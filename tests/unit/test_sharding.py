@@ -0,0 +1,206 @@
+import multiprocessing
+import threading
+import pytest
+from account import Account
+from sharding import Shard, ShardedRegistry, serve, shard_for
+
+PESELS = [f"9001011{i:04d}" for i in range(12)]
+
+
+def acc(pesel, name="Jan"):
+    return Account(name, "Kowalski", pesel)
+
+
+def pesels_on_different_shards(shards):
+    first = PESELS[0]
+    second = next(p for p in PESELS if shard_for(p, shards) != shard_for(first, shards))
+    return first, second
+
+
+class TestShard:
+
+    def test_shard_for_is_stable(self):
+        assert shard_for("90010112345", 4) == shard_for("90010112345", 4)
+        assert {shard_for(p, 4) for p in PESELS} <= {0, 1, 2, 3}
+
+    def test_add_and_page_in_sequence(self):
+        shard = Shard()
+        shard.add(1, acc(PESELS[0]))
+        assert shard.add_many([(3, acc(PESELS[1])), (4, acc(PESELS[0]))]) == [True, False]
+        assert [(s, a.pesel) for s, a in shard.page(0, 10)] == [(1, PESELS[0]), (3, PESELS[1])]
+        assert [s for s, _ in shard.page(1, 10)] == [3]
+        assert [s for s, _ in shard.page(0, 1)] == [1]
+        assert shard.seq_of(PESELS[1]) == 3
+        with pytest.raises(KeyError):
+            shard.seq_of("nope")
+
+    def test_page_skips_deleted_and_readded(self):
+        shard = Shard()
+        shard.add(1, acc(PESELS[0]))
+        shard.add(2, acc(PESELS[1]))
+        shard.delete(PESELS[0])
+        shard.add(5, acc(PESELS[0]))
+        assert [(s, a.pesel) for s, a in shard.page(0, 10)] == [(2, PESELS[1]), (5, PESELS[0])]
+
+    def test_compacts_order_after_many_deletes(self):
+        shard = Shard()
+        pesels = [f"{i:011d}" for i in range(3000)]
+        shard.add_many([(seq, acc(p)) for seq, p in enumerate(pesels, 1)])
+        shard.delete(pesels[0])
+        shard.add(3001, acc(pesels[0]))
+        for pesel in pesels[1:2500]:
+            assert shard.delete(pesel)
+        assert shard.count() == 501
+        # Compacted once half the entries were dead; later deletes stay
+        # as cursors until the next compaction.
+        assert len(shard.order) == len(shard.seqs) == 1500
+        assert [a.pesel for _, a in shard.page(0, 1000)] == pesels[2500:] + [pesels[0]]
+        assert shard.seq_of(pesels[0]) == 3001
+        assert not shard.delete(pesels[1])
+
+    def test_operations(self):
+        shard = Shard()
+        shard.add(1, acc(PESELS[0]))
+        assert shard.update(PESELS[0], {"first_name": "Janek"}) is True
+        assert shard.transfer(PESELS[0], "incoming", 100) is True
+        assert shard.transfer("nope", "incoming", 100) is False
+        assert shard.batch([{"pesel": PESELS[0], "amount": 10, "type": "outgoing"}], False) == [{"status": 200}]
+        found = shard.find(PESELS[0])
+        assert (found.first_name, found.balance) == ("Janek", 90)
+        assert shard.count() == 1
+        assert shard.history_lengths()[1] == 2
+        shard.clear()
+        assert shard.count() == 0 and shard.page(0, 10) == []
+
+    @pytest.mark.parametrize("commit, balance", [(True, 150), (False, 100)])
+    def test_prepare_and_finish(self, commit, balance):
+        shard = Shard()
+        shard.add(1, acc(PESELS[0]))
+        shard.transfer(PESELS[0], "incoming", 100)
+        results = shard.prepare([{"pesel": PESELS[0], "amount": 50, "type": "incoming"}])
+        assert results == [{"status": 200}]
+        shard.finish(commit)
+        assert shard.find(PESELS[0]).balance == balance
+        assert len(shard.find(PESELS[0]).history) == (2 if commit else 1)
+
+    def test_prepare_failure_rolls_back_itself(self):
+        shard = Shard()
+        shard.add(1, acc(PESELS[0]))
+        results = shard.prepare([{"pesel": PESELS[0], "amount": 50, "type": "outgoing"}])
+        assert results[0]["status"] == 422
+        assert shard.find(PESELS[0]).history == []
+
+    def test_serve_loop(self):
+        parent, child = multiprocessing.Pipe()
+        worker = threading.Thread(target=serve, args=(child,))
+        worker.start()
+        parent.send(("add", (1, acc(PESELS[0]))))
+        assert parent.recv() == ("ok", None)
+        parent.send(("add", (2, acc(PESELS[0]))))
+        status, error = parent.recv()
+        assert status == "error" and isinstance(error, ValueError)
+        parent.send(None)
+        worker.join()
+
+        parent, child = multiprocessing.Pipe()
+        worker = threading.Thread(target=serve, args=(child,))
+        worker.start()
+        parent.close()
+        worker.join()
+
+
+@pytest.fixture(scope="module")
+def sharded():
+    registry = ShardedRegistry(shards=3)
+    yield registry
+    registry.close()
+
+
+class TestShardedRegistry:
+
+    @pytest.fixture
+    def registry(self, sharded):
+        sharded.clear()
+        return sharded
+
+    def test_single_account_operations(self, registry):
+        registry.add_account(acc(PESELS[0]))
+        with pytest.raises(ValueError):
+            registry.add_account(acc(PESELS[0]))
+        assert registry.update_account(PESELS[0], last_name="Nowak") is True
+        assert registry.transfer(PESELS[0], "incoming", 100) is True
+        with pytest.raises(ValueError):
+            registry.transfer(PESELS[0], "outgoing", 500)
+        with registry.account_lock(PESELS[0]):
+            found = registry.find_by_pesel(PESELS[0])
+        assert (found.last_name, found.balance, found.history) == ("Nowak", 100, [100])
+        assert registry.find_by_pesel(PESELS[1]) is None
+        assert registry.delete_by_pesel(PESELS[0]) is True
+        assert registry.delete_by_pesel(PESELS[0]) is False
+        registry.commit()
+
+    def test_listing_merges_shards_in_insertion_order(self, registry, monkeypatch):
+        monkeypatch.setattr("sharding.PAGE_SIZE", 2)
+        registry.add_account(acc(PESELS[5]))
+        assert registry.add_accounts([acc(p) for p in PESELS] + [acc(PESELS[0])]) == \
+            [True] * 5 + [False] + [True] * 6 + [False]
+        expected = [PESELS[5]] + PESELS[:5] + PESELS[6:]
+
+        assert registry.count_accounts() == 12
+        assert [a.pesel for a in registry.get_all_accounts()] == expected
+        assert [a.pesel for a in registry.iter_accounts(after=PESELS[3])] == expected[5:]
+        with pytest.raises(KeyError):
+            list(registry.iter_accounts(after="00000000000"))
+
+    def test_batch_across_shards(self, registry):
+        first, second = pesels_on_different_shards(3)
+        registry.add_accounts([acc(first), acc(second)])
+        results = registry.apply_batch([
+            {"pesel": first, "amount": 100, "type": "incoming"},
+            {"pesel": second, "amount": 50, "type": "outgoing"},
+            {"pesel": "99999999999", "amount": 1, "type": "incoming"},
+            {"pesel": first, "type": "incoming"},
+        ])
+        assert [r["status"] for r in results] == [200, 422, 404, 400]
+
+    def test_atomic_batch_across_shards_commits(self, registry):
+        first, second = pesels_on_different_shards(3)
+        registry.add_accounts([acc(first), acc(second)])
+        results = registry.apply_batch([
+            {"pesel": first, "amount": 100, "type": "incoming"},
+            {"pesel": second, "amount": 50, "type": "incoming"},
+        ], atomic=True)
+        assert [r["status"] for r in results] == [200, 200]
+        assert registry.find_by_pesel(second).balance == 50
+
+    def test_atomic_batch_across_shards_rolls_back(self, registry):
+        first, second = pesels_on_different_shards(3)
+        registry.add_accounts([acc(first), acc(second)])
+        results = registry.apply_batch([
+            {"pesel": first, "amount": 100, "type": "incoming"},
+            {"pesel": second, "amount": 50, "type": "outgoing"},
+        ], atomic=True)
+        assert [r["status"] for r in results] == [424, 422]
+        assert registry.find_by_pesel(first).history == []
+        assert registry.history_lengths()[1] == 0
+
+    def test_history_lengths_merge_shards(self, registry):
+        first, second = pesels_on_different_shards(3)
+        registry.add_accounts([acc(first), acc(second)])
+        registry.transfer(first, "incoming", 100)
+        counts, total = registry.history_lengths()
+        assert (counts[:2], sum(counts), total) == ([1, 1], 2, 1)
+
+    def test_atomic_batch_with_invalid_item(self, registry):
+        registry.add_account(acc(PESELS[0]))
+        results = registry.apply_batch([
+            {"pesel": PESELS[0], "amount": 100, "type": "incoming"},
+            "not a transfer",
+        ], atomic=True)
+        assert [r["status"] for r in results] == [424, 400]
+        assert registry.find_by_pesel(PESELS[0]).balance == 0
+
+    def test_atomic_batch_on_one_shard(self, registry):
+        registry.add_account(acc(PESELS[0]))
+        results = registry.apply_batch([{"pesel": PESELS[0], "amount": 100, "type": "incoming"}], atomic=True)
+        assert results == [{"status": 200}]
@@ -0,0 +1,93 @@
+import email
+import socket
+import socketserver
+import threading
+import pytest
+from smtp.batch import BatchSMTPClient
+
+
+@pytest.fixture
+def batch_client(smtp_stub):
+    client = BatchSMTPClient(smtp_stub.host, smtp_stub.port, batch_size=10, flush_interval=0.05)
+    yield client
+    client.close()
+
+
+def recipients(stub):
+    return [rcpts[0] for rcpts, _ in stub.messages]
+
+
+class TestBatchSMTPClient:
+
+    def test_send_many_reuses_one_connection(self, smtp_stub, batch_client):
+        messages = [("Historia", f"Personal account history: [{i}]", f"user{i}@bank.pl") for i in range(25)]
+        assert batch_client.send_many(messages) == [True] * 25
+        assert len(smtp_stub.messages) == 25
+        assert smtp_stub.connections == 1
+        body = email.message_from_bytes(smtp_stub.messages[7][1]).get_payload(decode=True)
+        assert body.decode() == "Personal account history: [7]"
+
+    def test_groups_by_domain_and_flushes_full_groups(self, smtp_stub):
+        client = BatchSMTPClient(smtp_stub.host, smtp_stub.port, batch_size=2, flush_interval=60)
+        try:
+            first = client.submit("s", "t", "a@x.pl")
+            other = client.submit("s", "t", "b@y.pl")
+            client.submit("s", "t", "c@X.pl")
+            assert first.result(timeout=1) is True
+            assert recipients(smtp_stub) == ["a@x.pl", "c@X.pl"]
+            assert not other.done()
+            client.flush()
+            assert other.result(timeout=1) is True
+        finally:
+            client.close()
+
+    def test_flushes_after_interval(self, smtp_stub, batch_client):
+        assert batch_client.send("s", "t", "a@x.pl") is True
+        assert recipients(smtp_stub) == ["a@x.pl"]
+
+    def test_refused_recipient_fails_only_that_message(self, smtp_stub, batch_client):
+        smtp_stub.rejected.add("bad@x.pl")
+        results = batch_client.send_many([("s", "t", "a@x.pl"), ("s", "t", "bad@x.pl"), ("s", "t", "c@x.pl")])
+        assert results == [True, False, True]
+        assert smtp_stub.connections == 1
+
+    def test_reconnects_when_server_closes_session(self, smtp_stub, batch_client):
+        smtp_stub.max_per_connection = 2
+        assert batch_client.send_many([("s", "t", f"u{i}@x.pl") for i in range(5)]) == [True] * 5
+        assert smtp_stub.connections == 3
+
+    def test_routes_domain_to_its_relay(self, smtp_stub):
+        with socket.socket() as s:
+            s.bind(("127.0.0.1", 0))
+            dead_port = s.getsockname()[1]
+        client = BatchSMTPClient("127.0.0.1", dead_port, routes={"x.pl": (smtp_stub.host, smtp_stub.port)})
+        try:
+            assert client.send_many([("s", "t", "a@x.pl"), ("s", "t", "b@y.pl")]) == [True, False]
+        finally:
+            client.close()
+
+    def test_server_hanging_up_on_connect(self):
+        class HangUp(socketserver.BaseRequestHandler):
+            def handle(self):
+                pass
+
+        server = socketserver.TCPServer(("127.0.0.1", 0), HangUp)
+        threading.Thread(target=server.serve_forever, args=(0.05,), daemon=True).start()
+        client = BatchSMTPClient(*server.server_address)
+        try:
+            assert client.send_many([("s", "t", "a@x.pl")]) == [False]
+        finally:
+            client.close()
+            server.shutdown()
+            server.server_close()
+
+    def test_close_tolerates_dropped_session(self, smtp_stub):
+        smtp_stub.max_per_connection = 1
+        client = BatchSMTPClient(smtp_stub.host, smtp_stub.port)
+        assert client.send_many([("s", "t", "a@x.pl")]) == [True]
+        client.close()
+
+    def test_submit_after_close(self, batch_client):
+        batch_client.close()
+        with pytest.raises(RuntimeError):
+            batch_client.submit("s", "t", "a@x.pl")
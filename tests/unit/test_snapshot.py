@@ -0,0 +1,184 @@
+import threading
+import time
+import pytest
+from account import Account, AccountsRegistry
+from journal import Journal
+import snapshot
+from snapshot import Snapshotter, load_snapshot, write_snapshot
+
+
+def state(registry):
+    return [(a.pesel, a.first_name, a.last_name, a.balance, a.history.tolist()) for a in registry.iter_accounts()]
+
+
+def restore(snapshot_path, journal_path=None):
+    registry = AccountsRegistry()
+    since, versions = load_snapshot(registry, snapshot_path)
+    if journal_path is not None:
+        registry.replay(Journal(journal_path).read(), since, versions)
+    return registry
+
+
+def restart(registry, paths):
+    """Recovers into a new registry, as after a process restart."""
+    registry.journal.close()
+    restarted = AccountsRegistry()
+    snapshot.restore(restarted, *paths)
+    return restarted
+
+
+class TestSnapshot:
+
+    @pytest.fixture
+    def paths(self, tmp_path):
+        return tmp_path / "registry.snapshot", tmp_path / "registry.journal"
+
+    def test_round_trip(self, paths):
+        snapshot_path, _ = paths
+        registry = AccountsRegistry()
+        registry.add_account(Account("Jan", "Kowalski", "90010112345"))
+        registry.add_account(Account("Żaneta", "Łódź", "92020212345"))
+        registry.add_account(Account("Ewa", "Lis", "93030312345"))
+        registry.find_by_pesel("90010112345").deposit(100)
+        registry.find_by_pesel("92020212345").deposit(12.5)
+        registry.delete_by_pesel("93030312345")
+
+        assert write_snapshot(registry, snapshot_path) == 0
+        restored = restore(snapshot_path)
+        assert state(restored) == state(registry)
+        assert restored.find_by_pesel("90010112345").history.recent_sum() == 100
+
+    def test_writes_after_restart_from_truncated_journal(self, paths):
+        registry = AccountsRegistry()
+        snapshot.restore(registry, *paths)
+        registry.add_account(Account("Jan", "Kowalski", "90010112345"))
+        registry.transfer("90010112345", "incoming", 100)
+        Snapshotter(registry, paths[0]).snapshot()
+        assert paths[1].read_bytes() == b""
+
+        registry = restart(registry, paths)
+        assert registry.journal.last_lsn == 2
+        registry.transfer("90010112345", "incoming", 50)
+        registry.add_account(Account("Anna", "Nowak", "92020212345"))
+        registry.commit()
+
+        restarted = restart(registry, paths)
+        assert state(restarted) == state(registry)
+        assert restarted.find_by_pesel("90010112345").balance == 150
+        assert restarted.count_accounts() == 2
+        restarted.journal.close()
+
+    def test_not_a_snapshot(self, paths):
+        snapshot_path, _ = paths
+        snapshot_path.write_bytes(b"x" * 64)
+        with pytest.raises(ValueError):
+            load_snapshot(AccountsRegistry(), snapshot_path)
+
+    def test_snapshot_plus_journal_tail(self, paths):
+        snapshot_path, journal_path = paths
+        registry = AccountsRegistry(Journal(journal_path))
+        registry.add_account(Account("Jan", "Kowalski", "90010112345"))
+        registry.add_account(Account("Anna", "Nowak", "92020212345"))
+        acc = registry.find_by_pesel("90010112345")
+        acc.deposit(100)
+        registry.record("transfer", acc.pesel, type="incoming", amount=100)
+
+        Snapshotter(registry, snapshot_path).snapshot()
+
+        acc.withdraw(30)
+        registry.record("transfer", acc.pesel, type="outgoing", amount=30)
+        registry.delete_by_pesel("92020212345")
+        registry.add_account(Account("Ewa", "Lis", "93030312345"))
+        registry.commit()
+
+        assert [e["lsn"] for e in Journal(journal_path).read()] == [4, 5, 6]
+        assert state(restore(snapshot_path, journal_path)) == state(registry)
+
+    def test_journal_entries_for_accounts_missing_from_snapshot(self, paths):
+        snapshot_path, _ = paths
+        registry = AccountsRegistry()
+        registry.add_account(Account("Jan", "Kowalski", "90010112345"))
+        write_snapshot(registry, snapshot_path)
+        restored = AccountsRegistry()
+        since, versions = load_snapshot(restored, snapshot_path)
+        restored.replay([
+            {"lsn": 1, "op": "transfer", "pesel": "92020212345", "type": "incoming", "amount": 5},
+            {"lsn": 2, "op": "delete", "pesel": "92020212345"},
+        ], since, versions)
+        assert state(restored) == state(registry)
+
+    def test_snapshot_while_transfers_run(self, paths):
+        snapshot_path, journal_path = paths
+        registry = AccountsRegistry(Journal(journal_path, fsync="never"))
+        pesels = [f"{i:011d}" for i in range(200)]
+        registry.add_accounts([Account("Jan", "Kowalski", p) for p in pesels])
+        done = threading.Event()
+
+        def transfers():
+            while not done.is_set():
+                for pesel in pesels:
+                    with registry.account_lock(pesel):
+                        registry.find_by_pesel(pesel).deposit(1)
+                        registry.record("transfer", pesel, type="incoming", amount=1)
+
+        worker = threading.Thread(target=transfers)
+        worker.start()
+        try:
+            time.sleep(0.02)
+            Snapshotter(registry, snapshot_path).snapshot()
+            time.sleep(0.02)
+        finally:
+            done.set()
+            worker.join()
+
+        assert state(restore(snapshot_path, journal_path)) == state(registry)
+
+    def test_background_snapshots(self, paths):
+        snapshot_path, journal_path = paths
+        registry = AccountsRegistry(Journal(journal_path))
+        registry.add_account(Account("Jan", "Kowalski", "90010112345"))
+        snapshotter = Snapshotter(registry, snapshot_path, interval=0.01)
+        snapshotter.start()
+        time.sleep(0.05)
+        snapshotter.stop()
+
+        assert list(Journal(journal_path).read()) == []
+        assert state(restore(snapshot_path, journal_path)) == state(registry)
+
+    def test_names_with_lone_surrogates(self, paths):
+        snapshot_path, _ = paths
+        registry = AccountsRegistry()
+        registry.add_account(Account("Jan\ud800", "\udfffŁódź", "90010112345"))
+        write_snapshot(registry, snapshot_path)
+        assert state(restore(snapshot_path)) == state(registry)
+
+    def test_background_snapshot_failure_is_logged_and_retried(self, paths, monkeypatch, caplog):
+        snapshot_path, journal_path = paths
+        registry = AccountsRegistry(Journal(journal_path))
+        registry.add_account(Account("Jan", "Kowalski", "90010112345"))
+        write = snapshot.write_snapshot
+        calls = []
+
+        def flaky_write(registry, path):
+            calls.append(path)
+            if len(calls) == 1:
+                raise OSError("disk full")
+            return write(registry, path)
+        monkeypatch.setattr(snapshot, "write_snapshot", flaky_write)
+
+        snapshotter = Snapshotter(registry, snapshot_path, interval=0.01)
+        snapshotter.start()
+        deadline = time.monotonic() + 5
+        while len(calls) < 2 and time.monotonic() < deadline:
+            time.sleep(0.01)
+        snapshotter.stop()
+
+        assert len(calls) >= 2
+        assert "disk full" in caplog.text
+        assert list(Journal(journal_path).read()) == []
+
+    def test_snapshot_without_journal(self, paths):
+        snapshot_path, _ = paths
+        registry = AccountsRegistry()
+        assert Snapshotter(registry, snapshot_path).snapshot() == 0
+        assert state(restore(snapshot_path)) == []
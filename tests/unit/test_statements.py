@@ -0,0 +1,48 @@
+import io
+import pytest
+import smtp.smtp as smtpmod
+from account import Account
+from history import History
+from statements import iter_history_text, render_history, write_history
+
+
+class TestStatements:
+
+    @pytest.mark.parametrize("amounts", [[], [5], [100, -50, -1, 2.5], list(range(-7, 30))])
+    def test_chunks_match_list_repr(self, amounts):
+        history = History(amounts)
+        assert "".join(iter_history_text(history, chunk_size=4)) == repr(history)
+
+    def test_last_entries_only(self):
+        history = History(range(10))
+        assert "".join(iter_history_text(history, last=3, chunk_size=2)) == "[7, 8, 9]"
+        assert "".join(iter_history_text(history, last=50)) == repr(list(range(10)))
+
+    def test_chunks_are_bounded(self):
+        history = History(range(1000))
+        pieces = list(iter_history_text(history, chunk_size=10))
+        assert max(len(p) for p in pieces) < 60
+
+    def test_render_within_limit_is_plain_list(self):
+        history = History([1, 2, 3])
+        assert render_history(history) == "[1, 2, 3]"
+        assert render_history(history, last=2) == "[2, 3]"
+
+    def test_render_caps_long_history(self):
+        history = History(range(100))
+        assert render_history(history, limit=3) == "(last 3 of 100) [97, 98, 99]"
+        assert render_history(history, last=50, limit=3) == "(last 3 of 100) [97, 98, 99]"
+
+    def test_write_history(self):
+        stream = io.StringIO()
+        write_history(History(range(25)), stream, chunk_size=7)
+        assert stream.getvalue() == repr(list(range(25)))
+
+    def test_send_history_via_email_last(self, monkeypatch):
+        sent = []
+        monkeypatch.setattr(smtpmod.SMTPClient, "send", lambda subject, text, email: sent.append(text) or True)
+        acc = Account("Jan", "Kowalski", "90010112345")
+        for amount in (100, 200, 300):
+            acc.deposit(amount)
+        assert acc.send_history_via_email("jan@x.pl", last=2) is True
+        assert sent == ["Personal account history: [200, 300]"]
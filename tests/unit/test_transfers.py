@@ -0,0 +1,104 @@
+import pytest
+from account import Account, AccountsRegistry
+from transfers import apply_batch, apply_transfer
+
+
+class TestTransfers:
+
+    @pytest.fixture
+    def registry(self):
+        registry = AccountsRegistry()
+        registry.add_account(Account("Jan", "Kowalski", "90010112345"))
+        registry.add_account(Account("Anna", "Nowak", "92020212345"))
+        return registry
+
+    @pytest.mark.parametrize("transfer_type, expected_balance, expected_history", [
+        ("incoming", 150, [100, 50]),
+        ("outgoing", 50, [100, -50]),
+        ("express", 49, [100, -50, -1]),
+    ])
+    def test_apply_transfer(self, transfer_type, expected_balance, expected_history):
+        acc = Account("Jan", "Kowalski", "90010112345")
+        acc.deposit(100)
+        apply_transfer(acc, transfer_type, 50)
+        assert acc.balance == expected_balance
+        assert acc.history == expected_history
+
+    def test_apply_transfer_unknown_type(self):
+        acc = Account("Jan", "Kowalski", "90010112345")
+        with pytest.raises(ValueError):
+            apply_transfer(acc, "weird", 10)
+
+    def test_apply_batch_reports_each_item(self, registry):
+        items = [
+            {"pesel": "90010112345", "amount": 100, "type": "incoming"},
+            {"pesel": "92020212345", "amount": 10, "type": "outgoing"},
+            {"pesel": "99999999999", "amount": 10, "type": "incoming"},
+            {"pesel": "90010112345", "amount": 30, "type": "express"},
+            {"pesel": "90010112345", "amount": 10, "type": "weird"},
+            {"pesel": "90010112345", "type": "incoming"},
+            {"pesel": "90010112345", "amount": "ten", "type": "outgoing"},
+            "not a transfer",
+        ]
+        results = apply_batch(registry, items)
+
+        assert [r["status"] for r in results] == [200, 422, 404, 200, 400, 400, 400, 400]
+        assert results[1]["error"] == "Za mało środków"
+        assert registry.find_by_pesel("90010112345").balance == 69
+        assert registry.find_by_pesel("92020212345").balance == 0
+
+    def test_apply_batch_groups_keep_per_account_order(self, registry):
+        items = [
+            {"pesel": "90010112345", "amount": 50, "type": "incoming"},
+            {"pesel": "92020212345", "amount": 20, "type": "incoming"},
+            {"pesel": "90010112345", "amount": 50, "type": "outgoing"},
+        ]
+        results = apply_batch(registry, items)
+
+        assert [r["status"] for r in results] == [200, 200, 200]
+        assert registry.find_by_pesel("90010112345").history == [50, -50]
+
+    def test_apply_batch_atomic_success(self, registry):
+        items = [
+            {"pesel": "90010112345", "amount": 100, "type": "incoming"},
+            {"pesel": "92020212345", "amount": 5, "type": "incoming"},
+        ]
+        results = apply_batch(registry, items, atomic=True)
+
+        assert [r["status"] for r in results] == [200, 200]
+        assert registry.find_by_pesel("90010112345").balance == 100
+
+    def test_apply_batch_atomic_rolls_back_on_failure(self, registry):
+        items = [
+            {"pesel": "90010112345", "amount": 100, "type": "incoming"},
+            {"pesel": "90010112345", "amount": 20, "type": "express"},
+            {"pesel": "92020212345", "amount": 5, "type": "outgoing"},
+            {"pesel": "90010112345", "amount": 1, "type": "incoming"},
+        ]
+        results = apply_batch(registry, items, atomic=True)
+
+        assert [r["status"] for r in results] == [424, 424, 422, 424]
+        for pesel in ("90010112345", "92020212345"):
+            acc = registry.find_by_pesel(pesel)
+            assert acc.balance == 0
+            assert acc.history == []
+
+    def test_apply_batch_atomic_unknown_account(self, registry):
+        items = [
+            {"pesel": "90010112345", "amount": 100, "type": "incoming"},
+            {"pesel": "99999999999", "amount": 5, "type": "incoming"},
+        ]
+        results = apply_batch(registry, items, atomic=True)
+
+        assert [r["status"] for r in results] == [424, 404]
+        assert registry.find_by_pesel("90010112345").balance == 0
+
+    def test_apply_batch_atomic_invalid_item_applies_nothing(self, registry):
+        items = [
+            {"pesel": "90010112345", "amount": 100, "type": "incoming"},
+            {"pesel": "90010112345", "type": "incoming"},
+        ]
+        results = apply_batch(registry, items, atomic=True)
+
+        assert [r["status"] for r in results] == [424, 400]
+        assert registry.find_by_pesel("90010112345").history == []